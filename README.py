@@ -1,35 +1,77 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
 import re
+import queue
+import importlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from os.path import basename
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from reportlab.lib.units import inch
-import matplotlib.pyplot as plt
-from datetime import datetime
-custom_paragraph_style = ParagraphStyle(
-    'CustomParagraph',
-    fontName='Helvetica',
-    fontSize=16,
-    leading=20  # Esto controla el espacio entre líneas
-)
+
+from formatos import TIPOS_ARCHIVO, usar_por_bloques
+from perfil import anotar, etapa, perfilar
+from tareas import ControlTarea, OperacionCancelada
+from usuarios import AlmacenUsuarios, CORRECTO, BLOQUEADO
+
+# Módulos que arrastran pandas, numpy y reportlab (casi un segundo de importación):
+# se importan la primera vez que se usan, no antes de mostrar la ventana de inicio de sesión
+MODULOS_DIFERIDOS = ('reglas', 'carga', 'analisis', 'cruce', 'incremental', 'anexos', 'reportes')
+
+
+def precargar_modulos():
+    """Importa los módulos diferidos para que el primer análisis no espere por ellos."""
+    for modulo in MODULOS_DIFERIDOS:
+        importlib.import_module(modulo)
+
+
+def leer_tabla(ruta, tipo, reglas):
+    """carga.leer_tabla para la lectura anticipada: carga (y pandas) se importa en el proceso que lee, no en el de Tk."""
+    from carga import leer_tabla
+    return leer_tabla(ruta, tipo, reglas=reglas)
+
+
 class AuditoriaApp:
-    def __init__(self, root):
+    def __init__(self, root, precargar=True, usuarios=None):
         self.root = root
         self.root.title("Papeles de trabajo Auditoría en sistemas Chalen, Luo y Palau")
         self.root.geometry("800x600")
-        self.users = {}
-        self.attempts = {}
+        self.usuarios = usuarios if usuarios is not None else AlmacenUsuarios()
+        # Hilo propio para derivar las claves: la ventana de login no espera a una tarea de análisis
+        self.executor_usuarios = ThreadPoolExecutor(max_workers=1)
         self.current_user = None
         self.files = {"nomina": None, "asistencia": None, "productividad": None}
+        # Un único hilo de trabajo: lectura, análisis, gráficos y PDF nunca bloquean el bucle de Tk
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.tarea_actual = None
+        self.control_actual = None
+        self.mensajes_progreso = queue.Queue()
+        self.estado_label = None
+        # Lectura anticipada de los archivos en procesos aparte, en cuanto se seleccionan
+        self.pool_carga = None
+        self.precargas = {}
+        self.estado_archivos = {}
+        # None: las reglas predeterminadas de reglas.py
+        self.reglas = None
+        # (clave de la nómina cargada, IndiceEmpleados) para no reconstruir el índice en cada cruce
+        self.indice_empleados = None
+        # Importación de los módulos diferidos en el hilo de trabajo al iniciar sesión
+        self.precargar = precargar
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
         self.main_interface()
 
+    def cerrar(self):
+        """Cancela la tarea en curso y cierra la aplicación."""
+        self.cancelar_tarea()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor_usuarios.shutdown(wait=False, cancel_futures=True)
+        if self.pool_carga is not None:
+            self.pool_carga.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     def main_interface(self):
         """Crea la interfaz principal."""
+        # Al cerrar sesión se descarta la tarea en curso de la sesión anterior
+        self.cancelar_tarea()
+        self.tarea_actual = None
         for widget in self.root.winfo_children():
             widget.destroy()
 
@@ -45,7 +87,8 @@ class AuditoriaApp:
         self.password_entry = tk.Entry(self.login_frame, show='*')
         self.password_entry.grid(row=1, column=1, padx=5, pady=5)
 
-        tk.Button(self.login_frame, text="Iniciar Sesión", command=self.login).grid(row=2, column=0, columnspan=2, pady=10)
+        self.login_button = tk.Button(self.login_frame, text="Iniciar Sesión", command=self.login)
+        self.login_button.grid(row=2, column=0, columnspan=2, pady=10)
 
         tk.Button(self.login_frame, text="Crear Usuario", command=self.create_user_interface).grid(row=3, column=0, columnspan=2, pady=5)
 
@@ -65,7 +108,8 @@ class AuditoriaApp:
         self.new_password_entry = tk.Entry(self.create_user_frame, show='*')
         self.new_password_entry.grid(row=1, column=1, padx=5, pady=5)
 
-        tk.Button(self.create_user_frame, text="Crear Usuario", command=self.create_user).grid(row=2, column=0, columnspan=2, pady=10)
+        self.create_user_button = tk.Button(self.create_user_frame, text="Crear Usuario", command=self.create_user)
+        self.create_user_button.grid(row=2, column=0, columnspan=2, pady=10)
 
         tk.Button(self.create_user_frame, text="Retornar", command=self.main_interface).grid(row=3, column=0, columnspan=2, pady=5)
 
@@ -82,28 +126,58 @@ class AuditoriaApp:
             messagebox.showerror("Error", "La contraseña debe tener al menos 8 caracteres, incluir mayúsculas y números.")
             return
 
-        self.users[username] = password
-        self.attempts[username] = 0
+        self.create_user_button.config(state='disabled')
+        futuro = self.executor_usuarios.submit(self.usuarios.crear, username, password)
+        self._al_completar(futuro, self._usuario_creado)
+
+    def _usuario_creado(self, futuro):
+        if not self.create_user_button.winfo_exists():
+            return
+        self.create_user_button.config(state='normal')
+        try:
+            futuro.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo crear el usuario: {e}")
+            return
         messagebox.showinfo("Éxito", "Usuario creado exitosamente.")
         self.main_interface()
 
+    def _al_completar(self, futuro, al_terminar):
+        """Llama a al_terminar(futuro) en el hilo de Tk cuando termina una operación de usuarios."""
+        if not futuro.done():
+            self.root.after(50, self._al_completar, futuro, al_terminar)
+            return
+        al_terminar(futuro)
+
     def login(self):
-        """Verifica el usuario y la contraseña."""
+        """Verifica el usuario y la contraseña (la clave se deriva en el hilo de usuarios)."""
         username = self.username_entry.get()
         password = self.password_entry.get()
 
-        if username in self.users and self.users[username] == password:
+        self.login_button.config(state='disabled')
+        futuro = self.executor_usuarios.submit(self.usuarios.verificar, username, password)
+        self._al_completar(futuro, lambda futuro: self._resultado_login(username, futuro))
+
+    def _resultado_login(self, username, futuro):
+        if not self.login_button.winfo_exists():
+            return
+        self.login_button.config(state='normal')
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo verificar el usuario: {e}")
+            return
+
+        if resultado == CORRECTO:
             self.current_user = username
             messagebox.showinfo("Éxito", "Inicio de sesión exitoso.")
             self.load_main_app(username)
+        elif resultado == BLOQUEADO:
+            messagebox.showerror("Error", "Usuario bloqueado. Demasiados intentos fallidos.")
+            self.username_entry.delete(0, tk.END)
+            self.password_entry.delete(0, tk.END)
         else:
-            self.attempts[username] = self.attempts.get(username, 0) + 1
-            if self.attempts[username] >= 3:
-                messagebox.showerror("Error", "Usuario bloqueado. Demasiados intentos fallidos.")
-                self.username_entry.delete(0, tk.END)
-                self.password_entry.delete(0, tk.END)
-            else:
-                messagebox.showerror("Error", "Usuario o contraseña incorrectos.")
+            messagebox.showerror("Error", "Usuario o contraseña incorrectos.")
 
     def load_main_app(self, username):
         """Carga la interfaz principal de la aplicación después de iniciar sesión."""
@@ -128,38 +202,234 @@ class AuditoriaApp:
         self.setup_carga_archivos_tab()
         self.setup_generacion_analisis_tab()
         self.setup_papel_trabajo_tab()
+        self.setup_barra_estado()
 
         tk.Button(self.root, text="Cerrar Sesión", command=self.main_interface).pack(pady=10)
 
+        if self.precargar:
+            # Mientras el usuario elige los archivos; los errores se verán al usar el módulo
+            self.executor.submit(precargar_modulos)
+            self.precargar = False
+
+    def setup_barra_estado(self):
+        """Configura la barra de estado con el progreso de la tarea en curso y el botón de cancelar."""
+        barra = tk.Frame(self.root)
+        barra.pack(fill='x', padx=10)
+
+        self.estado_label = tk.Label(barra, text="Listo.", anchor='w')
+        self.estado_label.pack(side='left', fill='x', expand=True)
+
+        self.boton_cancelar = tk.Button(barra, text="Cancelar", command=self.cancelar_tarea, state='disabled')
+        self.boton_cancelar.pack(side='right', padx=5)
+
+        self.barra_progreso = ttk.Progressbar(barra, mode='indeterminate', length=150)
+        self.barra_progreso.pack(side='right', padx=5)
+
+    def actualizar_estado(self, texto):
+        """Muestra un texto en la barra de estado si sigue visible."""
+        if self.estado_label is not None and self.estado_label.winfo_exists():
+            self.estado_label.config(text=texto)
+
+    def ejecutar_en_segundo_plano(self, tarea, al_terminar, mensaje_error):
+        """Ejecuta tarea(control) en el hilo de trabajo y llama a al_terminar(resultado) en el hilo de Tk.
+
+        El progreso llega a la interfaz por una cola que se revisa con root.after.
+        Cada tarea se mide por etapas (perfil.py): su línea se agrega al archivo de
+        perfiles y el resumen queda en la barra de estado.
+        """
+        if self.tarea_actual is not None and not self.tarea_actual.done():
+            messagebox.showerror("Error", "Ya hay una tarea en curso. Espere a que termine o cancélela.")
+            return
+
+        # 'analyze_nomina', 'create_nomina_pdf_report'...: el método que lanzó la tarea
+        nombre = tarea.__qualname__.split('.<locals>')[0].rsplit('.', 1)[-1]
+
+        def medida(control):
+            with perfilar(nombre) as perfil:
+                resultado = tarea(control)
+            return resultado, perfil
+
+        self.control_actual = ControlTarea(al_progresar=self.mensajes_progreso.put)
+        self.tarea_actual = self.executor.submit(medida, self.control_actual)
+        if self.estado_label is not None and self.estado_label.winfo_exists():
+            self.boton_cancelar.config(state='normal')
+            self.barra_progreso.start(10)
+        self.root.after(100, self._revisar_tarea, self.tarea_actual, al_terminar, mensaje_error)
+
+    def _revisar_tarea(self, tarea, al_terminar, mensaje_error):
+        """Vacía la cola de progreso y, cuando la tarea termina, entrega su resultado."""
+        while not self.mensajes_progreso.empty():
+            self.actualizar_estado(self.mensajes_progreso.get_nowait())
+
+        if not tarea.done():
+            self.root.after(100, self._revisar_tarea, tarea, al_terminar, mensaje_error)
+            return
+
+        if tarea is not self.tarea_actual or self.estado_label is None or not self.estado_label.winfo_exists():
+            return  # La sesión se cerró mientras la tarea se ejecutaba
+        self.barra_progreso.stop()
+        self.boton_cancelar.config(state='disabled')
+
+        try:
+            resultado, perfil = tarea.result()
+        except OperacionCancelada:
+            self.actualizar_estado("Operación cancelada.")
+            return
+        except Exception as e:
+            self.actualizar_estado("Error.")
+            messagebox.showerror("Error", f"{mensaje_error}: {str(e)}")
+            return
+
+        self.actualizar_estado(f"Listo en {perfil.resumen()}.")
+        al_terminar(resultado)
+
+    def cancelar_tarea(self):
+        """Solicita la cancelación de la tarea en curso."""
+        if self.tarea_actual is not None and not self.tarea_actual.done():
+            self.control_actual.cancelar()
+            self.actualizar_estado("Cancelando...")
+
     def setup_carga_archivos_tab(self):
         """Configura la pestaña de carga de archivos."""
-        tk.Button(self.tab_carga_archivos, text="Carga archivo de nómina", command=self.load_nomina_file).pack(pady=10)
-        tk.Button(self.tab_carga_archivos, text="Carga archivo de asistencia", command=self.load_asistencia_file).pack(pady=10)
-        tk.Button(self.tab_carga_archivos, text="Carga archivo de productividad", command=self.load_productividad_file).pack(pady=10)
+        tk.Button(self.tab_carga_archivos, text="Carga archivo de nómina", command=self.load_nomina_file).pack(pady=(10, 0))
+        self.estado_archivos['nomina'] = tk.Label(self.tab_carga_archivos)
+        self.estado_archivos['nomina'].pack()
+        tk.Button(self.tab_carga_archivos, text="Carga archivo de asistencia", command=self.load_asistencia_file).pack(pady=(10, 0))
+        self.estado_archivos['asistencia'] = tk.Label(self.tab_carga_archivos)
+        self.estado_archivos['asistencia'].pack()
+        tk.Button(self.tab_carga_archivos, text="Carga archivo de productividad", command=self.load_productividad_file).pack(pady=(10, 0))
+        self.estado_archivos['productividad'] = tk.Label(self.tab_carga_archivos)
+        self.estado_archivos['productividad'].pack()
+        tk.Button(self.tab_carga_archivos, text="Cargar reglas de auditoría", command=self.load_reglas_file).pack(pady=(10, 0))
+        self.estado_reglas = tk.Label(self.tab_carga_archivos,
+                                      text=f"Reglas: {self.reglas.nombre if self.reglas else 'predeterminadas'}")
+        self.estado_reglas.pack()
+
+        for tipo in self.files:
+            self._mostrar_estado_archivo(tipo)
 
     def load_nomina_file(self):
         """Carga el archivo de nómina."""
-        self.files['nomina'] = filedialog.askopenfilename(title="Selecciona el archivo de nómina", filetypes=[("Excel files", "*.xlsx")])
+        self.files['nomina'] = filedialog.askopenfilename(title="Selecciona el archivo de nómina", filetypes=TIPOS_ARCHIVO)
+        self.iniciar_precarga('nomina')
         if self.files['nomina']:
             messagebox.showinfo("Éxito", "Archivo de nómina cargado correctamente.")
 
     def load_asistencia_file(self):
         """Carga el archivo de asistencia."""
-        self.files['asistencia'] = filedialog.askopenfilename(title="Selecciona el archivo de asistencia", filetypes=[("Excel files", "*.xlsx")])
+        self.files['asistencia'] = filedialog.askopenfilename(title="Selecciona el archivo de asistencia", filetypes=TIPOS_ARCHIVO)
+        self.iniciar_precarga('asistencia')
         if self.files['asistencia']:
             messagebox.showinfo("Éxito", "Archivo de asistencia cargado correctamente.")
 
     def load_productividad_file(self):
         """Carga el archivo de productividad."""
-        self.files['productividad'] = filedialog.askopenfilename(title="Selecciona el archivo de productividad", filetypes=[("Excel files", "*.xlsx")])
+        self.files['productividad'] = filedialog.askopenfilename(title="Selecciona el archivo de productividad", filetypes=TIPOS_ARCHIVO)
+        self.iniciar_precarga('productividad')
         if self.files['productividad']:
             messagebox.showinfo("Éxito", "Archivo de productividad cargado correctamente.")
 
+    def load_reglas_file(self):
+        """Carga un archivo de reglas (umbrales y cortes de escenario) para los próximos análisis."""
+        from reglas import cargar_reglas
+        ruta = filedialog.askopenfilename(title="Selecciona el archivo de reglas",
+                                          filetypes=[("Reglas", "*.json *.yaml *.yml"), ("Todos los archivos", "*.*")])
+        if not ruta:
+            return
+        try:
+            self.reglas = cargar_reglas(ruta)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron cargar las reglas: {e}")
+            return
+        self.estado_reglas.config(text=f"Reglas: {self.reglas.nombre}")
+        # Las columnas que se leen de asistencia y productividad dependen de las reglas
+        for tipo in ('asistencia', 'productividad'):
+            if self.files[tipo]:
+                self.iniciar_precarga(tipo)
+        messagebox.showinfo("Éxito", "Reglas de auditoría cargadas correctamente.")
+
+    def iniciar_precarga(self, tipo):
+        """Empieza a leer el archivo seleccionado en un proceso aparte para que el análisis lo encuentre en memoria."""
+        ruta = self.files[tipo]
+        if not ruta:
+            self.precargas.pop(tipo, None)
+            self._mostrar_estado_archivo(tipo)
+            return
+
+        if tipo == 'nomina' and usar_por_bloques(ruta):
+            # Una nómina tan grande no se carga entera: el análisis la recorrerá por bloques
+            self.precargas.pop(tipo, None)
+            self._mostrar_estado_archivo(tipo)
+            return
+
+        if self.pool_carga is None:
+            # spawn: los procesos hijos no heredan el estado de Tk del proceso principal
+            self.pool_carga = ProcessPoolExecutor(max_workers=len(self.files),
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        # La nómina se lee igual con cualquier conjunto de reglas
+        reglas = self.reglas if tipo != 'nomina' else None
+        futuro = self.pool_carga.submit(leer_tabla, ruta, tipo, reglas)
+        self.precargas[tipo] = (ruta, futuro, reglas)
+        self._mostrar_estado_archivo(tipo)
+        self.root.after(200, self._revisar_precarga, tipo, futuro)
+
+    def _revisar_precarga(self, tipo, futuro):
+        """Actualiza el indicador del archivo cuando termina su lectura anticipada."""
+        if self.precargas.get(tipo, (None, None))[1] is not futuro:
+            return  # Se seleccionó otro archivo mientras tanto
+        if not futuro.done():
+            self.root.after(200, self._revisar_precarga, tipo, futuro)
+            return
+        self._mostrar_estado_archivo(tipo)
+
+    def _mostrar_estado_archivo(self, tipo):
+        """Muestra en la pestaña de carga si el archivo está sin seleccionar, leyéndose, listo o con error."""
+        etiqueta = self.estado_archivos.get(tipo)
+        if etiqueta is None or not etiqueta.winfo_exists():
+            return
+
+        if not self.files[tipo]:
+            etiqueta.config(text="Sin archivo", fg='grey')
+            return
+        nombre = basename(self.files[tipo])
+        if tipo not in self.precargas:
+            if tipo == 'nomina' and usar_por_bloques(self.files[tipo]):
+                etiqueta.config(text=f"{nombre}: se analizará por bloques", fg='black')
+            else:
+                etiqueta.config(text=nombre, fg='black')
+            return
+
+        futuro = self.precargas[tipo][1]
+        if not futuro.done():
+            etiqueta.config(text=f"{nombre}: leyendo...", fg='darkorange')
+        elif futuro.cancelled() or futuro.exception() is not None:
+            error = "cancelado" if futuro.cancelled() else futuro.exception()
+            etiqueta.config(text=f"{nombre}: error al leer ({error})", fg='red')
+        else:
+            etiqueta.config(text=f"{nombre}: listo ({len(futuro.result())} filas)", fg='darkgreen')
+
+    def obtener_tabla(self, tipo, ruta, reglas=None):
+        """Devuelve la tabla ya leída en segundo plano o, si no hay lectura anticipada de esa ruta y reglas, la lee.
+
+        Se llama desde el hilo de trabajo: esperar la lectura anticipada no bloquea la interfaz.
+        """
+        precarga = self.precargas.get(tipo)
+        if precarga is not None and precarga[0] == ruta and precarga[2] is reglas:
+            try:
+                with etapa("esperar_lectura_anticipada"):
+                    df = precarga[1].result()
+                anotar(**{f"filas_{tipo}": len(df)})
+                return df
+            except Exception:
+                pass  # Si la lectura anticipada falló, se reintenta aquí para informar el error
+        return leer_tabla(ruta, tipo, reglas)
+
     def setup_generacion_analisis_tab(self):
         """Configura la pestaña de generación de análisis."""
         tk.Button(self.tab_generacion_analisis, text="Análisis de nómina", command=self.analyze_nomina).pack(pady=10)
         tk.Button(self.tab_generacion_analisis, text="Análisis de asistencia", command=self.analyze_asistencia).pack(pady=10)
         tk.Button(self.tab_generacion_analisis, text="Análisis de productividad", command=self.analyze_productividad).pack(pady=10)
+        tk.Button(self.tab_generacion_analisis, text="Cruce de nómina, asistencia y productividad", command=self.analyze_cruce).pack(pady=10)
 
     def analyze_nomina(self):
         """Genera el análisis de nómina para detectar duplicados."""
@@ -167,250 +437,113 @@ class AuditoriaApp:
             messagebox.showerror("Error", "No se ha cargado ningún archivo de nómina.")
             return
 
-        df_nomina = pd.read_excel(self.files['nomina'])
-        duplicados_nombre = df_nomina[df_nomina.duplicated(subset='Nombre', keep=False)]
-        duplicados_cuenta = df_nomina[df_nomina.duplicated(subset='Cuenta Bancaria', keep=False)]
-
-        total_rows = len(df_nomina)
-        anomalías = len(duplicados_nombre) + len(duplicados_cuenta)
-        porcentaje_anomalías = (anomalías / total_rows) * 100 if total_rows > 0 else 0
+        ruta = self.files['nomina']
+        reglas = self.reglas
+
+        def tarea(control):
+            from carga import iterar_bloques
+            from analisis import analizar_nomina_por_bloques
+            from incremental import analizar_nomina_incremental
+            if usar_por_bloques(ruta):
+                control.informar("Buscando duplicados en la nómina por bloques...")
+                return analizar_nomina_por_bloques(lambda: iterar_bloques(ruta, 'nomina'), reglas)
+            control.informar("Leyendo archivo de nómina...")
+            df_nomina = self.obtener_tabla('nomina', ruta)
+            control.informar("Buscando duplicados en la nómina...")
+            # Si el archivo ya se analizó antes, solo se buscan parecidos para las filas que cambiaron
+            return analizar_nomina_incremental(df_nomina, ruta, reglas)
+
+        self.ejecutar_en_segundo_plano(tarea, self._mostrar_analisis_nomina,
+                                       "Se produjo un error durante el análisis de nómina")
+
+    def _mostrar_analisis_nomina(self, nomina_data):
+        """Guarda el resultado del análisis de nómina, lo muestra y genera su reporte."""
+        # Guardar los datos para usarlos en el papel de trabajo
+        self.nomina_data = nomina_data
 
-        report = f"Anomalías identificadas:\n\nNúmero de Empleados duplicados: {len(duplicados_nombre)}\nNúmero de cuenta bancaria Empleados duplicadas: {len(duplicados_cuenta)}"
+        report = f"Anomalías identificadas:\n\nNúmero de Empleados duplicados: {len(self.nomina_data['duplicados_nombre'])}\nNúmero de cuenta bancaria Empleados duplicadas: {len(self.nomina_data['duplicados_cuenta'])}"
+        report += self._texto_incremental(nomina_data)
         messagebox.showinfo("Reporte de Nómina", report)
 
-        # Guardar los datos para usarlos en el papel de trabajo
-        self.nomina_data = {
-            'df_nomina': df_nomina,
-            'duplicados_nombre': duplicados_nombre,
-            'duplicados_cuenta': duplicados_cuenta,
-            'total_rows': total_rows,
-            'porcentaje_anomalías': porcentaje_anomalías
-        }
-
         # Generar el PDF del análisis
         self.create_nomina_pdf_report()
 
+    @staticmethod
+    def _texto_incremental(data):
+        """Línea del mensaje con lo que se reanalizó, si se reutilizó el análisis anterior del archivo."""
+        incremental = data.get('incremental')
+        if not incremental or incremental['filas_cambiadas'] == incremental['filas']:
+            return ""
+        texto = f"\n\nFilas nuevas o modificadas desde el análisis anterior: {incremental['filas_cambiadas']} de {incremental['filas']}"
+        if incremental.get('meses_nuevos'):
+            texto += f"\nMeses nuevos: {incremental['meses_nuevos']}"
+        return texto
+
     def create_nomina_pdf_report(self):
         """Genera un reporte PDF con los resultados del análisis de nómina."""
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Título del reporte
-        title = Paragraph("Análisis de Nómina - Anomalías Identificadas", styles['Title'])
-        elements.append(title)
-
-        # Auditor/es
-        auditor_paragraph = Paragraph(f"Auditor/es: {self.current_user}", custom_paragraph_style)
-        elements.append(auditor_paragraph)
-
-        # Resumen de las anomalías
-        summary = Paragraph(f"<br/>Número de Empleados duplicados: {len(self.nomina_data['duplicados_nombre'])}<br/>"
-                            f"Número de cuentas bancarias duplicadas: {len(self.nomina_data['duplicados_cuenta'])}<br/><br/>", custom_paragraph_style)
-        elements.append(summary)
-
-        # Sección 1: Listado de empleados duplicados por nombre
-        elements.append(Paragraph("Listado de Empleados Duplicados con ID diferente:", styles['Heading2']))
-
-        # Filtrado y ordenación alfabética para el primer listado
-        filtered_data_1 = self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].sort_values(by='Nombre')
-        data_table_1 = [filtered_data_1.columns.tolist()] + filtered_data_1.values.tolist()
-
-        # Ajuste para que las columnas de la tabla se adapten al ancho disponible
-        table_1 = Table(data_table_1, colWidths=[doc.width / len(data_table_1[0])] * len(data_table_1[0]), repeatRows=1)
-        
-        table_1.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_1)
-
-        # Sección 2: Listado de cuentas bancarias duplicadas
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Listado de Cuentas Bancarias Duplicadas con nombres y ID diferentes:", styles['Heading2']))
-
-        # Filtrado y ordenación alfabética para el segundo listado
-        filtered_data_2 = self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].sort_values(by='Nombre')
-        data_table_2 = [filtered_data_2.columns.tolist()] + filtered_data_2.values.tolist()
-
-        # Ajuste para que las columnas de la tabla se adapten al ancho disponible
-        table_2 = Table(data_table_2, colWidths=[doc.width / len(data_table_2[0])] * len(data_table_2[0]), repeatRows=1)
-        
-        table_2.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_2)
-
-        # Diagramas de pastel
-        elements.append(Spacer(1, 12))
-        self.create_pie_chart(len(self.nomina_data['duplicados_nombre']), self.nomina_data['total_rows'], "nombres_duplicados.png", "Porcentaje de Nombres Duplicados")
-        self.create_pie_chart(len(self.nomina_data['duplicados_cuenta']), self.nomina_data['total_rows'], "cuentas_duplicadas.png", "Porcentaje de Cuentas Bancarias Duplicadas")
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Nombres Duplicados con ID diferentes:", styles['Heading2']))
-        elements.append(Image("nombres_duplicados.png", 4 * inch, 4 * inch))
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Cuentas Bancarias Duplicadas con nombres y ID diferentes:", styles['Heading2']))
-        elements.append(Image("cuentas_duplicadas.png", 4 * inch, 4 * inch))
-
-        # Construir el documento PDF
-        doc.build(elements)
+        from reportes import crear_reporte_nomina_pdf
+        nomina_data, auditor = self.nomina_data, self.current_user
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_reporte_nomina_pdf(pdf_path, nomina_data, auditor, control=control,
+                                                    anexo=self._exportar_anexo('nomina', nomina_data, pdf_path, control)),
+            self._informar_reporte_generado, "Se produjo un error al generar el reporte PDF")
+
+    @staticmethod
+    def _exportar_anexo(tipo, data, pdf_path, control):
+        """Escribe junto al PDF el anexo en Excel con los listados completos (en el hilo de trabajo)."""
+        from anexos import exportar_anexo, ruta_anexo
+        control.informar("Exportando el anexo de datos...")
+        return exportar_anexo(tipo, data, ruta_anexo(pdf_path))
+
+    def _informar_reporte_generado(self, pdf_path):
         messagebox.showinfo("Éxito", f"Reporte PDF generado exitosamente en {pdf_path}.")
 
-
-
-
-    def create_pie_chart(self, count, total, filename, title):
-        """Crea un gráfico de pastel y lo guarda como imagen."""
-        if total == 0:
-            return
-        labels = ['Duplicados', 'Únicos']
-        sizes = [count, total - count]
-        colors = ['#ff9999','#66b3ff']
-        fig1, ax1 = plt.subplots()
-        ax1.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
-        ax1.axis('equal')  # Para que el gráfico sea circular
-        plt.title(title)
-        plt.savefig(filename)
-        plt.close()
-
     def analyze_asistencia(self):
         """Genera el análisis de asistencia."""
         if not self.files['asistencia']:
             messagebox.showerror("Error", "No se ha cargado ningún archivo de asistencia.")
             return
 
-        try:
-            df_asistencia = pd.read_excel(self.files['asistencia'])
-            meses = ['Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
-            anomalías_mensuales = {}
-            all_anomalías = pd.DataFrame()
-
-            for mes in meses:
-                columna = f'Días Trabajados en {mes}'
-                if columna in df_asistencia.columns:
-                    anomalías_mensuales[mes] = df_asistencia[df_asistencia[columna] <= 20]
-                    all_anomalías = pd.concat([all_anomalías, anomalías_mensuales[mes]])
-                else:
-                    messagebox.showerror("Error", f"No se encuentra la columna para {mes} en el archivo.")
-                    return
-
-            all_anomalías = all_anomalías.drop_duplicates()
-            total_anomalías = df_asistencia[df_asistencia['Total Días Trabajados'] < 120]
-            all_anomalías = pd.concat([all_anomalías, total_anomalías]).drop_duplicates()
-
-            report = f"Análisis de Asistencia:\n\nNúmero de empleados con anomalías en días trabajados por mes: {len(all_anomalías)}\n"
-            messagebox.showinfo("Reporte de Asistencia", report)
-
-            # Guardar solo las columnas necesarias para el reporte
-            self.asistencia_data = {
-                'df_asistencia': df_asistencia[['ID de Empleado', 'Nombre', 'Total Días Trabajados']].sort_values(by='Nombre'),
-                'anomalías_mensuales': anomalías_mensuales,
-                'total_anomalías': total_anomalías,
-                'all_anomalías': all_anomalías
-            }
-
-            self.create_asistencia_pdf_report()
-        except Exception as e:
-            messagebox.showerror("Error", f"Se produjo un error durante el análisis de asistencia: {str(e)}")
+        ruta = self.files['asistencia']
+        reglas = self.reglas
 
+        def tarea(control):
+            from incremental import analizar_datos_incremental
+            control.informar("Leyendo archivo de asistencia...")
+            df_asistencia = self.obtener_tabla('asistencia', ruta, reglas)
+            control.informar("Buscando anomalías de asistencia...")
+            # Si el archivo ya se analizó antes, solo se evalúan las filas y meses nuevos
+            return analizar_datos_incremental(df_asistencia, 'asistencia', ruta, reglas)
 
+        self.ejecutar_en_segundo_plano(tarea, self._mostrar_analisis_asistencia,
+                                       "Se produjo un error durante el análisis de asistencia")
 
+    def _mostrar_analisis_asistencia(self, asistencia_data):
+        """Guarda el resultado del análisis de asistencia, lo muestra y genera su reporte."""
+        self.asistencia_data = asistencia_data
 
-    def create_asistencia_pdf_report(self):
-        """Genera un reporte PDF con los resultados del análisis de asistencia."""
-        try:
-            pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-            if not pdf_path:
-                return  # Si el usuario cancela el diálogo de guardado, no continúa.
-
-            doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-            elements = []
-            styles = getSampleStyleSheet()
-
-            # Título del reporte
-            title = Paragraph("Análisis de Asistencia - Anomalías Identificadas", styles['Title'])
-            elements.append(title)
-
-            # Auditor/es
-            auditor_paragraph = Paragraph(f"Auditor/es: {self.current_user}", custom_paragraph_style)
-            elements.append(auditor_paragraph)
-
-            # Resumen de las anomalías
-            summary = Paragraph(f"<br/>Número de empleados con menos de 20 días trabajados en al menos un mes: {len(self.asistencia_data['all_anomalías'])}<br/>"
-                                f"Empleados con menos de 120 días trabajados en total: {len(self.asistencia_data['total_anomalías'])}<br/><br/>", custom_paragraph_style)
-            elements.append(summary)
-
-            # Tabla con los datos filtrados
-            elements.append(Paragraph("Datos de Asistencia (solo empleados con menos de 120 días trabajados):", styles['Heading2']))
-
-            # Filtrar las filas donde Total Días Trabajados < 120
-            df_filtered = self.asistencia_data['df_asistencia'][self.asistencia_data['df_asistencia']['Total Días Trabajados'] < 120]
-            df_filtered = df_filtered[['ID de Empleado', 'Nombre', 'Total Días Trabajados']].sort_values(by='Nombre')
-
-            # Convertir los datos filtrados en una tabla para el PDF
-            data_table = [df_filtered.columns.tolist()] + df_filtered.values.tolist()
-
-            # Ajuste para que las columnas de la tabla se adapten al ancho disponible
-            table = Table(data_table, colWidths=[doc.width / len(data_table[0])] * len(data_table[0]), repeatRows=1)
-
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            elements.append(table)
-
-            # Diagramas de pastel
-            elements.append(Spacer(1, 12))
-            self.create_pie_chart(len(self.asistencia_data['all_anomalías']), len(self.asistencia_data['df_asistencia']), "dias_trabajados.png", "Porcentaje de Anomalías en Días Trabajados")
-
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph("Gráfico de Días Trabajados:", styles['Heading2']))
-            elements.append(Image("dias_trabajados.png", 4 * inch, 4 * inch))
-
-            # Construir el documento PDF
-            doc.build(elements)
-            messagebox.showinfo("Éxito", f"Reporte PDF generado exitosamente en {pdf_path}.")
+        report = f"Análisis de Asistencia:\n\nNúmero de empleados con anomalías en días trabajados por mes: {len(self.asistencia_data['all_anomalías'])}\n"
+        report += self._texto_incremental(asistencia_data)
+        messagebox.showinfo("Reporte de Asistencia", report)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Se produjo un error al generar el reporte PDF: {str(e)}")
+        self.create_asistencia_pdf_report()
 
+    def create_asistencia_pdf_report(self):
+        """Genera un reporte PDF con los resultados del análisis de asistencia."""
+        pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
+        if not pdf_path:
+            return  # Si el usuario cancela el diálogo de guardado, no continúa.
 
-    def create_pie_chart(self, count, total, filename, title):
-        """Crea un gráfico de pastel y lo guarda como imagen."""
-        if total == 0:
-            return
-        labels = ['Con Anomalías', 'Sin Anomalías']
-        sizes = [count, total - count]
-        colors = ['#ff9999','#66b3ff']
-        fig1, ax1 = plt.subplots()
-        ax1.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
-        ax1.axis('equal')  # Para que el gráfico sea circular
-        plt.title(title)
-        plt.savefig(filename)
-        plt.close()
-
+        from reportes import crear_reporte_asistencia_pdf
+        asistencia_data, auditor = self.asistencia_data, self.current_user
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_reporte_asistencia_pdf(pdf_path, asistencia_data, auditor, control=control,
+                                                    anexo=self._exportar_anexo('asistencia', asistencia_data, pdf_path, control)),
+            self._informar_reporte_generado, "Se produjo un error al generar el reporte PDF")
 
     def analyze_productividad(self):
         """Genera el análisis de productividad."""
@@ -418,1154 +551,149 @@ class AuditoriaApp:
             messagebox.showerror("Error", "No se ha cargado ningún archivo de productividad.")
             return
 
-        df_productividad = pd.read_excel(self.files['productividad'])
-        anomalías_mensuales = {}
-        anomalías_totales = []
-
-        for mes in ['Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']:
-            anomalías_mensuales[mes] = df_productividad[df_productividad[f'Tareas Realizadas en {mes}'] < 17]
+        ruta = self.files['productividad']
+        reglas = self.reglas
 
-        total_anomalías = df_productividad[df_productividad['Productividad (Tareas - 6 meses)'] < 102]
+        def tarea(control):
+            from incremental import analizar_datos_incremental
+            control.informar("Leyendo archivo de productividad...")
+            df_productividad = self.obtener_tabla('productividad', ruta, reglas)
+            control.informar("Buscando anomalías de productividad...")
+            # Si el archivo ya se analizó antes, solo se evalúan las filas y meses nuevos
+            return analizar_datos_incremental(df_productividad, 'productividad', ruta, reglas)
 
-        for mes in anomalías_mensuales:
-            anomalías_totales.append(anomalías_mensuales[mes])
+        self.ejecutar_en_segundo_plano(tarea, self._mostrar_analisis_productividad,
+                                       "Se produjo un error durante el análisis de productividad")
 
-        anomalías_totales.append(total_anomalías)
-        all_anomalías = pd.concat(anomalías_totales).drop_duplicates()
+    def _mostrar_analisis_productividad(self, productividad_data):
+        """Guarda el resultado del análisis de productividad, lo muestra y genera su reporte."""
+        self.productividad_data = productividad_data
 
-        report = f"Análisis de Productividad:\n\nNúmero de empleados con anomalías en tareas realizadas por mes: {len(all_anomalías)}\n"
+        report = f"Análisis de Productividad:\n\nNúmero de empleados con anomalías en tareas realizadas por mes: {len(self.productividad_data['indices_anomalías'])}\n"
+        report += self._texto_incremental(productividad_data)
         messagebox.showinfo("Reporte de Productividad", report)
 
-        # Guardar los datos completos para gráficos y análisis
-        self.productividad_data = {
-            'df_productividad': df_productividad,  # Guardar todo el DataFrame original
-            'anomalías_mensuales': anomalías_mensuales,
-            'total_anomalías': total_anomalías,
-            'all_anomalías': all_anomalías
-        }
-
         self.create_productividad_pdf_report()
 
-
-
     def create_productividad_pdf_report(self):
         """Genera un reporte PDF con los resultados del análisis de productividad."""
-        try:
-            pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-            if not pdf_path:
-                return  # Si el usuario cancela el diálogo de guardado, no continúa.
-
-            doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-            elements = []
-            styles = getSampleStyleSheet()
-
-            title = Paragraph("Análisis de Productividad - Anomalías Identificadas", styles['Title'])
-            elements.append(title)
-
-            auditor_paragraph = Paragraph(f"Auditor/es: {self.current_user}", custom_paragraph_style)
-            elements.append(auditor_paragraph)
-
-            summary = Paragraph(f"<br/>Número de empleados con menos de 17 tareas realizadas en al menos un mes: {len(self.productividad_data['all_anomalías'])}<br/>"
-                                f"Empleados con menos de 102 tareas realizadas en total: {len(self.productividad_data['total_anomalías'])}<br/><br/>", custom_paragraph_style)
-            elements.append(summary)
-
-            elements.append(Paragraph("Datos de Productividad (solo empleados con menos de 102 tareas realizadas):", styles['Heading2']))
-            
-            # Filtrar las filas donde Productividad (Tareas - 6 meses) < 102
-            df_filtered = self.productividad_data['df_productividad'][self.productividad_data['df_productividad']['Productividad (Tareas - 6 meses)'] < 102]
-            df_filtered = df_filtered[['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].sort_values(by='Nombre')
-            
-            # Convertir los datos filtrados en una tabla para el PDF
-            data_table = [df_filtered.columns.tolist()] + df_filtered.values.tolist()
-            
-            # Ajuste para que las columnas de la tabla se adapten al ancho disponible
-            table = Table(data_table, colWidths=[doc.width / len(data_table[0])] * len(data_table[0]), repeatRows=1)
-            
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            elements.append(table)
-
-            elements.append(Spacer(1, 12))
-            self.create_pie_chart(len(self.productividad_data['all_anomalías']), len(self.productividad_data['df_productividad']), "tareas_realizadas.png", "Porcentaje de Anomalías en Tareas Realizadas")
-
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph("Gráfico de Tareas Realizadas:", styles['Heading2']))
-            elements.append(Image("tareas_realizadas.png", 4 * inch, 4 * inch))
-
-            doc.build(elements)
-            messagebox.showinfo("Éxito", f"Reporte PDF generado exitosamente en {pdf_path}.")
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Se produjo un error al generar el reporte PDF: {str(e)}")
-
-
-
-    def setup_papel_trabajo_tab(self):
-        """Configura la pestaña de Papel de Trabajo."""
-        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Nómina", command=self.generate_papel_trabajo_nomina).pack(pady=10)
-        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Asistencia", command=self.generate_papel_trabajo_asistencia).pack(pady=10)
-        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Productividad", command=self.generate_papel_trabajo_productividad).pack(pady=10)
-
-    def generate_papel_trabajo_nomina(self):
-            """Genera el papel de trabajo de nómina basado en el análisis realizado."""
-            if not hasattr(self, 'nomina_data'):
-                messagebox.showerror("Error", "No se ha realizado ningún análisis de nómina.")
-                return
-
-            porcentaje_anomalías = self.nomina_data['porcentaje_anomalías']
-            if porcentaje_anomalías == 0:
-                self.create_papel_trabajo_nomina_escenario1()
-            elif 0 < porcentaje_anomalías <= 15:
-                self.create_papel_trabajo_nomina_escenario2()
-            else:
-                self.create_papel_trabajo_nomina_escenario3()
-
-    def create_papel_trabajo_nomina_escenario1(self):
-        custom_paragraph_style = ParagraphStyle(
-            'CustomParagraph',
-            fontName='Helvetica',
-            fontSize=16,
-            leading=20  # Esto controla el espacio entre líneas
-        )
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
+            return  # Si el usuario cancela el diálogo de guardado, no continúa.
+
+        from reportes import crear_reporte_productividad_pdf
+        productividad_data, auditor = self.productividad_data, self.current_user
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_reporte_productividad_pdf(pdf_path, productividad_data, auditor, control=control,
+                                                    anexo=self._exportar_anexo('productividad', productividad_data, pdf_path, control)),
+            self._informar_reporte_generado, "Se produjo un error al generar el reporte PDF")
+
+    def obtener_indice_empleados(self, ruta):
+        """IndiceEmpleados de la nómina, construido una sola vez por archivo cargado (en el hilo de trabajo)."""
+        # La lectura anticipada cambia cada vez que se vuelve a seleccionar el archivo
+        clave = (ruta, self.precargas.get('nomina', (None, None))[1])
+        if self.indice_empleados is None or self.indice_empleados[0] != clave:
+            from cruce import IndiceEmpleados
+            if usar_por_bloques(ruta):
+                from lote import indice_nomina
+                indice = indice_nomina(ruta, por_bloques=True)
+            else:
+                df_nomina = self.obtener_tabla('nomina', ruta)
+                with etapa("indice_empleados"):
+                    indice = IndiceEmpleados(df_nomina)
+            self.indice_empleados = (clave, indice)
+        return self.indice_empleados[1]
+
+    def analyze_cruce(self):
+        """Cruza los tres archivos por empleado para encontrar pagados sin asistencia o sin tareas."""
+        faltantes = [tipo for tipo, ruta in self.files.items() if not ruta]
+        if faltantes:
+            messagebox.showerror("Error", f"Faltan cargar los archivos de: {', '.join(faltantes)}.")
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['nomina'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Nómina", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de nómina para asegurar que todos los pagos 
-        correspondan a empleados reales y estén correctamente registrados.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de nómina y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se sospecha que podría haber empleados fantasmas en la nómina de Verde Campo. 
-        La auditoría busca confirmar o descartar esta posibilidad.
-        Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron registros de nómina, contratos de trabajo, y extractos bancarios.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de nómina con la documentación de los empleados.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de nómina.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Todos los registros revisados coinciden correctamente; no se encontraron discrepancias. 
-        Insertar porcentaje de anomalías encontradas: {self.nomina_data['porcentaje_anomalías']}%.
-        Análisis de evidencias: Los registros de nómina corresponden con las cuentas bancarias verificadas y no se 
-        detectaron empleados fantasmas.
-        Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la nómina.
-        Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: No se requieren acciones correctivas.
-        Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de nómina.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: No se encontraron anomalías en los registros de nómina. La empresa mantiene un control adecuado sobre sus procesos de pago.
-        Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Empleados duplicados por nombre
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados Duplicados por Nombre:", styles['Heading2']))
-        empleados_duplicados_nombre = [self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].columns.tolist()] + self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].values.tolist()
-        table_nombre = Table(empleados_duplicados_nombre, colWidths=[doc.width / len(empleados_duplicados_nombre[0])] * len(empleados_duplicados_nombre[0]), repeatRows=1)
-        table_nombre.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_nombre)
-
-        # Empleados duplicados por cuenta bancaria
-        elements.append(Paragraph("Empleados Duplicados por Cuenta Bancaria:", styles['Heading2']))
-        empleados_duplicados_cuenta = [self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].columns.tolist()] + self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].values.tolist()
-        table_cuenta = Table(empleados_duplicados_cuenta, colWidths=[doc.width / len(empleados_duplicados_cuenta[0])] * len(empleados_duplicados_cuenta[0]), repeatRows=1)
-        table_cuenta.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_cuenta)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Nombres Duplicados:", styles['Heading2']))
-        elements.append(Image("nombres_duplicados.png", 4 * inch, 4 * inch))
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Cuentas Bancarias Duplicadas:", styles['Heading2']))
-        elements.append(Image("cuentas_duplicadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
+        rutas = dict(self.files)
+        reglas = self.reglas
 
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
+        def tarea(control):
+            from cruce import cruzar_empleados
+            control.informar("Indexando los empleados de la nómina...")
+            indice = self.obtener_indice_empleados(rutas['nomina'])
+            control.informar("Leyendo archivo de asistencia...")
+            df_asistencia = self.obtener_tabla('asistencia', rutas['asistencia'], reglas)
+            control.informar("Leyendo archivo de productividad...")
+            df_productividad = self.obtener_tabla('productividad', rutas['productividad'], reglas)
+            control.informar("Cruzando nómina, asistencia y productividad...")
+            return cruzar_empleados(None, df_asistencia, df_productividad, reglas, indice)
 
-    def create_papel_trabajo_nomina_escenario2(self):
-        custom_paragraph_style = ParagraphStyle(
-            'CustomParagraph',
-            fontName='Helvetica',
-            fontSize=16,
-            leading=20  # Esto controla el espacio entre líneas
-        )
-        pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-        if not pdf_path:
-            return
+        self.ejecutar_en_segundo_plano(tarea, self._mostrar_cruce,
+                                       "Se produjo un error durante el cruce de archivos")
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['nomina'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Nómina", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de nómina para asegurar que todos los pagos 
-        correspondan a empleados reales y estén correctamente registrados.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de nómina y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se sospecha que podría haber empleados fantasmas en la nómina. Esta auditoría busca verificar la validez de los registros de nómina.
-        Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron registros de nómina, contratos de trabajo, y extractos bancarios.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de nómina con la documentación de los empleados.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de nómina.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se encontraron pequeñas discrepancias en los montos pagados a algunos empleados. 
-        Insertar porcentaje de anomalías encontradas: {self.nomina_data['porcentaje_anomalías']}%.
-        Análisis de evidencias: Aunque se detectaron diferencias en los pagos, estas no son significativas en términos de impacto financiero.
-        Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las discrepancias no afectan de manera significativa la situación financiera de la empresa.
-        Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Revisar y ajustar los procesos de cálculo de nómina para corregir las discrepancias menores encontradas.
-        Mejoras en seguridad: Implementar una revisión mensual de los registros de nómina para detectar y corregir errores menores de manera oportuna.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías menores en los registros de nómina que no son significativas. Se recomienda hacer ajustes menores.
-        Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Empleados duplicados por nombre
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados Duplicados por Nombre:", styles['Heading2']))
-        empleados_duplicados_nombre = [self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].columns.tolist()] + self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].values.tolist()
-        table_nombre = Table(empleados_duplicados_nombre, colWidths=[doc.width / len(empleados_duplicados_nombre[0])] * len(empleados_duplicados_nombre[0]), repeatRows=1)
-        table_nombre.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_nombre)
-
-        # Empleados duplicados por cuenta bancaria
-        elements.append(Paragraph("Empleados Duplicados por Cuenta Bancaria:", styles['Heading2']))
-        empleados_duplicados_cuenta = [self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].columns.tolist()] + self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].values.tolist()
-        table_cuenta = Table(empleados_duplicados_cuenta, colWidths=[doc.width / len(empleados_duplicados_cuenta[0])] * len(empleados_duplicados_cuenta[0]), repeatRows=1)
-        table_cuenta.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_cuenta)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Nombres Duplicados:", styles['Heading2']))
-        elements.append(Image("nombres_duplicados.png", 4 * inch, 4 * inch))
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Cuentas Bancarias Duplicadas:", styles['Heading2']))
-        elements.append(Image("cuentas_duplicadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
+    def _mostrar_cruce(self, cruce_data):
+        """Guarda el resultado del cruce, lo muestra y genera su reporte."""
+        self.cruce_data = cruce_data
 
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
+        report = (f"Cruce de archivos:\n\nEmpleados pagados sin asistencia: {len(cruce_data['pagados_ausentes'])}\n"
+                  f"Empleados pagados sin tareas: {len(cruce_data['pagados_improductivos'])}\n"
+                  f"Empleados pagados sin asistencia ni tareas: {len(cruce_data['pagados_ausentes_improductivos'])}")
+        messagebox.showinfo("Reporte de Cruce", report)
 
+        self.create_cruce_pdf_report()
 
-    def create_papel_trabajo_nomina_escenario3(self):
-        custom_paragraph_style = ParagraphStyle(
-            'CustomParagraph',
-            fontName='Helvetica',
-            fontSize=16,
-            leading=20  # Esto controla el espacio entre líneas
-        )
+    def create_cruce_pdf_report(self):
+        """Genera un reporte PDF con los resultados del cruce de archivos."""
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['nomina'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Nómina", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de nómina para asegurar que todos los pagos 
-        correspondan a empleados reales y estén correctamente registrados.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de nómina y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se sospecha la existencia de empleados fantasmas en la nómina. La auditoría forense busca identificar y evaluar la magnitud de cualquier fraude.
-        Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron registros de nómina, contratos de trabajo, y extractos bancarios.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de nómina con la documentación de los empleados.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de nómina.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se detectaron trabajadores y cuentas duplicadas y cuentas bancarias que no corresponden a empleados reales, así como empleados fantasmas en la nómina. 
-        Insertar porcentaje de anomalías encontradas: {self.nomina_data['porcentaje_anomalías']}%.
-        Análisis de evidencias: Las discrepancias identificadas son materiales y sugieren la presencia de fraude o errores graves en el sistema de nómina.
-        Cronología de eventos: Las anomalías materiales se observaron consistentemente durante el periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las anomalías detectadas tienen un impacto financiero significativo y pueden haber comprometido la integridad financiera de la empresa.
-        Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves y potenciales sanciones.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Iniciar una revisión completa del sistema de nómina, incluyendo una auditoría externa, y tomar medidas disciplinarias contra los responsables.
-        Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías materiales en los registros de nómina que requieren una acción inmediata y significativa.
-        Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Anexar las tablas y gráficos
-        # Empleados duplicados por nombre
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados Duplicados por Nombre:", styles['Heading2']))
-        empleados_duplicados_nombre = [self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].columns.tolist()] + self.nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].values.tolist()
-        table_nombre = Table(empleados_duplicados_nombre, colWidths=[doc.width / len(empleados_duplicados_nombre[0])] * len(empleados_duplicados_nombre[0]), repeatRows=1)
-        table_nombre.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_nombre)
-
-        # Empleados duplicados por cuenta bancaria
-        elements.append(Paragraph("Empleados Duplicados por Cuenta Bancaria:", styles['Heading2']))
-        empleados_duplicados_cuenta = [self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].columns.tolist()] + self.nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].values.tolist()
-        table_cuenta = Table(empleados_duplicados_cuenta, colWidths=[doc.width / len(empleados_duplicados_cuenta[0])] * len(empleados_duplicados_cuenta[0]), repeatRows=1)
-        table_cuenta.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_cuenta)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Nombres Duplicados:", styles['Heading2']))
-        elements.append(Image("nombres_duplicados.png", 4 * inch, 4 * inch))
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Cuentas Bancarias Duplicadas:", styles['Heading2']))
-        elements.append(Image("cuentas_duplicadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
-
-
-    def generate_papel_trabajo_asistencia(self):
-        """Genera el papel de trabajo de asistencia basado en el análisis realizado."""
-        try:
-            if not hasattr(self, 'asistencia_data'):
-                messagebox.showerror("Error", "No se ha realizado ningún análisis de asistencia.")
-                return
-
-            # Calcular el porcentaje de anomalías
-            total_empleados = len(self.asistencia_data['df_asistencia'])
-            total_anomalías = len(self.asistencia_data['all_anomalías'])
-            porcentaje_anomalías = (total_anomalías / total_empleados) * 100 if total_empleados > 0 else 0
-
-            if porcentaje_anomalías == 0:
-                self.create_papel_trabajo_asistencia_escenario1(porcentaje_anomalías)
-            elif 0 < porcentaje_anomalías <= 15:
-                self.create_papel_trabajo_asistencia_escenario2(porcentaje_anomalías)
-            else:
-                self.create_papel_trabajo_asistencia_escenario3(porcentaje_anomalías)
-
-            messagebox.showinfo("Éxito", "Papel de trabajo de asistencia generado y guardado correctamente.")
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Se produjo un error al generar el papel de trabajo de asistencia: {str(e)}")
-
+        from reportes import crear_reporte_cruce_pdf
+        cruce_data, auditor = self.cruce_data, self.current_user
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_reporte_cruce_pdf(pdf_path, cruce_data, auditor, control=control,
+                                                    anexo=self._exportar_anexo('cruce', cruce_data, pdf_path, control)),
+            self._informar_reporte_generado, "Se produjo un error al generar el reporte PDF")
 
+    def setup_papel_trabajo_tab(self):
+        """Configura la pestaña de Papel de Trabajo."""
+        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Nómina", command=self.generate_papel_trabajo_nomina).pack(pady=10)
+        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Asistencia", command=self.generate_papel_trabajo_asistencia).pack(pady=10)
+        tk.Button(self.tab_papel_trabajo, text="Generar Papel de Trabajo de Productividad", command=self.generate_papel_trabajo_productividad).pack(pady=10)
 
+    def generate_papel_trabajo_nomina(self):
+        """Genera el papel de trabajo de nómina basado en el análisis realizado."""
+        if not hasattr(self, 'nomina_data'):
+            messagebox.showerror("Error", "No se ha realizado ningún análisis de nómina.")
+            return
 
-    def create_papel_trabajo_asistencia_escenario1(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de asistencia para el escenario 1."""
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['asistencia'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Asistencia", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de asistencia para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de asistencia y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia. 
-        No se encontraron anomalías significativas.
-        Alcance de la auditoría: Revisión de los registros de asistencia de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de asistencia proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de asistencia con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de asistencia.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: No se encontraron discrepancias significativas en los registros de asistencia. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Los registros de asistencia son coherentes con las políticas de la empresa.
-        Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la asistencia.
-        Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: No se requieren acciones correctivas.
-        Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de asistencia.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: No se encontraron anomalías en los registros de asistencia. La empresa mantiene un control adecuado sobre sus procesos de asistencia.
-        Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 20 días trabajados en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 20 Días Trabajados en algún mes:", styles['Heading2']))
-        
-        # Usar el DataFrame filtrado directamente
-        empleados_menos_20_dias = [self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_20_dias = Table(empleados_menos_20_dias, repeatRows=1)
-        table_menos_20_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_20_dias)
-
-        # Empleados con menos de 120 días trabajados en total
-        elements.append(Paragraph("Empleados con Menos de 120 Días Trabajados en total:", styles['Heading2']))
-        empleados_menos_120_dias = [self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_120_dias = Table(empleados_menos_120_dias, repeatRows=1)
-        table_menos_120_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_120_dias)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Días Trabajados:", styles['Heading2']))
-        elements.append(Image("dias_trabajados.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
+        from reportes import crear_papel_trabajo_nomina
+        nomina_data, auditor, nombre_archivo = self.nomina_data, self.current_user, basename(self.files['nomina'])
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_papel_trabajo_nomina(pdf_path, nomina_data, auditor, nombre_archivo, control=control,
+                                                      anexo=self._exportar_anexo('nomina', nomina_data, pdf_path, control)),
+            self._informar_papel_generado, "Se produjo un error al generar el papel de trabajo de nómina")
 
-        # Construir el documento PDF
-        doc.build(elements)
+    def _informar_papel_generado(self, pdf_path):
         messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
 
-    def create_papel_trabajo_asistencia_escenario2(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de asistencia para el escenario 2."""
-        pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-        if not pdf_path:
+    def generate_papel_trabajo_asistencia(self):
+        """Genera el papel de trabajo de asistencia basado en el análisis realizado."""
+        if not hasattr(self, 'asistencia_data'):
+            messagebox.showerror("Error", "No se ha realizado ningún análisis de asistencia.")
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['asistencia'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Asistencia", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de asistencia para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de asistencia y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia. 
-        Se encontraron algunas discrepancias menores.
-        Alcance de la auditoría: Revisión de los registros de asistencia de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de asistencia proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de asistencia con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de asistencia.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se encontraron algunas discrepancias menores en los registros de asistencia. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Aunque se detectaron algunas diferencias, estas no son significativas en términos de cumplimiento.
-        Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las discrepancias no afectan de manera significativa la situación de la empresa.
-        Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Revisar y ajustar los procesos de control de asistencia para corregir las discrepancias menores encontradas.
-        Mejoras en seguridad: Implementar una revisión mensual de los registros de asistencia para detectar y corregir errores menores de manera oportuna.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías menores en los registros de asistencia que no son significativas. Se recomienda hacer ajustes menores.
-        Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 20 días trabajados en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 20 Días Trabajados en algún mes:", styles['Heading2']))
-        
-        # Usar el DataFrame filtrado directamente
-        empleados_menos_20_dias = [self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_20_dias = Table(empleados_menos_20_dias, repeatRows=1)
-        table_menos_20_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_20_dias)
-
-        # Empleados con menos de 120 días trabajados en total
-        elements.append(Paragraph("Empleados con Menos de 120 Días Trabajados en total:", styles['Heading2']))
-        empleados_menos_120_dias = [self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_120_dias = Table(empleados_menos_120_dias, repeatRows=1)
-        table_menos_120_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_120_dias)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Días Trabajados:", styles['Heading2']))
-        elements.append(Image("dias_trabajados.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
-
-    def create_papel_trabajo_asistencia_escenario3(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de asistencia para el escenario 3."""
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['asistencia'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Asistencia", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de asistencia para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de asistencia y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia. 
-        Se encontraron anomalías significativas que requieren atención inmediata.
-        Alcance de la auditoría: Revisión de los registros de asistencia de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de asistencia proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de asistencia con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de asistencia.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se detectaron discrepancias significativas en los registros de asistencia. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Las discrepancias identificadas sugieren la necesidad de una revisión urgente del sistema de control de asistencia.
-        Cronología de eventos: Las anomalías se observaron consistentemente durante el periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las anomalías detectadas tienen un impacto significativo en la organización.
-        Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Iniciar una revisión completa del sistema de control de asistencia.
-        Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías significativas en los registros de asistencia que requieren acción inmediata.
-        Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 20 días trabajados en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 20 Días Trabajados en algún mes:", styles['Heading2']))
-        
-        # Usar el DataFrame filtrado directamente
-        empleados_menos_20_dias = [self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_20_dias = Table(empleados_menos_20_dias, repeatRows=1)
-        table_menos_20_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_20_dias)
-
-        # Empleados con menos de 120 días trabajados en total
-        elements.append(Paragraph("Empleados con Menos de 120 Días Trabajados en total:", styles['Heading2']))
-        empleados_menos_120_dias = [self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].columns.tolist()] + self.asistencia_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Total Días Trabajados']].values.tolist()
-        table_menos_120_dias = Table(empleados_menos_120_dias, repeatRows=1)
-        table_menos_120_dias.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_120_dias)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Días Trabajados:", styles['Heading2']))
-        elements.append(Image("dias_trabajados.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
+        from reportes import crear_papel_trabajo_asistencia
+        asistencia_data, auditor, nombre_archivo = self.asistencia_data, self.current_user, basename(self.files['asistencia'])
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_papel_trabajo_asistencia(pdf_path, asistencia_data, auditor, nombre_archivo, control=control,
+                                                      anexo=self._exportar_anexo('asistencia', asistencia_data, pdf_path, control)),
+            self._informar_papel_generado, "Se produjo un error al generar el papel de trabajo de asistencia")
 
     def generate_papel_trabajo_productividad(self):
         """Genera el papel de trabajo de productividad basado en el análisis realizado."""
@@ -1573,517 +701,19 @@ class AuditoriaApp:
             messagebox.showerror("Error", "No se ha realizado ningún análisis de productividad.")
             return
 
-        porcentaje_anomalías = (len(self.productividad_data['all_anomalías']) / len(self.productividad_data['df_productividad'])) * 100
-        if porcentaje_anomalías == 0:
-            self.create_papel_trabajo_productividad_escenario1(porcentaje_anomalías)
-        elif 0 < porcentaje_anomalías <= 15:
-            self.create_papel_trabajo_productividad_escenario2(porcentaje_anomalías)
-        else:
-            self.create_papel_trabajo_productividad_escenario3(porcentaje_anomalías)
-
-    def create_papel_trabajo_productividad_escenario1(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de productividad para el escenario 1."""
-        pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-        if not pdf_path:
-            return
-
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['productividad'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Productividad", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de productividad para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de productividad y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad. 
-        No se encontraron anomalías significativas.
-        Alcance de la auditoría: Revisión de los registros de productividad de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de productividad proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de productividad con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de productividad.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: No se encontraron discrepancias significativas en los registros de productividad. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Los registros de productividad son coherentes con las políticas de la empresa.
-        Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la productividad.
-        Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: No se requieren acciones correctivas.
-        Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de productividad.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: No se encontraron anomalías en los registros de productividad. La empresa mantiene un control adecuado sobre sus procesos de productividad.
-        Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 17 tareas realizadas en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 17 Tareas Realizadas en algún mes:", styles['Heading2']))
-        
-        empleados_menos_17_tareas = [self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_17_tareas = Table(empleados_menos_17_tareas, repeatRows=1)
-        table_menos_17_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_17_tareas)
-
-        # Empleados con menos de 102 tareas realizadas en total
-        elements.append(Paragraph("Empleados con Menos de 102 Tareas Realizadas en total:", styles['Heading2']))
-        empleados_menos_102_tareas = [self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_102_tareas = Table(empleados_menos_102_tareas, repeatRows=1)
-        table_menos_102_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_102_tareas)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Tareas Realizadas:", styles['Heading2']))
-        elements.append(Image("tareas_realizadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
-
-    def create_papel_trabajo_productividad_escenario2(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de productividad para el escenario 2."""
-        pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-        if not pdf_path:
-            return
-
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['productividad'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Productividad", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de productividad para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de productividad y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad. 
-        Se encontraron algunas discrepancias menores.
-        Alcance de la auditoría: Revisión de los registros de productividad de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de productividad proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de productividad con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de productividad.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se encontraron algunas discrepancias menores en los registros de productividad. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Aunque se detectaron algunas diferencias, estas no son significativas en términos de cumplimiento.
-        Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las discrepancias no afectan de manera significativa la situación de la empresa.
-        Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Revisar y ajustar los procesos de control de productividad para corregir las discrepancias menores encontradas.
-        Mejoras en seguridad: Implementar una revisión mensual de los registros de productividad para detectar y corregir errores menores de manera oportuna.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías menores en los registros de productividad que no son significativas. Se recomienda hacer ajustes menores.
-        Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 17 tareas realizadas en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 17 Tareas Realizadas en algún mes:", styles['Heading2']))
-        
-        empleados_menos_17_tareas = [self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_17_tareas = Table(empleados_menos_17_tareas, repeatRows=1)
-        table_menos_17_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_17_tareas)
-
-        # Empleados con menos de 102 tareas realizadas en total
-        elements.append(Paragraph("Empleados con Menos de 102 Tareas Realizadas en total:", styles['Heading2']))
-        empleados_menos_102_tareas = [self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_102_tareas = Table(empleados_menos_102_tareas, repeatRows=1)
-        table_menos_102_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_102_tareas)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Tareas Realizadas:", styles['Heading2']))
-        elements.append(Image("tareas_realizadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
-
-    def create_papel_trabajo_productividad_escenario3(self, porcentaje_anomalías):
-        custom_paragraph_style = ParagraphStyle(
-        'CustomParagraph',
-        fontName='Helvetica',
-        fontSize=16,
-        leading=20  # Esto controla el espacio entre líneas
-        )
-        """Genera el papel de trabajo de productividad para el escenario 3."""
         pdf_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not pdf_path:
             return
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        fecha = datetime.now().strftime("%Y-%m-%d")
-        auditor = self.current_user
-        nombre_archivo = basename(self.files['productividad'])
-
-        # Portada
-        elements.append(Paragraph(f"Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Productividad", styles['Title']))
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Fecha: {fecha}", custom_paragraph_style))
-        elements.append(Paragraph(f"Auditor/es: {auditor}", custom_paragraph_style))
-        elements.append(Paragraph(f"Cliente/Organización: {nombre_archivo}", custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Índice
-        indice_text = """
-        1. Portada<br/>
-        2. Índice<br/>
-        3. Objetivo del Papel de Trabajo<br/>
-        4. Antecedentes del Caso<br/>
-        5. Metodología<br/>
-        6. Hallazgos<br/>
-        7. Evaluación de Impacto<br/>
-        8. Recomendaciones<br/>
-        9. Conclusión<br/>
-        10. Anexos<br/>
-        11. Firma del Auditor
-        """
-        elements.append(Paragraph("Índice", styles['Title']))
-        elements.append(Paragraph(indice_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Objetivo del Papel de Trabajo
-        objetivo_text = """
-        Propósito: Verificar la exactitud y legitimidad de los registros de productividad para asegurar que todos los 
-        empleados cumplan con las políticas de la empresa.
-        Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar 
-        el proceso de revisión de productividad y los hallazgos correspondientes.
-        """
-        elements.append(Paragraph("Objetivo del Papel de Trabajo", styles['Title']))
-        elements.append(Paragraph(objetivo_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Antecedentes del Caso
-        antecedentes_text = """
-        Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad. 
-        Se encontraron anomalías significativas que requieren atención inmediata.
-        Alcance de la auditoría: Revisión de los registros de productividad de los últimos 6 meses.
-        """
-        elements.append(Paragraph("Antecedentes del Caso", styles['Title']))
-        elements.append(Paragraph(antecedentes_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Metodología
-        metodologia_text = """
-        Procedimientos de recopilación de evidencia: Se revisaron los registros de productividad proporcionados por el cliente.
-        Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
-        Análisis forense: Comparación detallada de los registros de productividad con las políticas de la empresa.
-        Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de productividad.
-        """
-        elements.append(Paragraph("Metodología", styles['Title']))
-        elements.append(Paragraph(metodologia_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Hallazgos
-        hallazgos_text = f"""
-        Evidencias clave: Se detectaron discrepancias significativas en los registros de productividad. 
-        Porcentaje de anomalías encontradas: {porcentaje_anomalías}%.
-        Análisis de evidencias: Las discrepancias identificadas sugieren la necesidad de una revisión urgente del sistema de control de productividad.
-        Cronología de eventos: Las anomalías se observaron consistentemente durante el periodo revisado.
-        """
-        elements.append(Paragraph("Hallazgos", styles['Title']))
-        elements.append(Paragraph(hallazgos_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Evaluación de Impacto
-        impacto_text = """
-        Impacto en la organización: Las anomalías detectadas tienen un impacto significativo en la organización.
-        Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves.
-        """
-        elements.append(Paragraph("Evaluación de Impacto", styles['Title']))
-        elements.append(Paragraph(impacto_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Recomendaciones
-        recomendaciones_text = """
-        Acciones correctivas: Iniciar una revisión completa del sistema de control de productividad.
-        Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
-        """
-        elements.append(Paragraph("Recomendaciones", styles['Title']))
-        elements.append(Paragraph(recomendaciones_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Conclusión
-        conclusion_text = """
-        Resumen: Se encontraron anomalías significativas en los registros de productividad que requieren acción inmediata.
-        Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
-        """
-        elements.append(Paragraph("Conclusión", styles['Title']))
-        elements.append(Paragraph(conclusion_text, custom_paragraph_style))
-        elements.append(PageBreak())
-
-        # Anexos
-        elements.append(Paragraph("Anexos", styles['Title']))
-        # Anexar las tablas y gráficos
-        # Empleados con menos de 17 tareas realizadas en algún mes
-        elements.append(PageBreak())
-        elements.append(Paragraph("Empleados con Menos de 17 Tareas Realizadas en algún mes:", styles['Heading2']))
-        
-        empleados_menos_17_tareas = [self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['all_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_17_tareas = Table(empleados_menos_17_tareas, repeatRows=1)
-        table_menos_17_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_17_tareas)
-
-        # Empleados con menos de 102 tareas realizadas en total
-        elements.append(Paragraph("Empleados con Menos de 102 Tareas Realizadas en total:", styles['Heading2']))
-        empleados_menos_102_tareas = [self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].columns.tolist()] + self.productividad_data['total_anomalías'][['ID de Empleado', 'Nombre', 'Productividad (Tareas - 6 meses)']].values.tolist()
-        table_menos_102_tareas = Table(empleados_menos_102_tareas, repeatRows=1)
-        table_menos_102_tareas.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table_menos_102_tareas)
-
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gráfico de Anomalías en Tareas Realizadas:", styles['Heading2']))
-        elements.append(Image("tareas_realizadas.png", 4 * inch, 4 * inch))
-
-        # Firma del Auditor
-        elements.append(PageBreak())
-        elements.append(Paragraph("Firma del Auditor", styles['Title']))
-        firma_text = f"""
-        Firma: {auditor}
-        """
-        elements.append(Paragraph(firma_text, custom_paragraph_style))
-
-        # Construir el documento PDF
-        doc.build(elements)
-        messagebox.showinfo("Éxito", f"Papel de trabajo PDF generado exitosamente en {pdf_path}.")
+        from reportes import crear_papel_trabajo_productividad
+        productividad_data, auditor, nombre_archivo = self.productividad_data, self.current_user, basename(self.files['productividad'])
+        self.ejecutar_en_segundo_plano(
+            lambda control: crear_papel_trabajo_productividad(pdf_path, productividad_data, auditor, nombre_archivo, control=control,
+                                                      anexo=self._exportar_anexo('productividad', productividad_data, pdf_path, control)),
+            self._informar_papel_generado, "Se produjo un error al generar el papel de trabajo de productividad")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = AuditoriaApp(root)
     root.mainloop()
@@ -0,0 +1,376 @@
+"""Análisis de nómina, asistencia y productividad sin dependencia de la interfaz gráfica."""
+import numpy as np
+import pandas as pd
+
+from perfil import etapa
+from reglas import REGLAS_PREDETERMINADAS
+from similitud import nombres_similares, cuentas_similares
+
+# Meses del formato original de los archivos; los análisis usan los que encuentren en cada archivo
+MESES = ['Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+# La máscara de anomalías tiene un bit por mes más el del total
+MAXIMO_MESES = 63
+# Columnas de los reportes con el total por períodos (regla total con ventana)
+COLUMNA_PERIODO = 'Período incumplido'
+COLUMNA_SUMA_PERIODO = 'Suma del período'
+
+
+def analizar_nomina(df_nomina, reglas=None, similares=True):
+    """Detecta empleados y cuentas bancarias duplicadas en la nómina.
+
+    reglas (ConjuntoReglas, las predeterminadas si es None) se guarda en el
+    resultado para elegir el escenario del papel de trabajo. Con similares se
+    buscan además nombres casi iguales y cuentas escritas con otro formato
+    (ver similitud.py); no cuentan para el porcentaje de anomalías.
+    """
+    with etapa("duplicados"):
+        duplicados_nombre = df_nomina[df_nomina.duplicated(subset='Nombre', keep=False)]
+        duplicados_cuenta = df_nomina[df_nomina.duplicated(subset='Cuenta Bancaria', keep=False)]
+
+    similares_nombre = similares_cuenta = None
+    if similares:
+        with etapa("nombres_similares"):
+            similares_nombre = nombres_similares(df_nomina)
+        with etapa("cuentas_similares"):
+            similares_cuenta = cuentas_similares(df_nomina)
+
+    total_rows = len(df_nomina)
+    anomalías = len(duplicados_nombre) + len(duplicados_cuenta)
+    porcentaje_anomalías = (anomalías / total_rows) * 100 if total_rows > 0 else 0
+
+    return {
+        'df_nomina': df_nomina,
+        'duplicados_nombre': duplicados_nombre,
+        'duplicados_cuenta': duplicados_cuenta,
+        'similares_nombre': similares_nombre,
+        'similares_cuenta': similares_cuenta,
+        'total_rows': total_rows,
+        'porcentaje_anomalías': porcentaje_anomalías,
+        'reglas': reglas or REGLAS_PREDETERMINADAS,
+    }
+
+
+class IndiceHash:
+    """Índice compacto de apariciones por hash de 64 bits de una columna.
+
+    Guarda los hashes distintos ordenados y, para cada uno, si apareció una vez o
+    más (saturado en 2): unos 9 bytes por clave distinta, sin importar cuántas filas
+    tenga el archivo. Los bloques agregados esperan en pendientes y se intercalan
+    con el índice cuando suman tantas claves como él, así que cada clave se reordena
+    unas pocas veces en total y no una vez por bloque.
+    """
+
+    def __init__(self):
+        self.claves = np.empty(0, dtype=np.uint64)
+        self.conteos = np.empty(0, dtype=np.uint8)
+        self._pendientes = []
+        self._claves_pendientes = 0
+
+    def agregar(self, hashes):
+        """Suma al índice las apariciones de un bloque de hashes."""
+        claves, conteos = np.unique(hashes, return_counts=True)
+        self._pendientes.append((claves, np.minimum(conteos, 2).astype(np.uint8)))
+        self._claves_pendientes += len(claves)
+        if self._claves_pendientes >= len(self.claves):
+            self._intercalar()
+
+    def _intercalar(self):
+        """Une los bloques pendientes al índice."""
+        if not self._pendientes:
+            return
+        claves = np.concatenate([self.claves] + [claves for claves, _ in self._pendientes])
+        conteos = np.concatenate([self.conteos] + [conteos for _, conteos in self._pendientes])
+        # Son tramos ya ordenados: el ordenamiento estable (timsort) los intercala en tiempo casi lineal
+        orden = np.argsort(claves, kind='stable')
+        claves, conteos = claves[orden], conteos[orden]
+        primeras = np.ones(len(claves), dtype=bool)
+        primeras[1:] = claves[1:] != claves[:-1]
+        inicios = np.flatnonzero(primeras)
+        self.claves = claves[inicios]
+        self.conteos = np.minimum(np.add.reduceat(conteos, inicios, dtype=np.int64), 2).astype(np.uint8)
+        self._pendientes, self._claves_pendientes = [], 0
+
+    def repetidos(self, hashes):
+        """Máscara de los hashes que aparecen más de una vez en el índice."""
+        self._intercalar()
+        if len(self.claves) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        posiciones = np.minimum(np.searchsorted(self.claves, hashes), len(self.claves) - 1)
+        return (self.claves[posiciones] == hashes) & (self.conteos[posiciones] > 1)
+
+
+def _hash_columna(serie):
+    # Se hashea el texto para que el mismo valor dé el mismo hash aunque cada bloque infiera otro tipo
+    return pd.util.hash_pandas_object(serie.astype('string'), index=False).to_numpy()
+
+
+def analizar_nomina_por_bloques(abrir_bloques, reglas=None):
+    """Detecta duplicados de nómina recorriendo el archivo por bloques, sin cargarlo entero.
+
+    abrir_bloques() debe devolver un iterador nuevo de bloques (DataFrames cuyo índice
+    es la posición global de cada fila); se llama dos veces. La primera pasada cuenta
+    los hashes de 'Nombre' y 'Cuenta Bancaria'; la segunda guarda solo las filas cuyo
+    hash se repite y las confirma con duplicated(), que descarta colisiones de hash.
+    El resultado es el mismo que el de analizar_nomina, con 'df_nomina' en None y
+    sin la búsqueda de similares (necesita todos los nombres a la vez).
+    """
+    indice_nombre, indice_cuenta = IndiceHash(), IndiceHash()
+    total_rows = 0
+    with etapa("duplicados_primera_pasada"):
+        for bloque in abrir_bloques():
+            total_rows += len(bloque)
+            indice_nombre.agregar(_hash_columna(bloque['Nombre']))
+            indice_cuenta.agregar(_hash_columna(bloque['Cuenta Bancaria']))
+
+    candidatos_nombre, candidatos_cuenta = [], []
+    with etapa("duplicados_segunda_pasada"):
+        for bloque in abrir_bloques():
+            candidatos_nombre.append(bloque[indice_nombre.repetidos(_hash_columna(bloque['Nombre']))])
+            candidatos_cuenta.append(bloque[indice_cuenta.repetidos(_hash_columna(bloque['Cuenta Bancaria']))])
+
+    duplicados_nombre = pd.concat(candidatos_nombre) if candidatos_nombre else pd.DataFrame(columns=['ID de Empleado', 'Nombre', 'Cuenta Bancaria'])
+    duplicados_cuenta = pd.concat(candidatos_cuenta) if candidatos_cuenta else pd.DataFrame(columns=['ID de Empleado', 'Nombre', 'Cuenta Bancaria'])
+    duplicados_nombre = duplicados_nombre[duplicados_nombre.duplicated(subset='Nombre', keep=False)]
+    duplicados_cuenta = duplicados_cuenta[duplicados_cuenta.duplicated(subset='Cuenta Bancaria', keep=False)]
+
+    anomalías = len(duplicados_nombre) + len(duplicados_cuenta)
+    porcentaje_anomalías = (anomalías / total_rows) * 100 if total_rows > 0 else 0
+
+    return {
+        'df_nomina': None,
+        'duplicados_nombre': duplicados_nombre,
+        'duplicados_cuenta': duplicados_cuenta,
+        'similares_nombre': None,
+        'similares_cuenta': None,
+        'total_rows': total_rows,
+        'porcentaje_anomalías': porcentaje_anomalías,
+        'reglas': reglas or REGLAS_PREDETERMINADAS,
+    }
+
+
+def columnas_numericas(df):
+    """Devuelve una función que convierte cada columna de df a float64 una sola vez."""
+    convertidas = {}
+
+    def valores(columna):
+        if columna not in convertidas:
+            convertidas[columna] = df[columna].to_numpy(dtype=np.float64, na_value=np.nan)
+        return convertidas[columna]
+    return valores
+
+
+def meses_archivo(df, reglas_datos):
+    """Meses del archivo según la plantilla de la regla mensual; ValueError si no hay ninguno."""
+    meses = reglas_datos.meses(df.columns)
+    if not meses:
+        raise ValueError(f"No se encuentran columnas de meses ('{reglas_datos.mes.columna}') en el archivo.")
+    if len(meses) > MAXIMO_MESES:
+        raise ValueError(f"El archivo tiene {len(meses)} meses; se analizan como máximo {MAXIMO_MESES}.")
+    return meses
+
+
+def tipo_mascara(bits):
+    """Entero sin signo más chico (uint8 a uint64) con lugar para bits condiciones."""
+    ancho = next(ancho for ancho in (1, 2, 4, 8) if ancho * 8 >= bits)
+    return np.dtype(f'u{ancho}')
+
+
+def _bits(condiciones):
+    """Empaqueta cada fila de condiciones (booleanas) en un entero sin signo del ancho justo."""
+    octetos = np.packbits(condiciones, axis=1, bitorder='little')
+    tipo = tipo_mascara(condiciones.shape[1])
+    octetos = np.pad(octetos, ((0, 0), (0, tipo.itemsize - octetos.shape[1])))
+    return np.ascontiguousarray(octetos).view(tipo.newbyteorder('<'))[:, 0].astype(tipo)
+
+
+def marcar_anomalias(df, reglas_datos, meses=MESES, valores=None):
+    """Calcula en una sola pasada la máscara de anomalías de cada fila.
+
+    reglas_datos es la ReglasDatos del conjunto (asistencia o productividad). El bit
+    i de la máscara indica el mes meses[i] y el bit len(meses) el total; el tipo
+    (uint8 a uint64) es el más chico que alcanza. valores permite compartir las
+    columnas ya convertidas (columnas_numericas) entre varios conjuntos de reglas
+    aplicados a la misma tabla.
+    """
+    valores = valores or columnas_numericas(df)
+    por_mes = np.column_stack([valores(columna) for columna in reglas_datos.columnas_mes(meses)])
+    if reglas_datos.total.ventana is None:
+        total = reglas_datos.total(valores(reglas_datos.total.columna))
+    else:
+        total = reglas_datos.total_por_ventanas(por_mes)
+    return _bits(np.column_stack([reglas_datos.mes(por_mes), total]))
+
+
+def orden_anomalias(mascara, meses=len(MESES)):
+    """Posiciones de las filas con alguna anomalía, en el orden de los reportes.
+
+    Primero las filas marcadas en el primer mes, luego las que lo están por primera
+    vez en el segundo, y así sucesivamente; al final las que solo fallan en el total.
+    Dentro de cada grupo se respeta el orden del archivo.
+    """
+    posiciones = np.flatnonzero(mascara)
+    octetos = mascara[posiciones].astype(mascara.dtype.newbyteorder('<')).view(np.uint8).reshape(len(posiciones), mascara.dtype.itemsize)
+    bits_mes = np.unpackbits(octetos, axis=1, bitorder='little')[:, :meses]
+    # Primer mes marcado de cada fila; las que no tienen ninguno van al final
+    primer_mes = np.where(bits_mes.any(axis=1), bits_mes.argmax(axis=1), meses)
+    return posiciones[np.argsort(primer_mes, kind='stable')]
+
+
+def meses_marcados(mascara_fila, meses=MESES):
+    """Nombres de los meses (y 'Total') que dispararon la anomalía de una fila."""
+    nombres = [mes for i, mes in enumerate(meses) if mascara_fila >> i & 1]
+    if mascara_fila >> len(meses) & 1:
+        nombres.append('Total')
+    return nombres
+
+
+def periodos_incumplidos(df, reglas_datos, meses):
+    """Primer período de reglas_datos.total.ventana meses en que cada fila de df incumple la regla total.
+
+    Devuelve (períodos, sumas): el texto del período ('Ene a Jun') y la suma de sus
+    meses, vacíos en las filas que cumplen en todos los períodos.
+    """
+    valores = columnas_numericas(df)
+    columnas = reglas_datos.columnas_mes(meses)
+    por_mes = np.column_stack([valores(columna) for columna in columnas])
+    sumas, incumple = reglas_datos.incumplimientos_por_ventanas(por_mes)
+    inicio = incumple.argmax(axis=1)
+    fallan = incumple.any(axis=1)
+    ventana = reglas_datos.total.ventana
+    textos = [meses[i] if ventana == 1 else f"{meses[i]} a {meses[i + ventana - 1]}" for i in range(len(meses) - ventana + 1)]
+    periodos = pd.array([textos[i] if falla else None for i, falla in zip(inicio.tolist(), fallan.tolist())], dtype='string')
+    # El tipo depende solo de las columnas: los bloques de un anexo Parquet comparten esquema
+    enteros = all(pd.api.types.is_integer_dtype(df[columna]) for columna in columnas)
+    suma = np.where(fallan, sumas[np.arange(len(df)), inicio], np.nan)
+    return periodos, pd.array(suma, dtype='Int64' if enteros else 'Float64')
+
+
+def tabla_total(df, reglas_datos, meses, posiciones=None):
+    """ID, nombre y total de las filas de df (o de las de df en posiciones), como se muestran en los reportes.
+
+    El total es la columna de totales del archivo o, si la regla total tiene
+    ventana, el primer período incumplido y su suma (COLUMNA_PERIODO y
+    COLUMNA_SUMA_PERIODO, vacías en las filas que cumplen).
+    """
+    columnas = ['ID de Empleado', 'Nombre']
+    if reglas_datos.total.ventana is None:
+        columnas.append(reglas_datos.total.columna)
+        return df[columnas] if posiciones is None else seleccionar_filas(df, posiciones, columnas)
+    if posiciones is not None:
+        df = seleccionar_filas(df, posiciones, columnas + reglas_datos.columnas_mes(meses))
+    periodos, sumas = periodos_incumplidos(df, reglas_datos, meses)
+    return df[columnas].assign(**{COLUMNA_PERIODO: periodos, COLUMNA_SUMA_PERIODO: sumas})
+
+
+def filas_repetidas(df, posiciones, huellas=None):
+    """Máscara de las filas de df en posiciones idénticas a otra anterior de la misma lista.
+
+    Con huellas (hash de cada fila de df, ver incremental.huellas_filas) solo se
+    comparan de verdad las filas cuyo hash se repite en la lista, que descarta las colisiones.
+    """
+    if huellas is None:
+        return df.iloc[posiciones].duplicated().to_numpy()
+    repetidas = np.zeros(len(posiciones), dtype=bool)
+    candidatas = pd.Series(huellas[posiciones]).duplicated(keep=False).to_numpy()
+    repetidas[candidatas] = df.iloc[posiciones[candidatas]].duplicated().to_numpy()
+    return repetidas
+
+
+def analizar_asistencia(df_asistencia, reglas=None, valores=None, mascara=None, huellas=None):
+    """Detecta empleados con pocos días trabajados por mes o en total.
+
+    reglas es el ConjuntoReglas a aplicar (las predeterminadas si es None). Se
+    evalúan todos los meses con columna en el archivo, en una sola pasada.
+    mascara (la de marcar_anomalias) y huellas (ver filas_repetidas) se pasan
+    cuando ya se calcularon, como en el análisis incremental.
+    """
+    reglas = reglas or REGLAS_PREDETERMINADAS
+    meses = meses_archivo(df_asistencia, reglas.asistencia)
+    if mascara is None:
+        with etapa("anomalias_asistencia"):
+            mascara = marcar_anomalias(df_asistencia, reglas.asistencia, meses, valores)
+    with etapa("orden_anomalias"):
+        indices_anomalías = orden_anomalias(mascara, len(meses))
+        # Como antes, una fila idéntica a otra ya listada no se repite
+        indices_anomalías = indices_anomalías[~filas_repetidas(df_asistencia, indices_anomalías, huellas)]
+    all_anomalías = df_asistencia.iloc[indices_anomalías]
+    total_anomalías = df_asistencia[(mascara >> len(meses) & 1).astype(bool)]
+
+    # Guardar solo las columnas necesarias para el reporte (con ventana, el archivo puede no tener totales)
+    columnas = [columna for columna in ('ID de Empleado', 'Nombre', reglas.asistencia.total.columna)
+                if columna in df_asistencia.columns]
+    return {
+        'df_asistencia': df_asistencia[columnas].sort_values(by='Nombre'),
+        'total_anomalías': total_anomalías,
+        'all_anomalías': all_anomalías,
+        # Máscara de meses (bit i el mes meses[i]) y total (bit len(meses)) por fila, con el índice del archivo
+        'mascara': pd.Series(mascara, index=df_asistencia.index),
+        'meses': meses,
+        'reglas': reglas,
+    }
+
+
+def analizar_productividad(df_productividad, reglas=None, valores=None, mascara=None, huellas=None):
+    """Detecta empleados con pocas tareas realizadas por mes o en total.
+
+    No copia filas: devuelve las posiciones (en df_productividad) de los empleados
+    con alguna anomalía, en el orden de los reportes, las de los que fallan en el
+    total y la máscara de cada fila (bit i el mes meses[i], bit len(meses) el
+    total), una Series con el índice del archivo como en analizar_asistencia.
+    Las filas se obtienen al generar el reporte con seleccionar_filas(). mascara
+    y huellas son como en analizar_asistencia.
+    """
+    reglas = reglas or REGLAS_PREDETERMINADAS
+    meses = meses_archivo(df_productividad, reglas.productividad)
+    if mascara is None:
+        with etapa("anomalias_productividad"):
+            mascara = marcar_anomalias(df_productividad, reglas.productividad, meses, valores)
+
+    with etapa("orden_anomalias"):
+        indices_anomalías = orden_anomalias(mascara, len(meses))
+        # Como antes, una fila idéntica a otra ya listada no se repite
+        indices_anomalías = indices_anomalías[~filas_repetidas(df_productividad, indices_anomalías, huellas)]
+
+    return {
+        'df_productividad': df_productividad,  # Guardar todo el DataFrame original
+        'mascara': pd.Series(mascara, index=df_productividad.index),
+        'indices_anomalías': indices_anomalías,
+        'indices_total': np.flatnonzero(mascara >> len(meses) & 1),
+        'meses': meses,
+        'reglas': reglas,
+    }
+
+
+def evaluar_conjuntos(df, tipo, conjuntos):
+    """Aplica varios conjuntos de reglas a una misma tabla ya cargada.
+
+    tipo es 'asistencia' o 'productividad'. Cada columna se convierte una sola vez
+    y se reutiliza en todos los conjuntos. Devuelve {nombre del conjunto: resultado}.
+    """
+    analizadores = {'asistencia': analizar_asistencia, 'productividad': analizar_productividad}
+    valores = columnas_numericas(df)
+    return {reglas.nombre: analizadores[tipo](df, reglas, valores) for reglas in conjuntos}
+
+
+def seleccionar_filas(df, posiciones, columnas):
+    """Filas de df en las posiciones dadas, copiando solo las columnas pedidas."""
+    return df.iloc[posiciones, df.columns.get_indexer(columnas)]
+
+
+def porcentaje_asistencia(asistencia_data):
+    """Calcula el porcentaje de empleados con anomalías de asistencia."""
+    total_empleados = len(asistencia_data['df_asistencia'])
+    total_anomalías = len(asistencia_data['all_anomalías'])
+    return (total_anomalías / total_empleados) * 100 if total_empleados > 0 else 0
+
+
+def porcentaje_productividad(productividad_data):
+    """Calcula el porcentaje de empleados con anomalías de productividad."""
+    total_empleados = len(productividad_data['df_productividad'])
+    total_anomalías = len(productividad_data['indices_anomalías'])
+    return (total_anomalías / total_empleados) * 100 if total_empleados > 0 else 0
+
+
+def seleccionar_escenario(porcentaje_anomalías, reglas=None):
+    """Devuelve el escenario (1, 2 o 3) del papel de trabajo según el porcentaje de anomalías."""
+    return (reglas or REGLAS_PREDETERMINADAS).escenario(porcentaje_anomalías)
@@ -0,0 +1,206 @@
+"""Anexos de datos: los listados completos de duplicados y anomalías fuera del PDF.
+
+Un PDF con cien mil filas tarda en generarse y nadie puede filtrarlo ni cruzarlo.
+exportar_anexo escribe los listados de un análisis, por bloques, en Excel (una
+hoja por listado, o varias si no entra en una), CSV o Parquet (un archivo por
+listado) junto al reporte; los PDF muestran entonces solo las primeras filas y
+enlazan al anexo.
+
+Excel se escribe con xlsxwriter en modo constant_memory si está instalado y, si
+no, con el modo write_only de openpyxl; los dos vuelcan cada fila al disco sin
+guardar la hoja en memoria.
+"""
+import os
+
+import numpy as np
+
+from analisis import COLUMNA_PERIODO, COLUMNA_SUMA_PERIODO, meses_marcados, periodos_incumplidos
+from perfil import etapa
+from reglas import reglas_de
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATOS_ANEXO = ('xlsx', 'csv', 'parquet')
+FILAS_POR_BLOQUE = 50_000
+# Filas de una hoja de Excel; los listados más largos siguen en hojas nuevas
+MAXIMO_FILAS_HOJA = 1_048_576
+COLUMNA_MESES = 'Meses con anomalía'
+
+# Nombre de cada listado (es también el sufijo de sus tablas en los PDF) y su título
+LISTADOS = {
+    'nomina': {'duplicados_nombre': "Duplicados por nombre", 'duplicados_cuenta': "Duplicados por cuenta",
+               'similares_nombre': "Nombres parecidos", 'similares_cuenta': "Cuentas con otro formato"},
+    'asistencia': {'anomalias': "Anomalías", 'anomalias_total': "Anomalías en el total"},
+    'productividad': {'anomalias': "Anomalías", 'anomalias_total': "Anomalías en el total"},
+    'cruce': {'pagados_ausentes': "Pagados sin asistencia", 'pagados_improductivos': "Pagados sin tareas"},
+}
+
+
+def _listados(tipo, data):
+    """Listados de tipo presentes en data (la búsqueda de similares de nómina es opcional)."""
+    return {listado: titulo for listado, titulo in LISTADOS[tipo].items()
+            if tipo != 'nomina' or data.get(listado) is not None}
+
+
+def _texto_meses(mascaras, meses):
+    """Columna legible con los meses (y 'Total') marcados en cada máscara."""
+    textos = {m: ", ".join(meses_marcados(int(m), meses)) for m in np.unique(mascaras)}
+    return [textos[m] for m in mascaras]
+
+
+def _con_meses(parte, tipo, data, mascaras):
+    """Agrega a las filas los meses con anomalía y, si el total va por períodos, el primero incumplido."""
+    columnas = {COLUMNA_MESES: _texto_meses(mascaras, data['meses'])}
+    reglas = reglas_de(data, tipo)
+    if reglas.total.ventana is not None:
+        columnas[COLUMNA_PERIODO], columnas[COLUMNA_SUMA_PERIODO] = periodos_incumplidos(parte, reglas, data['meses'])
+    return parte.assign(**columnas)
+
+
+def _bloques_listado(tipo, data, listado):
+    """Genera el listado por bloques de FILAS_POR_BLOQUE filas sin copiar la tabla entera.
+
+    Siempre produce al menos un bloque (vacío si no hay filas) para escribir los encabezados.
+    """
+    if tipo in ('nomina', 'cruce'):
+        df = data[listado]
+        for inicio in range(0, max(len(df), 1), FILAS_POR_BLOQUE):
+            yield df.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+    elif tipo == 'asistencia':
+        df = data['all_anomalías' if listado == 'anomalias' else 'total_anomalías']
+        for inicio in range(0, max(len(df), 1), FILAS_POR_BLOQUE):
+            parte = df.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+            yield _con_meses(parte, tipo, data, data['mascara'].loc[parte.index].to_numpy())
+    else:
+        posiciones = data['indices_anomalías' if listado == 'anomalias' else 'indices_total']
+        for inicio in range(0, max(len(posiciones), 1), FILAS_POR_BLOQUE):
+            trozo = posiciones[inicio:inicio + FILAS_POR_BLOQUE]
+            parte = data['df_productividad'].iloc[trozo]
+            yield _con_meses(parte, tipo, data, data['mascara'].iloc[trozo].to_numpy())
+
+
+def _filas(parte):
+    # Valores nativos de Python, con None en las celdas vacías (Excel no admite NaN)
+    return parte.astype(object).where(parte.notna(), None).values.tolist()
+
+
+def _nombre_hoja(titulo, numero):
+    # Excel limita los nombres de hoja a 31 caracteres
+    sufijo = f" ({numero})" if numero > 1 else ""
+    return titulo[:31 - len(sufijo)] + sufijo
+
+
+def _filas_xlsx(tipo, data, listado, titulo):
+    """Genera (hoja, fila, valores) del listado, con el encabezado al comienzo de cada hoja.
+
+    Un listado que no entra en una hoja (MAXIMO_FILAS_HOJA filas contando el
+    encabezado) sigue en 'titulo (2)', 'titulo (3)'...
+    """
+    numero, fila, encabezado = 1, 0, None
+    hoja = _nombre_hoja(titulo, numero)
+    for parte in _bloques_listado(tipo, data, listado):
+        if encabezado is None:
+            encabezado = [str(columna) for columna in parte.columns]
+            yield hoja, 0, encabezado
+            fila = 1
+        for valores in _filas(parte):
+            if fila == MAXIMO_FILAS_HOJA:
+                numero += 1
+                hoja = _nombre_hoja(titulo, numero)
+                yield hoja, 0, encabezado
+                fila = 1
+            yield hoja, fila, valores
+            fila += 1
+
+
+def _escribir_xlsx(ruta, tipo, data):
+    listados = _listados(tipo, data)
+    if xlsxwriter is not None:
+        libro = xlsxwriter.Workbook(ruta, {'constant_memory': True})
+        for listado, titulo in listados.items():
+            nombre = hoja = None
+            for nombre_fila, fila, valores in _filas_xlsx(tipo, data, listado, titulo):
+                if nombre_fila != nombre:
+                    nombre, hoja = nombre_fila, libro.add_worksheet(nombre_fila)
+                # xlsxwriter no avisa con una excepción: devuelve -1 si la fila no entra en la hoja
+                if hoja.write_row(fila, 0, valores) == -1:
+                    libro.close()
+                    raise ValueError(f"No se pudo escribir la fila {fila + 1} de la hoja '{nombre}' del anexo.")
+        libro.close()
+        return
+
+    from openpyxl import Workbook
+    libro = Workbook(write_only=True)
+    for listado, titulo in listados.items():
+        nombre = hoja = None
+        for nombre_fila, _, valores in _filas_xlsx(tipo, data, listado, titulo):
+            if nombre_fila != nombre:
+                nombre, hoja = nombre_fila, libro.create_sheet(nombre_fila)
+            hoja.append(valores)
+    libro.save(ruta)
+
+
+def _escribir_csv(ruta, tipo, data, listado):
+    modo = 'w'
+    for parte in _bloques_listado(tipo, data, listado):
+        parte.to_csv(ruta, mode=modo, header=(modo == 'w'), index=False, encoding='utf-8-sig' if modo == 'w' else 'utf-8')
+        modo = 'a'
+
+
+def _escribir_parquet(ruta, tipo, data, listado):
+    if pq is None:
+        raise ValueError("Para exportar anexos en Parquet hay que instalar pyarrow.")
+    escritor = None
+    try:
+        for parte in _bloques_listado(tipo, data, listado):
+            tabla = pa.Table.from_pandas(parte, preserve_index=False,
+                                         schema=escritor.schema if escritor else None)
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def exportar_anexo(tipo, data, ruta_base, formato='xlsx'):
+    """Escribe los listados completos de un análisis y devuelve {listado: archivo}.
+
+    tipo es 'nomina', 'asistencia', 'productividad' o 'cruce' y data el resultado de su
+    análisis. Con 'xlsx' se crea ruta_base.xlsx con una hoja por listado (y
+    hojas 'Título (2)', 'Título (3)'... para los que pasan el límite de Excel); con
+    'csv' o 'parquet', un archivo ruta_base_<listado>.<formato> por listado. Los
+    listados de asistencia y productividad incluyen los meses que dispararon
+    cada anomalía y, si la regla total va por períodos, el primero incumplido.
+    """
+    if formato not in FORMATOS_ANEXO:
+        raise ValueError(f"Formato de anexo no soportado: {formato}")
+    with etapa(f"anexo_{formato}"):
+        if formato == 'xlsx':
+            ruta = f"{ruta_base}.xlsx"
+            _escribir_xlsx(ruta, tipo, data)
+            return {listado: ruta for listado in _listados(tipo, data)}
+
+        archivos = {}
+        for listado in _listados(tipo, data):
+            ruta = f"{ruta_base}_{listado}.{formato}"
+            if formato == 'csv':
+                _escribir_csv(ruta, tipo, data, listado)
+            else:
+                _escribir_parquet(ruta, tipo, data, listado)
+            archivos[listado] = ruta
+        return archivos
+
+
+def ruta_anexo(pdf_path):
+    """Ruta base del anexo que acompaña a un PDF: mismo nombre con el sufijo _anexo."""
+    return f"{os.path.splitext(pdf_path)[0]}_anexo"
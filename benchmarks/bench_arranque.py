@@ -0,0 +1,94 @@
+"""Mide cuánto tarda la interfaz en mostrar la ventana de inicio de sesión y falla si supera el presupuesto.
+
+Ejecuta `python -X importtime -c "import README"` en un proceso nuevo, lista las
+importaciones más costosas y comprueba que pandas, numpy, matplotlib y reportlab
+no se importen antes del inicio de sesión. Si hay pantalla, mide además el tiempo
+desde que arranca el intérprete hasta que la ventana de login queda dibujada
+(mediana de varias ejecuciones):
+
+    python benchmarks/bench_arranque.py --presupuesto 0.5
+
+Sale con código 1 si se supera el presupuesto o se importa un módulo pesado.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS_PESADOS = ('pandas', 'numpy', 'matplotlib', 'reportlab')
+
+VENTANA_LOGIN = """
+import tkinter as tk
+import README
+root = tk.Tk()
+app = README.AuditoriaApp(root, precargar=False)
+root.update()
+root.destroy()
+"""
+
+
+def importaciones():
+    """Devuelve [(módulo, microsegundos acumulados, nivel)] de `import README` según -X importtime."""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", "import README"],
+                             cwd=DIRECTORIO, capture_output=True, text=True, check=True)
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        filas.append((nombre.strip(), int(acumulado), nivel))
+    return filas
+
+
+def tiempo_ventana_login():
+    """Segundos desde el arranque del intérprete hasta dibujar la ventana de login (None si no hay pantalla)."""
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-c", VENTANA_LOGIN], cwd=DIRECTORIO, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        return None
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presupuesto", type=float, default=0.5, help="Segundos máximos hasta la ventana de login")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Importaciones más costosas a listar")
+    args = parser.parse_args()
+
+    filas = importaciones()
+    total = next(acumulado for nombre, acumulado, _ in filas if nombre == "README")
+    print(f"import README: {total / 1000:.1f} ms")
+    print("Importaciones de primer nivel más costosas:")
+    for nombre, acumulado, _ in sorted((f for f in filas if f[2] <= 1 and f[0] != "README"), key=lambda f: -f[1])[:args.top]:
+        print(f"  {nombre:<40} {acumulado / 1000:8.1f} ms")
+
+    fallos = []
+    pesados = sorted({nombre.split('.')[0] for nombre, _, _ in filas} & set(MODULOS_PESADOS))
+    if pesados:
+        fallos.append(f"se importan antes del login: {', '.join(pesados)}")
+
+    tiempos = [tiempo_ventana_login() for _ in range(args.repeticiones)]
+    if None in tiempos:
+        # Sin pantalla no se puede crear la ventana: el presupuesto se aplica a la importación
+        print("Sin pantalla disponible; se compara el presupuesto con el tiempo de importación.")
+        segundos = total / 1e6
+    else:
+        segundos = statistics.median(tiempos)
+        print(f"Ventana de login: {segundos * 1000:.1f} ms (mediana de {args.repeticiones})")
+    if segundos > args.presupuesto:
+        fallos.append(f"{segundos:.3f} s supera el presupuesto de {args.presupuesto:.3f} s")
+
+    for fallo in fallos:
+        print(f"FALLA: {fallo}")
+    if not fallos:
+        print(f"OK: dentro del presupuesto de {args.presupuesto:.3f} s")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Compara la lectura completa con openpyxl contra la lectura proyectada de carga.leer_tabla.
+
+Genera un archivo de asistencia sintético (500 000 filas por defecto, con columnas
+que los análisis no usan) y mide tiempo y memoria del DataFrame resultante:
+
+    python benchmarks/bench_carga.py --filas 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis import MESES  # noqa: E402
+from cache_tablas import CacheTablas  # noqa: E402
+from carga import MOTOR_EXCEL, leer_tabla  # noqa: E402
+
+
+def generar_asistencia(ruta, filas):
+    """Escribe un archivo de asistencia con las columnas del análisis y algunas columnas de relleno."""
+    rng = np.random.default_rng(0)
+    datos = {
+        'ID de Empleado': np.arange(filas),
+        'Nombre': [f"Empleado {i % (filas // 2 or 1)}" for i in range(filas)],
+        'Departamento': rng.choice(['Ventas', 'Operaciones', 'Finanzas', 'Logística'], filas),
+        'Cargo': rng.choice(['Analista', 'Asistente', 'Supervisor', 'Gerente'], filas),
+        'Observaciones': ['Sin observaciones'] * filas,
+    }
+    for mes in MESES:
+        datos[f'Días Trabajados en {mes}'] = rng.integers(15, 24, filas)
+    df = pd.DataFrame(datos)
+    df['Total Días Trabajados'] = df[[f'Días Trabajados en {mes}' for mes in MESES]].sum(axis=1)
+    df.to_excel(ruta, index=False)
+
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    df = funcion()
+    segundos = time.perf_counter() - inicio
+    memoria = df.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{nombre:<45} {segundos:8.2f} s {memoria:10.1f} MiB  ({df.shape[1]} columnas)")
+    return segundos, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=500_000)
+    parser.add_argument("--archivo", help="Archivo de asistencia existente; si no se indica se genera uno")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = os.path.join(directorio, "asistencia.xlsx")
+            print(f"Generando {args.filas} filas en {ruta}...")
+            generar_asistencia(ruta, args.filas)
+
+        sin_cache = CacheTablas(activa=False)
+        base = medir("pd.read_excel (openpyxl, todas las columnas)", lambda: pd.read_excel(ruta, engine='openpyxl'))
+        proyectada = medir(f"leer_tabla ({MOTOR_EXCEL}, esquema de asistencia)",
+                           lambda: leer_tabla(ruta, 'asistencia', sin_cache))
+
+        cache = CacheTablas(os.path.join(directorio, "cache"))
+        leer_tabla(ruta, 'asistencia', cache)
+        medir("leer_tabla desde la caché columnar", lambda: leer_tabla(ruta, 'asistencia', cache))
+
+    print(f"\nAceleración de la lectura: {base[0] / proyectada[0]:.1f}x; "
+          f"memoria del DataFrame: {base[1] / proyectada[1]:.1f}x menor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Mide lo que cuesta reconstruir los estilos de reportlab en cada documento.
+
+Genera el mismo reporte pequeño muchas veces en memoria, primero creando la hoja
+de estilos, el ParagraphStyle y los TableStyle dentro de cada documento (como se
+hacía antes) y después con los estilos compartidos de estilos.py:
+
+    python benchmarks/bench_estilos.py --documentos 500
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estilos import ESTILO_TABLA, ESTILO_TEXTO, ESTILO_TITULO, ESTILO_SUBTITULO  # noqa: E402
+
+FILAS = [['ID de Empleado', 'Nombre', 'Total Días Trabajados']] + [[i, f"Empleado {i}", 110 + i % 10] for i in range(20)]
+COMANDOS_TABLA = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+]
+
+
+def estilos_por_documento():
+    """Los estilos como los creaba cada función de reportes.py."""
+    styles = getSampleStyleSheet()
+    texto = ParagraphStyle('CustomParagraph', fontName='Helvetica', fontSize=16, leading=20)
+    return styles['Title'], styles['Heading2'], texto, [TableStyle(COMANDOS_TABLA) for _ in range(2)]
+
+
+def estilos_compartidos():
+    return ESTILO_TITULO, ESTILO_SUBTITULO, ESTILO_TEXTO, [ESTILO_TABLA, ESTILO_TABLA]
+
+
+def generar(obtener_estilos, construir):
+    titulo, subtitulo, texto, estilos_tabla = obtener_estilos()
+    elements = [Paragraph("Análisis de Asistencia - Anomalías Identificadas", titulo),
+                Paragraph("Auditor/es: Prueba", texto)]
+    for estilo_tabla in estilos_tabla:
+        elements.append(Paragraph("Empleados con anomalías:", subtitulo))
+        table = Table(FILAS, repeatRows=1)
+        table.setStyle(estilo_tabla)
+        elements.append(table)
+    if construir:
+        SimpleDocTemplate(io.BytesIO(), pagesize=letter).build(elements)
+
+
+def medir(nombre, documentos, obtener_estilos, construir):
+    generar(obtener_estilos, construir)  # Calentamiento: fuentes e importaciones perezosas de reportlab
+    inicio = time.perf_counter()
+    for _ in range(documentos):
+        generar(obtener_estilos, construir)
+    por_documento = (time.perf_counter() - inicio) / documentos * 1000
+    print(f"{nombre:<40} {por_documento:8.3f} ms por documento")
+    return por_documento
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documentos", type=int, default=500)
+    args = parser.parse_args()
+
+    print("Solo preparación de flowables:")
+    antes = medir("  estilos creados en cada documento", args.documentos, estilos_por_documento, False)
+    despues = medir("  estilos compartidos (estilos.py)", args.documentos, estilos_compartidos, False)
+    print("Documento completo (build en memoria):")
+    antes_pdf = medir("  estilos creados en cada documento", args.documentos, estilos_por_documento, True)
+    despues_pdf = medir("  estilos compartidos (estilos.py)", args.documentos, estilos_compartidos, True)
+
+    print(f"\nAhorro por documento: {antes - despues:.3f} ms en la preparación, "
+          f"{antes_pdf - despues_pdf:.3f} ms ({(antes_pdf - despues_pdf) / antes_pdf:.0%}) en un reporte pequeño completo")
+
+
+if __name__ == "__main__":
+    main()
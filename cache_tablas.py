@@ -0,0 +1,213 @@
+"""Caché en disco, en formato columnar, de las hojas de cálculo ya leídas.
+
+Leer un .xlsx con openpyxl es la etapa más lenta del análisis; una vez leída, cada
+hoja se guarda como Parquet (o Feather) y las lecturas siguientes del mismo archivo
+se resuelven desde la caché. La clave combina ruta, fecha de modificación, tamaño y
+un hash del contenido, así que cualquier cambio en el archivo invalida la entrada.
+
+Para los archivos a los que solo se agregan filas al final (un CSV que crece cada
+mes) se guarda además un registro con el tamaño y el hash de la última lectura: si
+el archivo nuevo empieza exactamente con esos bytes, cargar lee solo la parte
+agregada y la suma a la entrada anterior.
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+from perfil import etapa
+
+try:
+    import pyarrow  # noqa: F401  (motor de Parquet y Feather)
+except ImportError:
+    pyarrow = None
+
+DIRECTORIO_PREDETERMINADO = os.environ.get(
+    "AUDITORIA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "auditoria", "tablas"))
+LIMITE_PREDETERMINADO = 2 * 1024 ** 3  # 2 GB
+EXTENSIONES = {'parquet': '.parquet', 'feather': '.feather'}
+
+
+class CacheTablas:
+    """Caché de DataFrames en Parquet/Feather con límite de tamaño y expulsión LRU."""
+
+    def __init__(self, directorio=DIRECTORIO_PREDETERMINADO, limite_bytes=LIMITE_PREDETERMINADO,
+                 formato='parquet', activa=True):
+        if formato not in EXTENSIONES:
+            raise ValueError(f"Formato de caché no soportado: {formato}")
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        self.formato = formato
+        self.activa = activa and pyarrow is not None
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def hash_contenido(self, ruta):
+        """Hash del contenido del archivo, memorizado por (ruta, fecha de modificación, tamaño)."""
+        estado = os.stat(ruta)
+        identidad = (os.path.abspath(ruta), estado.st_mtime_ns, estado.st_size)
+        with self._lock:
+            if identidad in self._hashes:
+                return identidad, self._hashes[identidad]
+
+        with etapa("hash_archivo"):
+            contenido = self.hash_prefijo(ruta, estado.st_size)
+        with self._lock:
+            self._hashes[identidad] = contenido
+        return identidad, contenido
+
+    @staticmethod
+    def hash_prefijo(ruta, tamano):
+        """Hash de los primeros tamano bytes del archivo."""
+        h = hashlib.blake2b(digest_size=20)
+        with open(ruta, 'rb') as f:
+            while tamano > 0:
+                bloque = f.read(min(tamano, 1024 * 1024))
+                if not bloque:
+                    break
+                h.update(bloque)
+                tamano -= len(bloque)
+        return h.hexdigest()
+
+    def clave(self, ruta, variante=""):
+        """Clave de la entrada: ruta + fecha de modificación + tamaño + hash del contenido + variante de lectura."""
+        (ruta_absoluta, mtime, tamano), contenido = self.hash_contenido(ruta)
+        texto = f"{ruta_absoluta}|{mtime}|{tamano}|{contenido}|{variante}"
+        return hashlib.blake2b(texto.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _archivo(self, clave):
+        return os.path.join(self.directorio, clave + EXTENSIONES[self.formato])
+
+    def _registro(self, ruta, variante):
+        texto = f"{os.path.abspath(ruta)}|{variante}"
+        clave = hashlib.blake2b(texto.encode('utf-8'), digest_size=20).hexdigest()
+        return os.path.join(self.directorio, f"anexo_{clave}.json")
+
+    def _leer_entrada(self, archivo):
+        """DataFrame de una entrada o None si no existe o no se puede leer."""
+        if not os.path.exists(archivo):
+            return None
+        try:
+            with etapa("leer_cache"):
+                df = pd.read_parquet(archivo) if self.formato == 'parquet' else pd.read_feather(archivo)
+            os.utime(archivo)  # Marca la entrada como usada recientemente
+            return df
+        except Exception:
+            # Entrada corrupta o escrita por una versión incompatible: se vuelve a leer el original
+            self._eliminar(archivo)
+            return None
+
+    def _leer_anexado(self, ruta, variante, lector_anexado):
+        """Lee solo las filas agregadas desde la última lectura registrada, o devuelve None."""
+        try:
+            with open(self._registro(ruta, variante), encoding='utf-8') as f:
+                registro = json.load(f)
+            tamano = registro['tamano']
+            if tamano <= 0 or os.path.getsize(ruta) <= tamano:
+                return None
+            with open(ruta, 'rb') as f:
+                f.seek(tamano - 1)
+                # La lectura anterior tiene que haber terminado en un fin de línea
+                if f.read(1) != b'\n':
+                    return None
+            if self.hash_prefijo(ruta, tamano) != registro['hash']:
+                return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        anterior = self._leer_entrada(self._archivo(registro['clave']))
+        if anterior is None:
+            return None
+        return lector_anexado(ruta, anterior, tamano)
+
+    def _registrar(self, ruta, variante, clave):
+        (_, _, tamano), contenido = self.hash_contenido(ruta)
+        registro = self._registro(ruta, variante)
+        temporal = f"{registro}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({'clave': clave, 'tamano': tamano, 'hash': contenido}, f)
+            os.replace(temporal, registro)
+        except OSError:
+            self._eliminar(temporal)
+
+    def cargar(self, ruta, lector, variante="", lector_anexado=None):
+        """Devuelve la tabla de ruta desde la caché; si no está, la lee con lector(ruta) y la guarda.
+
+        variante distingue lecturas distintas del mismo archivo (por ejemplo, otras columnas).
+        lector_anexado(ruta, anterior, desde) lee las filas que empiezan en el byte
+        desde y devuelve la tabla completa; se usa cuando el archivo solo creció al
+        final desde la última lectura y esa entrada sigue en la caché.
+        """
+        if not self.activa:
+            return lector(ruta)
+
+        clave = self.clave(ruta, variante)
+        archivo = self._archivo(clave)
+        df = self._leer_entrada(archivo)
+        if df is not None:
+            return df
+
+        if lector_anexado is not None:
+            df = self._leer_anexado(ruta, variante, lector_anexado)
+        if df is None:
+            df = lector(ruta)
+        self.guardar(df, archivo)
+        if lector_anexado is not None and os.path.exists(archivo):
+            self._registrar(ruta, variante, clave)
+        return df
+
+    def guardar(self, df, archivo):
+        """Escribe la entrada de forma atómica y recorta la caché al límite de tamaño."""
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{archivo}.{uuid.uuid4().hex}.tmp"
+        try:
+            with etapa("guardar_cache"):
+                if self.formato == 'parquet':
+                    df.to_parquet(temporal)
+                else:
+                    df.reset_index(drop=True).to_feather(temporal)
+            os.replace(temporal, archivo)
+        except Exception:
+            # Hay columnas que Arrow no puede representar (tipos mezclados); esa tabla no se guarda
+            self._eliminar(temporal)
+            return
+        self.recortar()
+
+    def recortar(self):
+        """Elimina las entradas usadas hace más tiempo hasta quedar por debajo del límite."""
+        with self._lock:
+            entradas = []
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith(tuple(EXTENSIONES.values())):
+                    continue
+                archivo = os.path.join(self.directorio, nombre)
+                try:
+                    estado = os.stat(archivo)
+                except FileNotFoundError:
+                    continue
+                entradas.append((estado.st_mtime, estado.st_size, archivo))
+
+            total = sum(tamano for _, tamano, _ in entradas)
+            for _, tamano, archivo in sorted(entradas):
+                if total <= self.limite_bytes:
+                    break
+                self._eliminar(archivo)
+                total -= tamano
+
+    def limpiar(self):
+        """Vacía la caché y los registros de lectura de archivos anexados."""
+        if os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                registro = nombre.startswith("anexo_") and nombre.endswith(".json")
+                if registro or nombre.endswith(tuple(EXTENSIONES.values())):
+                    self._eliminar(os.path.join(self.directorio, nombre))
+
+    @staticmethod
+    def _eliminar(archivo):
+        try:
+            os.remove(archivo)
+        except OSError:
+            pass
@@ -0,0 +1,394 @@
+"""Lectura de los archivos de entrada de nómina, asistencia y productividad.
+
+Se aceptan Excel, CSV, Parquet y Feather; el formato se detecta por la extensión o,
+si no es conocida, por los primeros bytes del archivo. Cada tipo de archivo declara
+en su esquema las únicas columnas que usan los análisis y el tipo compacto con que se
+guardan: conteos en enteros de 16 bits (float32 si tienen decimales), nombres como
+categorías y cuentas bancarias como texto. Las columnas mensuales se declaran con una plantilla ('... en {mes}')
+que abarca todos los meses que traiga el archivo. Las de asistencia y productividad
+salen de las reglas con que se analiza el archivo (ver esquema_de). Todas las
+lecturas validan las mismas columnas obligatorias.
+"""
+import csv
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_tablas import CacheTablas
+from formatos import FORMATOS
+from perfil import etapa, anotar
+from reglas import REGLAS_PREDETERMINADAS, meses_de, patron_mes
+
+try:
+    import python_calamine  # noqa: F401  (lector de Excel en Rust, mucho más rápido que openpyxl)
+    MOTOR_EXCEL = 'calamine'
+except ImportError:
+    MOTOR_EXCEL = 'openpyxl'
+
+ESQUEMA_NOMINA = {
+    'ID de Empleado': 'id',
+    'Nombre': 'categoria',
+    'Cuenta Bancaria': 'texto',
+}
+
+FILAS_POR_BLOQUE_CSV = 200_000
+# Solo las celdas vacías son nulas: 'N/A' o 'NA' en un conteo es un dato inválido que
+# compactar_conteo debe informar, no una celda vacía que nunca dispara un umbral
+NULOS = {'keep_default_na': False, 'na_values': ['']}
+# Forma parte de la clave de la caché: se incrementa cuando cambia cómo se compactan las columnas
+VERSION_ESQUEMA = 2
+
+_cache_predeterminada = None
+
+
+def cache_predeterminada():
+    """Caché compartida por la aplicación, creada en el primer uso."""
+    global _cache_predeterminada
+    if _cache_predeterminada is None:
+        _cache_predeterminada = CacheTablas()
+    return _cache_predeterminada
+
+
+def esquema_de(tipo, reglas=None):
+    """Esquema del archivo de tipo con las columnas que usan las reglas (las predeterminadas si es None).
+
+    La nómina tiene siempre las mismas columnas; asistencia y productividad llevan
+    la plantilla mensual y la columna de totales de su regla.
+    """
+    if tipo == 'nomina':
+        return ESQUEMA_NOMINA
+    reglas_datos = getattr(reglas or REGLAS_PREDETERMINADAS, tipo)
+    return {
+        'ID de Empleado': 'id',
+        'Nombre': 'categoria',
+        reglas_datos.mes.columna: 'conteo',
+        reglas_datos.total.columna: 'conteo',
+    }
+
+
+# Esquemas con las reglas predeterminadas
+ESQUEMAS = {tipo: esquema_de(tipo) for tipo in ('nomina', 'asistencia', 'productividad')}
+
+
+def compactar_conteo(serie):
+    """Convierte una columna de conteos al entero más pequeño que la representa.
+
+    Si hay celdas vacías o valores con decimales (medio día) se usa float32: los
+    enteros con nulos de pandas devuelven <NA> en las comparaciones y no sirven
+    como máscara de filtrado. Lanza ValueError si hay celdas con texto que no es
+    un número, que de otro modo quedarían vacías y nunca dispararían un umbral.
+    """
+    valores = pd.to_numeric(serie, errors='coerce')
+    vacias = valores.isna()
+    if vacias.any():
+        texto = serie[vacias & serie.notna()].astype(str).str.strip()
+        invalidas = texto[texto != ""]
+        if not invalidas.empty:
+            ejemplos = ", ".join(repr(valor) for valor in invalidas.unique()[:5])
+            raise ValueError(f"Valores no numéricos en la columna '{serie.name}' "
+                             f"({len(invalidas)} celdas): {ejemplos}")
+        return valores.astype(np.float32)
+    numeros = valores.to_numpy(dtype=np.float64)
+    if not (numeros == np.floor(numeros)).all():
+        return valores.astype(np.float32)
+    for tipo in (np.int16, np.int32):
+        limites = np.iinfo(tipo)
+        if valores.empty or (valores.min() >= limites.min and valores.max() <= limites.max):
+            return valores.astype(tipo)
+    return valores.astype(np.int64)
+
+
+def tipo_columna(esquema, columna):
+    """Tipo de columna en el esquema, por nombre o por plantilla con '{mes}'; None si no está."""
+    if columna in esquema:
+        return esquema[columna]
+    for plantilla, tipo in esquema.items():
+        if '{mes}' in plantilla and patron_mes(plantilla).fullmatch(str(columna)):
+            return tipo
+    return None
+
+
+def aplicar_esquema(df, esquema):
+    """Convierte las columnas presentes de df a los tipos compactos del esquema."""
+    for columna in df.columns:
+        tipo = tipo_columna(esquema, columna)
+        if tipo == 'conteo':
+            df[columna] = compactar_conteo(df[columna])
+        elif tipo == 'categoria':
+            df[columna] = df[columna].astype('category')
+        elif tipo == 'texto':
+            df[columna] = df[columna].astype('string')
+    return df
+
+
+def detectar_formato(ruta):
+    """Devuelve 'excel', 'csv', 'parquet' o 'feather' según la extensión o la firma del archivo."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in FORMATOS:
+        return FORMATOS[extension]
+
+    with open(ruta, 'rb') as f:
+        firma = f.read(8)
+    if firma.startswith(b'PK\x03\x04') or firma.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'excel'
+    if firma.startswith(b'PAR1'):
+        return 'parquet'
+    if firma.startswith(b'ARROW1'):
+        return 'feather'
+    return 'csv'
+
+
+def validar_columnas(df, tipo, reglas=None):
+    """Lanza ValueError si faltan en df columnas obligatorias del esquema de tipo (ver esquema_de).
+
+    Una plantilla con '{mes}' falta si ninguna columna responde a ella. La columna
+    de totales es opcional si la regla total tiene ventana: se suman los meses.
+    """
+    opcionales = set()
+    if tipo != 'nomina':
+        total = getattr(reglas or REGLAS_PREDETERMINADAS, tipo).total
+        if total.ventana is not None:
+            opcionales.add(total.columna)
+    faltantes = [columna for columna in esquema_de(tipo, reglas) if columna not in df.columns
+                 and columna not in opcionales and not ('{mes}' in columna and meses_de(df.columns, columna))]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo de {tipo}: {', '.join(faltantes)}")
+
+
+def leer_excel(ruta, esquema=None):
+    """Lee la primera hoja con el motor más rápido disponible y solo las columnas del esquema."""
+    if esquema is None:
+        return pd.read_excel(ruta, engine=MOTOR_EXCEL)
+
+    texto = {columna: str for columna, tipo in esquema.items() if tipo == 'texto'}
+    df = pd.read_excel(ruta, engine=MOTOR_EXCEL, usecols=lambda columna: tipo_columna(esquema, columna) is not None,
+                       dtype=texto, **NULOS)
+    return aplicar_esquema(df, esquema)
+
+
+def _opciones_csv(ruta):
+    """Detecta separador y codificación a partir del inicio del archivo."""
+    with open(ruta, 'rb') as f:
+        muestra = f.read(64 * 1024)
+    try:
+        texto, codificacion = muestra.decode('utf-8-sig'), 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Un bloque de 64 KB puede cortar un carácter multibyte al final
+        if e.start < len(muestra) - 4:
+            texto, codificacion = muestra.decode('latin-1'), 'latin-1'
+        else:
+            texto, codificacion = muestra[:e.start].decode('utf-8-sig'), 'utf-8-sig'
+    try:
+        separador = csv.Sniffer().sniff(texto.split('\n', 1)[0], delimiters=',;\t|').delimiter
+    except csv.Error:
+        separador = ','
+    return separador, codificacion
+
+
+def iterar_csv(ruta, esquema=None, filas_por_bloque=FILAS_POR_BLOQUE_CSV, desde=0):
+    """Recorre un CSV en bloques de filas ya proyectados y compactados con el esquema.
+
+    desde (en bytes, al comienzo de una línea) lee solo las filas a partir de ahí,
+    con el encabezado del archivo.
+    """
+    separador, codificacion = _opciones_csv(ruta)
+    opciones = {'sep': separador, 'encoding': codificacion, 'chunksize': filas_por_bloque}
+    if esquema is not None:
+        opciones['usecols'] = lambda columna: tipo_columna(esquema, columna) is not None
+        opciones['dtype'] = {columna: str for columna, tipo in esquema.items() if tipo == 'texto'}
+        opciones.update(NULOS)
+
+    fuente = ruta
+    if desde:
+        with open(ruta, 'rb') as f:
+            encabezado = f.readline()
+            f.seek(desde)
+            fuente = io.BytesIO(encabezado + f.read())
+
+    with pd.read_csv(fuente, **opciones) as lector:
+        for bloque in lector:
+            if esquema is not None:
+                bloque = aplicar_esquema(bloque, {c: t for c, t in esquema.items() if t != 'categoria'})
+            yield bloque
+
+
+def leer_csv(ruta, esquema=None, filas_por_bloque=FILAS_POR_BLOQUE_CSV):
+    """Lee un CSV por bloques para que el texto intermedio nunca ocupe el archivo completo en memoria."""
+    bloques = list(iterar_csv(ruta, esquema, filas_por_bloque))
+    if not bloques:
+        return pd.read_csv(ruta, sep=_opciones_csv(ruta)[0], nrows=0)
+    df = pd.concat(bloques, ignore_index=True)
+    if esquema is not None:
+        # Las categorías se crean al final para que todos los bloques compartan el mismo diccionario
+        df = aplicar_esquema(df, {c: t for c, t in esquema.items() if t == 'categoria'})
+    return df
+
+
+def leer_csv_anexado(ruta, anterior, desde, esquema=None):
+    """Tabla completa de un CSV que creció al final: anterior más las filas desde el byte desde.
+
+    Las filas nuevas pasan por el mismo esquema; las categorías se unen con las de
+    anterior y los conteos se vuelven a compactar sobre la tabla entera.
+    """
+    bloques = list(iterar_csv(ruta, esquema, desde=desde))
+    if not bloques:
+        return anterior
+    nuevas = pd.concat(bloques, ignore_index=True)
+    if esquema is None:
+        return pd.concat([anterior, nuevas], ignore_index=True)
+
+    categorias = [columna for columna, tipo in esquema.items() if tipo == 'categoria' and columna in anterior.columns]
+    df = pd.concat([anterior.drop(columns=categorias), nuevas.drop(columns=categorias)], ignore_index=True)
+    for columna in categorias:
+        # Mismas categorías (ordenadas) que tendría la lectura completa; se traducen los códigos
+        viejas = anterior[columna].cat
+        unidas = viejas.categories.union(pd.Index(nuevas[columna].dropna().unique()))
+        codigos_viejos = np.append(unidas.get_indexer(viejas.categories), -1)[viejas.codes]
+        codigos = np.concatenate([codigos_viejos, unidas.get_indexer(nuevas[columna])])
+        df[columna] = pd.Categorical.from_codes(codigos, categories=unidas)
+    df = df[anterior.columns]
+    return aplicar_esquema(df, {c: t for c, t in esquema.items() if t == 'conteo'})
+
+
+def _columnas_arrow(ruta, formato):
+    """Nombres de columna de un archivo Parquet o Feather sin leer sus datos."""
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(ruta).names
+    import pyarrow.ipc as ipc
+    with ipc.open_file(ruta) as lector:
+        return lector.schema.names
+
+
+def leer_columnar(ruta, formato, esquema=None):
+    """Lee un archivo Parquet o Feather cargando solo las columnas del esquema."""
+    columnas = None
+    if esquema is not None:
+        columnas = [columna for columna in _columnas_arrow(ruta, formato) if tipo_columna(esquema, columna) is not None]
+    if formato == 'parquet':
+        df = pd.read_parquet(ruta, columns=columnas)
+    else:
+        df = pd.read_feather(ruta, columns=columnas)
+    return aplicar_esquema(df, esquema) if esquema is not None else df
+
+
+def leer_archivo(ruta, esquema=None):
+    """Lee el archivo con el lector nativo de su formato."""
+    formato = detectar_formato(ruta)
+    with etapa(f"leer_{formato}"):
+        if formato == 'excel':
+            return leer_excel(ruta, esquema)
+        if formato == 'csv':
+            return leer_csv(ruta, esquema)
+        return leer_columnar(ruta, formato, esquema)
+
+
+def leer_tabla(ruta, tipo=None, cache=None, reglas=None):
+    """Lee el archivo, desde la caché columnar si ya fue leído antes.
+
+    tipo ('nomina', 'asistencia' o 'productividad') limita la lectura a las columnas
+    de su esquema según reglas (ConjuntoReglas, las predeterminadas si es None) y
+    valida que estén todas; sin tipo se leen todas las columnas. Los archivos
+    Parquet y Feather ya son columnares y no pasan por la caché.
+    """
+    esquema = esquema_de(tipo, reglas) if tipo is not None else None
+    if detectar_formato(ruta) in ('parquet', 'feather'):
+        df = leer_archivo(ruta, esquema)
+    else:
+        cache = cache if cache is not None else cache_predeterminada()
+        variante = f"v{VERSION_ESQUEMA}:{sorted(esquema.items())!r}" if esquema is not None else ""
+
+        def leer_anexado(r, anterior, desde):
+            with etapa("leer_csv_anexado"):
+                return leer_csv_anexado(r, anterior, desde, esquema)
+
+        # Un CSV al que solo se agregaron filas se lee desde donde terminó la lectura anterior
+        df = cache.cargar(ruta, lambda r: leer_archivo(r, esquema), variante,
+                          leer_anexado if detectar_formato(ruta) == 'csv' else None)
+
+    if tipo is not None:
+        validar_columnas(df, tipo, reglas)
+    anotar(**{f"filas_{tipo or 'tabla'}": len(df), f"bytes_{tipo or 'tabla'}": os.path.getsize(ruta)})
+    return df
+
+
+def _esquema_por_bloque(esquema):
+    """Las categorías no se crean por bloque: cada bloque tendría su propio diccionario."""
+    if esquema is None:
+        return None
+    return {columna: tipo for columna, tipo in esquema.items() if tipo != 'categoria'}
+
+
+def _bloques_excel(ruta, esquema, filas_por_bloque):
+    """Recorre la primera hoja en modo de solo lectura de openpyxl, sin cargar el libro completo."""
+    import openpyxl
+
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        posiciones = [i for i, columna in enumerate(encabezado)
+                      if esquema is None or tipo_columna(esquema, columna) is not None]
+        columnas = [encabezado[i] for i in posiciones]
+
+        pendientes = []
+        for fila in filas:
+            pendientes.append([fila[i] if i < len(fila) else None for i in posiciones])
+            if len(pendientes) == filas_por_bloque:
+                yield pd.DataFrame(pendientes, columns=columnas)
+                pendientes = []
+        if pendientes:
+            yield pd.DataFrame(pendientes, columns=columnas)
+    finally:
+        libro.close()
+
+
+def _bloques_columnares(ruta, formato, esquema, filas_por_bloque):
+    """Recorre un archivo Parquet por lotes de filas o un Feather por sus lotes internos."""
+    columnas = None
+    if esquema is not None:
+        columnas = [columna for columna in _columnas_arrow(ruta, formato) if tipo_columna(esquema, columna) is not None]
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=filas_por_bloque, columns=columnas):
+            yield lote.to_pandas()
+    else:
+        import pyarrow.ipc as ipc
+        with ipc.open_file(ruta) as lector:
+            for i in range(lector.num_record_batches):
+                lote = lector.get_batch(i)
+                yield (lote.select(columnas) if columnas is not None else lote).to_pandas()
+
+
+def iterar_bloques(ruta, tipo=None, filas_por_bloque=FILAS_POR_BLOQUE_CSV, reglas=None):
+    """Recorre el archivo en bloques de filas, en cualquiera de los formatos soportados.
+
+    Cada bloque lleva como índice la posición global de sus filas, de modo que los
+    resultados combinados coinciden con los de leer el archivo completo. La memoria
+    usada depende del tamaño del bloque, no del archivo. tipo y reglas son los de
+    leer_tabla.
+    """
+    esquema = esquema_de(tipo, reglas) if tipo is not None else None
+    formato = detectar_formato(ruta)
+    if formato == 'csv':
+        bloques = iterar_csv(ruta, esquema, filas_por_bloque)
+    elif formato == 'excel':
+        bloques = _bloques_excel(ruta, esquema, filas_por_bloque)
+    else:
+        bloques = _bloques_columnares(ruta, formato, esquema, filas_por_bloque)
+
+    inicio = 0
+    for bloque in bloques:
+        if tipo is not None:
+            if inicio == 0:
+                validar_columnas(bloque, tipo, reglas)
+            if formato != 'csv':  # iterar_csv ya entrega los bloques compactados
+                bloque = aplicar_esquema(bloque, _esquema_por_bloque(esquema))
+        bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+        inicio += len(bloque)
+        yield bloque
+
@@ -0,0 +1,137 @@
+"""Cruce de nómina, asistencia y productividad por 'ID de Empleado'.
+
+Los tres análisis se hacen por separado; la pregunta forense que los une es quién
+cobra en la nómina sin haber asistido o sin haber realizado tareas. IndiceEmpleados
+es un índice hash (pandas.Index) de los IDs de la nómina que se construye una vez
+por carga: cada tabla se ubica en él con un solo get_indexer y sus totales se
+acumulan por empleado con np.bincount, sin merges ni copias de las tablas.
+"""
+import numpy as np
+import pandas as pd
+
+from perfil import etapa
+from reglas import REGLAS_PREDETERMINADAS
+
+COLUMNAS_CRUCE = ['ID de Empleado', 'Nombre', 'Días Trabajados', 'Tareas Realizadas']
+
+
+def claves_empleado(serie):
+    """IDs comparables entre archivos: enteros (Int64) si la columna es numérica entera, si no texto sin espacios.
+
+    El mismo ID puede leerse como 1000 en un archivo, 1000.0 en otro (con celdas
+    vacías) o '1000' en un tercero; IndiceEmpleados pasa a texto cuando los tipos
+    de las dos tablas no coinciden.
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.all(np.isnan(valores) | (valores == np.floor(valores))):
+            return serie.astype('Int64')
+    return serie.astype('string').str.strip()
+
+
+class IndiceEmpleados:
+    """Índice de los empleados de la nómina por 'ID de Empleado'.
+
+    ids es un pandas.Index (tabla hash) con los IDs distintos de la nómina y
+    empleados el ID y el nombre de la primera fila de cada uno. Solo usa esas dos
+    columnas de df_nomina; se arma una vez por nómina cargada y sirve para cruzar
+    con cualquier otra tabla.
+    """
+
+    def __init__(self, df_nomina):
+        claves = claves_empleado(df_nomina['ID de Empleado'])
+        validas = claves.notna().to_numpy()
+        posiciones, unicos = pd.factorize(claves[validas])
+        self.ids = pd.Index(unicos)
+        self._ids_texto = None
+        # Primera fila de la nómina de cada empleado (para su ID y nombre originales)
+        primeras = np.full(len(unicos), len(posiciones), dtype=np.int64)
+        np.minimum.at(primeras, posiciones, np.arange(len(posiciones)))
+        filas = np.flatnonzero(validas)[primeras]
+        self.empleados = df_nomina.iloc[filas, df_nomina.columns.get_indexer(['ID de Empleado', 'Nombre'])]
+        self.empleados = self.empleados.reset_index(drop=True)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def ubicar(self, df):
+        """Posición en el índice del empleado de cada fila de df (-1 si no está en la nómina)."""
+        claves = claves_empleado(df['ID de Empleado'])
+        if claves.dtype == self.ids.dtype:
+            return self.ids.get_indexer(claves)
+        # Un archivo con IDs numéricos y otro con texto: se comparan como texto
+        if self._ids_texto is None:
+            self._ids_texto = pd.Index(self.ids.astype('string'))
+        return self._ids_texto.get_indexer(claves.astype('string'))
+
+    def sumar(self, df, columnas):
+        """Total de las columnas por empleado de la nómina, cuántas filas de df tiene cada uno y las filas ajenas.
+
+        Las celdas vacías suman 0. Devuelve (totales, filas por empleado, filas de
+        df cuyo ID no está en la nómina).
+        """
+        posiciones = self.ubicar(df)
+        en_nomina = posiciones >= 0
+        valores = np.zeros(int(en_nomina.sum()))
+        for columna in columnas:
+            valores += np.nan_to_num(df[columna].to_numpy(dtype=np.float64, na_value=np.nan)[en_nomina])
+        totales = np.bincount(posiciones[en_nomina], weights=valores, minlength=len(self))
+        apariciones = np.bincount(posiciones[en_nomina], minlength=len(self))
+        return totales, apariciones, int((~en_nomina).sum())
+
+
+def columnas_total(df, reglas_datos):
+    """Columnas de df que suman el total de cada fila: la de totales o, si el archivo no la trae, las de los meses."""
+    if reglas_datos.total.columna in df.columns:
+        return [reglas_datos.total.columna]
+    return reglas_datos.columnas_mes(reglas_datos.meses(df.columns))
+
+
+def totales_por_empleado(totales, filas):
+    """Totales como columna anulable, vacía para los empleados sin filas.
+
+    Int64 si todos son enteros; Float64 si alguno tiene decimales (medio día trabajado).
+    """
+    valores = np.where(filas > 0, totales, np.nan)
+    presentes = valores[filas > 0]
+    enteros = bool(np.all(presentes == np.floor(presentes)))
+    return pd.array(valores, dtype='Int64' if enteros else 'Float64')
+
+
+def cruzar_empleados(df_nomina, df_asistencia, df_productividad, reglas=None, indice=None):
+    """Marca a los empleados pagados en la nómina sin asistencia o sin tareas.
+
+    Un empleado está 'sin asistencia' si no figura en el archivo de asistencia o
+    su total de días trabajados es 0, y 'sin tareas' si no figura en el de
+    productividad o su total de tareas es 0. Las columnas de totales son las de
+    reglas (las predeterminadas si es None); un archivo sin ella, posible con una
+    regla total por períodos, se suma por meses. indice es el IndiceEmpleados de
+    df_nomina si ya se construyó (df_nomina puede ser None en ese caso).
+    """
+    reglas = reglas or REGLAS_PREDETERMINADAS
+    if indice is None:
+        with etapa("indice_empleados"):
+            indice = IndiceEmpleados(df_nomina)
+    with etapa("cruce"):
+        dias, filas_asistencia, ajenos_asistencia = indice.sumar(df_asistencia, columnas_total(df_asistencia, reglas.asistencia))
+        tareas, filas_productividad, ajenos_productividad = indice.sumar(df_productividad,
+                                                                          columnas_total(df_productividad, reglas.productividad))
+
+    empleados = indice.empleados.assign(**{
+        # Vacío para quien no figura en el archivo
+        'Días Trabajados': totales_por_empleado(dias, filas_asistencia),
+        'Tareas Realizadas': totales_por_empleado(tareas, filas_productividad),
+    })
+    sin_asistencia = (filas_asistencia == 0) | (dias <= 0)
+    sin_tareas = (filas_productividad == 0) | (tareas <= 0)
+    return {
+        'empleados': empleados,
+        'pagados_ausentes': empleados[sin_asistencia],
+        'pagados_improductivos': empleados[sin_tareas],
+        'pagados_ausentes_improductivos': empleados[sin_asistencia & sin_tareas],
+        # Filas de asistencia y productividad de IDs que no están en la nómina
+        'fuera_de_nomina_asistencia': ajenos_asistencia,
+        'fuera_de_nomina_productividad': ajenos_productividad,
+        'total_empleados': len(indice),
+        'reglas': reglas,
+    }
@@ -0,0 +1,34 @@
+"""Estilos de reportlab compartidos por todos los PDF.
+
+getSampleStyleSheet() crea unas veinte ParagraphStyle cada vez que se llama y cada
+TableStyle vuelve a procesar sus comandos; los reportes y papeles de trabajo usan
+siempre los mismos, así que se construyen una sola vez por proceso, al importar
+este módulo. Los estilos se tratan como de solo lectura: quien necesite una
+variante debe crear un ParagraphStyle nuevo con parent=... en lugar de modificarlos.
+"""
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+ESTILOS = getSampleStyleSheet()
+ESTILOS.add(ParagraphStyle(
+    'CustomParagraph',
+    fontName='Helvetica',
+    fontSize=16,
+    leading=20  # Esto controla el espacio entre líneas
+))
+
+ESTILO_TITULO = ESTILOS['Title']
+ESTILO_SUBTITULO = ESTILOS['Heading2']
+ESTILO_TEXTO = ESTILOS['CustomParagraph']
+
+# Encabezado gris, cuerpo beige y cuadrícula negra: el de todas las tablas de anomalías
+ESTILO_TABLA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
@@ -0,0 +1,29 @@
+"""Formatos de los archivos de entrada y tamaño a partir del cual se leen por bloques.
+
+No importa pandas ni numpy: la interfaz lo usa en el hilo de Tk (diálogos de
+selección, estado de cada archivo) antes de que se carguen los módulos de lectura
+y análisis. carga.py detecta el formato de cada archivo con FORMATOS.
+"""
+import os
+
+FORMATOS = {
+    '.xlsx': 'excel', '.xlsm': 'excel', '.xls': 'excel',
+    '.csv': 'csv', '.txt': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'feather', '.arrow': 'feather',
+}
+# Tipos de archivo para los diálogos de selección
+TIPOS_ARCHIVO = [
+    ("Archivos de datos", "*.xlsx *.xlsm *.xls *.csv *.txt *.parquet *.pq *.feather *.arrow"),
+    ("Excel files", "*.xlsx *.xlsm *.xls"),
+    ("CSV files", "*.csv *.txt"),
+    ("Parquet files", "*.parquet *.pq"),
+    ("Feather files", "*.feather *.arrow"),
+]
+# A partir de este tamaño la nómina se analiza por bloques en lugar de cargarse entera
+UMBRAL_POR_BLOQUES_BYTES = 512 * 1024 ** 2
+
+
+def usar_por_bloques(ruta):
+    """Indica si el archivo es lo bastante grande para analizarse por bloques."""
+    return os.path.getsize(ruta) >= UMBRAL_POR_BLOQUES_BYTES
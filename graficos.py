@@ -0,0 +1,209 @@
+"""Gráficos de pastel de los reportes y papeles de trabajo, generados en memoria.
+
+Cada gráfico se entrega directamente al PDF: no se escribe nada en el directorio
+de trabajo, dos ejecuciones simultáneas no se pisan los archivos y un papel de
+trabajo no depende de que antes se haya generado el reporte.
+
+Hay dos backends. 'reportlab' (el predeterminado) dibuja el pastel como gráfico
+vectorial con reportlab.graphics: no importa matplotlib, no rasteriza nada y el
+PDF queda más liviano y nítido. 'matplotlib' dibuja la figura en un PNG en
+memoria y queda para gráficos más elaborados; matplotlib solo se importa la
+primera vez que se usa (con Figure, no pyplot, para no tocar su estado global
+desde el hilo de trabajo).
+
+El mismo pastel (conteo, total, título) se pide en el reporte y en el papel de
+trabajo, y otra vez en cada ejecución sobre los mismos datos. CacheGraficos
+guarda cada gráfico ya dibujado bajo un hash de todo lo que lo determina, en un
+LRU acotado en memoria y, si se indica un directorio, también como PNG en disco.
+"""
+import hashlib
+import io
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph
+
+from estilos import ESTILO_TEXTO
+from perfil import etapa
+
+BACKENDS = ('reportlab', 'matplotlib')
+TAMANO = 4 * inch
+ETIQUETAS = ['Con Anomalías', 'Sin Anomalías']
+COLORES = ['#ff9999', '#66b3ff']
+
+# Cambiar cualquier detalle del dibujo obliga a subir la versión para invalidar la caché en disco
+VERSION_ESTILO = 1
+MAXIMO_EN_MEMORIA = 64
+DIRECTORIO_CACHE = os.environ.get("AUDITORIA_CACHE_GRAFICOS")
+
+# Backend con que se dibujan los gráficos si no se indica otro (ver usar_backend)
+backend_predeterminado = 'reportlab'
+
+# Gráficos de cada análisis: nombre -> (título, conteo de anomalías, total de filas)
+GRAFICOS = {
+    'nombres_duplicados': ("Porcentaje de Nombres Duplicados",
+                           lambda data: len(data['duplicados_nombre']), lambda data: data['total_rows']),
+    'cuentas_duplicadas': ("Porcentaje de Cuentas Bancarias Duplicadas",
+                           lambda data: len(data['duplicados_cuenta']), lambda data: data['total_rows']),
+    'dias_trabajados': ("Porcentaje de Anomalías en Días Trabajados",
+                        lambda data: len(data['all_anomalías']), lambda data: len(data['df_asistencia'])),
+    'tareas_realizadas': ("Porcentaje de Anomalías en Tareas Realizadas",
+                          lambda data: len(data['indices_anomalías']), lambda data: len(data['df_productividad'])),
+    'pagados_ausentes': ("Porcentaje de Empleados Pagados sin Asistencia",
+                         lambda data: len(data['pagados_ausentes']), lambda data: data['total_empleados']),
+    'pagados_improductivos': ("Porcentaje de Empleados Pagados sin Tareas",
+                              lambda data: len(data['pagados_improductivos']), lambda data: data['total_empleados']),
+}
+
+
+def usar_backend(nombre):
+    """Cambia el backend predeterminado de los gráficos ('reportlab' o 'matplotlib')."""
+    global backend_predeterminado
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend de gráficos no soportado: {nombre}")
+    backend_predeterminado = nombre
+
+
+def _pastel_reportlab(count, total, title):
+    """Pastel vectorial como Drawing de reportlab (es un Flowable)."""
+    dibujo = Drawing(TAMANO, TAMANO, hAlign='CENTER')
+    dibujo.add(String(TAMANO / 2, TAMANO - 18, title, fontName='Helvetica', fontSize=11, textAnchor='middle'))
+
+    pastel = Pie()
+    pastel.x = pastel.y = TAMANO * 0.2
+    pastel.width = pastel.height = TAMANO * 0.6
+    pastel.data = [count, total - count]
+    pastel.labels = [f"{etiqueta} {100 * valor / total:.1f}%" for etiqueta, valor in zip(ETIQUETAS, pastel.data)]
+    pastel.startAngle = 90
+    pastel.direction = 'anticlockwise'  # Mismo sentido que matplotlib
+    pastel.slices.strokeColor = colors.white
+    pastel.slices.fontName = 'Helvetica'
+    pastel.slices.fontSize = 8
+    for i, color in enumerate(COLORES):
+        pastel.slices[i].fillColor = colors.HexColor(color)
+    dibujo.add(pastel)
+    return dibujo
+
+
+def _pastel_matplotlib(count, total, title):
+    """Pastel de matplotlib como bytes de un PNG dibujado en memoria."""
+    try:
+        from matplotlib.figure import Figure
+    except ImportError:
+        raise ValueError("Para dibujar gráficos con matplotlib hay que instalarlo.") from None
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie([count, total - count], labels=ETIQUETAS, autopct='%1.1f%%', colors=COLORES, startangle=90)
+    ax.axis('equal')  # Para que el gráfico sea circular
+    ax.set_title(title)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+PASTELES = {
+    'reportlab': _pastel_reportlab,
+    'matplotlib': _pastel_matplotlib,
+}
+
+
+class CacheGraficos:
+    """Caché de gráficos por contenido: LRU en memoria y, opcionalmente, PNG en disco.
+
+    Los Drawing de reportlab solo se guardan en memoria (copiarlos cuesta menos
+    que leerlos del disco); los PNG de matplotlib van también al directorio.
+    """
+
+    def __init__(self, maximo=MAXIMO_EN_MEMORIA, directorio=DIRECTORIO_CACHE):
+        self.maximo = maximo
+        self.directorio = directorio
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(backend, count, total, title):
+        """Hash de los datos y del estilo que determinan el gráfico."""
+        texto = repr((backend, count, total, title, ETIQUETAS, COLORES, TAMANO, VERSION_ESTILO))
+        return hashlib.blake2b(texto.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _archivo(self, clave):
+        return os.path.join(self.directorio, clave + '.png')
+
+    def obtener(self, clave, generar):
+        """Devuelve el gráfico de clave; si no está en ninguna capa, lo crea con generar() y lo guarda."""
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                return self._entradas[clave]
+
+        grafico = None
+        if self.directorio and os.path.exists(self._archivo(clave)):
+            try:
+                with open(self._archivo(clave), 'rb') as f:
+                    grafico = f.read()
+            except OSError:
+                grafico = None
+        if grafico is None:
+            grafico = generar()
+            if self.directorio and isinstance(grafico, bytes):
+                self._guardar(clave, grafico)
+
+        with self._lock:
+            self._entradas[clave] = grafico
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return grafico
+
+    def _guardar(self, clave, png):
+        # Escritura atómica: otra ejecución puede estar leyendo el mismo directorio
+        temporal = f"{self._archivo(clave)}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(temporal, 'wb') as f:
+                f.write(png)
+            os.replace(temporal, self._archivo(clave))
+        except OSError:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+
+    def limpiar(self):
+        """Vacía la memoria (los PNG en disco se conservan)."""
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_graficos = CacheGraficos()
+
+
+def grafico_pastel(count, total, title, backend=None):
+    """Flowable con un gráfico de pastel de anomalías (None si no hay filas)."""
+    if total == 0:
+        return None
+    backend = backend or backend_predeterminado
+    with etapa("grafico_pastel"):
+        grafico = cache_graficos.obtener(cache_graficos.clave(backend, count, total, title),
+                                         lambda: PASTELES[backend](count, total, title))
+    if isinstance(grafico, bytes):
+        return Image(io.BytesIO(grafico), TAMANO, TAMANO)
+    # platypus anota el flowable al maquetarlo (por ejemplo, al pasarlo a otra página);
+    # cada documento recibe su propia copia del Drawing guardado
+    copia = grafico.copy()
+    copia.hAlign = grafico.hAlign
+    return copia
+
+
+def imagen_grafico(nombre, data, backend=None):
+    """Flowable con el gráfico nombre de GRAFICOS para los datos de un análisis."""
+    titulo, conteo, total = GRAFICOS[nombre]
+    grafico = grafico_pastel(conteo(data), total(data), titulo, backend)
+    if grafico is None:
+        return Paragraph("No hay filas para graficar.", ESTILO_TEXTO)
+    return grafico
@@ -0,0 +1,298 @@
+"""Reanálisis incremental cuando un archivo vuelve a llegar con pocos cambios.
+
+Por cada archivo (ruta absoluta) y tipo se guarda el estado del último análisis
+(EstadoAnalisis) con la huella (hash de 64 bits de todas las columnas) de cada
+fila. Al volver a analizar el archivo, las huellas dicen qué filas son nuevas o
+cambiaron, y solo esas se evalúan:
+
+- Nómina: la etapa cara es la búsqueda de nombres parecidos (similitud.py). Se
+  guardan los pares encontrados, expresados con las huellas de sus dos filas, y
+  los nombres ya normalizados. Una huella cambió si aparece un número distinto de
+  veces (filas nuevas, corregidas o eliminadas); los pares entre filas sin cambios
+  se conservan y solo se buscan pares en los que participa alguna fila cambiada
+  (similitud.pares_filas con consulta), con los demás nombres como candidatos.
+- Asistencia y productividad: se guarda la máscara de anomalías de cada fila
+  (analisis.marcar_anomalias) con los meses y columnas que tenía el archivo. Las
+  filas sin cambios en esas columnas conservan sus bits y solo se evalúan los
+  meses nuevos (y los períodos de la regla total que los incluyen); las filas
+  nuevas o cambiadas se evalúan enteras. Las huellas sirven además para descartar
+  las filas repetidas del listado sin compararlas todas.
+
+El resultado es el mismo que el del análisis completo. El estado se descarta si
+cambian las reglas o la versión del formato. La lectura de un CSV al que solo se
+agregaron filas también es incremental (ver CacheTablas.cargar); un Excel
+modificado o un CSV con un mes nuevo (una columna más en cada línea) se vuelven a
+leer enteros, y lo que se ahorra es la evaluación.
+"""
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from analisis import (analizar_asistencia, analizar_nomina, analizar_productividad, columnas_numericas,
+                      marcar_anomalias, meses_archivo, tipo_mascara)
+from perfil import etapa
+from reglas import REGLAS_PREDETERMINADAS
+from similitud import UMBRAL_SIMILITUD, cuentas_similares, normalizar_nombres, pares_filas, tabla_pares
+
+DIRECTORIO_ESTADO = os.environ.get(
+    "AUDITORIA_ESTADO", os.path.join(os.path.expanduser("~"), ".cache", "auditoria", "estado"))
+# Cambiar el contenido del estado obliga a subir la versión para descartar los guardados
+VERSION_ESTADO = 2
+# Separador de los textos guardados como un solo bloque de bytes (sin pickle)
+SEPARADOR = "\x00"
+ANALIZADORES = {'asistencia': analizar_asistencia, 'productividad': analizar_productividad}
+
+
+def huellas_filas(df):
+    """Hash de 64 bits de cada fila, sobre todas las columnas."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def huellas_cambiadas(anteriores, actuales):
+    """Huellas que aparecen un número distinto de veces en anteriores y en actuales."""
+    unicas_a, conteos_a = np.unique(anteriores, return_counts=True)
+    unicas_b, conteos_b = np.unique(actuales, return_counts=True)
+    todas = np.union1d(unicas_a, unicas_b)
+    # Conteo de cada huella en cada lado (0 si no está)
+    en_a = np.zeros(len(todas), dtype=np.int64)
+    en_a[np.searchsorted(todas, unicas_a)] = conteos_a
+    en_b = np.zeros(len(todas), dtype=np.int64)
+    en_b[np.searchsorted(todas, unicas_b)] = conteos_b
+    return todas[en_a != en_b]
+
+
+def _empaquetar(textos):
+    return np.frombuffer(SEPARADOR.join(textos).encode('utf-8'), dtype=np.uint8)
+
+
+def _desempaquetar(datos):
+    texto = datos.tobytes().decode('utf-8')
+    return texto.split(SEPARADOR) if texto else []
+
+
+class NormalizacionGuardada:
+    """Normalizador para similitud.pares_filas que reutiliza los nombres ya normalizados.
+
+    Después de usarlo, nombres y normas tienen los nombres de la última llamada
+    para guardarlos en el estado.
+    """
+
+    def __init__(self, nombres=(), normas=()):
+        self.conocidos = dict(zip(nombres, normas))
+        self.nombres, self.normas = [], []
+
+    def __call__(self, nombres):
+        nombres = list(nombres)
+        nuevos = [nombre for nombre in nombres if nombre not in self.conocidos]
+        self.conocidos.update(zip(nuevos, normalizar_nombres(nuevos)))
+        self.nombres, self.normas = nombres, [self.conocidos[nombre] for nombre in nombres]
+        return self.normas
+
+
+class EstadoAnalisis:
+    """Estado guardado del último análisis de cada archivo, por tipo ('nomina', 'asistencia', 'productividad')."""
+
+    def __init__(self, directorio=DIRECTORIO_ESTADO):
+        self.directorio = directorio
+
+    def _archivo(self, ruta, tipo):
+        clave = hashlib.blake2b(os.path.abspath(ruta).encode('utf-8'), digest_size=20).hexdigest()
+        return os.path.join(self.directorio, f"{tipo}_{clave}.npz")
+
+    def cargar(self, ruta, tipo, configuracion):
+        """Arreglos guardados para (ruta, tipo), con sus datos adicionales en 'meta'; None si no hay estado válido.
+
+        configuracion (diccionario serializable en JSON) es lo que hace válido el
+        estado, por ejemplo el umbral; si no coincide con la guardada, se descarta.
+        """
+        try:
+            with np.load(self._archivo(ruta, tipo), allow_pickle=False) as datos:
+                meta = json.loads(str(datos['meta']))
+                if meta['version'] != VERSION_ESTADO or meta['configuracion'] != configuracion:
+                    return None
+                anterior = {nombre: datos[nombre] for nombre in datos.files if nombre != 'meta'}
+                anterior['meta'] = meta['datos']
+                return anterior
+        except (OSError, KeyError, TypeError, ValueError):
+            # Sin estado, o escrito por una versión incompatible: se analiza completo
+            return None
+
+    def guardar(self, ruta, tipo, configuracion, meta=None, **arreglos):
+        """Escribe el estado de forma atómica (otro proceso puede estar leyéndolo)."""
+        archivo = self._archivo(ruta, tipo)
+        temporal = f"{archivo}.{uuid.uuid4().hex}.tmp.npz"
+        encabezado = {'version': VERSION_ESTADO, 'configuracion': configuracion, 'datos': meta or {}}
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            np.savez(temporal, meta=np.array(json.dumps(encabezado)), **arreglos)
+            os.replace(temporal, archivo)
+        except OSError:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+
+    def eliminar(self, ruta, tipo):
+        try:
+            os.remove(self._archivo(ruta, tipo))
+        except OSError:
+            pass
+
+
+def nombres_similares_incremental(df, ruta, umbral=UMBRAL_SIMILITUD, estado=None):
+    """Como similitud.nombres_similares, reutilizando el análisis anterior del mismo archivo.
+
+    estado es el EstadoAnalisis donde se guarda (el del directorio predeterminado si
+    es None). Devuelve (pares, resumen) con resumen = {'filas', 'filas_cambiadas',
+    'pares_reutilizados'}; sin estado previo, todas las filas cuentan como cambiadas.
+    """
+    estado = estado or EstadoAnalisis()
+    configuracion = {'umbral': umbral}
+    huellas = huellas_filas(df)
+    anterior = estado.cargar(ruta, 'nomina', configuracion)
+
+    if anterior is None:
+        consulta = np.ones(len(df), dtype=bool)
+        conservados = np.zeros(0, dtype=bool)
+        anterior = {'pares_a': np.zeros(0, np.uint64), 'pares_b': np.zeros(0, np.uint64),
+                    'similitud': np.zeros(0, np.float64), 'nombres': _empaquetar([]), 'normas': _empaquetar([])}
+    else:
+        cambiadas = huellas_cambiadas(anterior['huellas'], huellas)
+        consulta = np.isin(huellas, cambiadas)
+        conservados = ~(np.isin(anterior['pares_a'], cambiadas) | np.isin(anterior['pares_b'], cambiadas))
+
+    # Pares nuevos: al menos una fila cambiada; pares conservados: las dos filas siguen igual
+    normalizar = NormalizacionGuardada(_desempaquetar(anterior['nombres']), _desempaquetar(anterior['normas']))
+    nuevos_a, nuevos_b, nuevos_s = pares_filas(df, umbral, consulta, normalizar)
+    viejos_a, viejos_b, par = _filas_de_pares(huellas, anterior['pares_a'][conservados], anterior['pares_b'][conservados])
+
+    fa = np.concatenate([viejos_a, nuevos_a])
+    fb = np.concatenate([viejos_b, nuevos_b])
+    similitud = np.concatenate([anterior['similitud'][conservados][par], nuevos_s])
+    # Se guarda cada par de huellas una vez, aunque haya filas idénticas repetidas
+    claves, unicos = np.unique(np.stack([np.minimum(huellas[fa], huellas[fb]), np.maximum(huellas[fa], huellas[fb])],
+                                        axis=1), axis=0, return_index=True)
+    estado.guardar(ruta, 'nomina', configuracion, huellas=huellas, pares_a=claves[:, 0], pares_b=claves[:, 1],
+                   similitud=similitud[unicos], nombres=_empaquetar(normalizar.nombres),
+                   normas=_empaquetar(normalizar.normas))
+    resumen = {'filas': len(df), 'filas_cambiadas': int(consulta.sum()), 'pares_reutilizados': len(viejos_a)}
+    return tabla_pares(df, fa, fb, similitud), resumen
+
+
+def _filas_de_pares(huellas, pares_a, pares_b):
+    """Pares de filas (fa, fb) de los pares de huellas, y el par de huellas de cada uno.
+
+    Filas con la misma huella son idénticas (las repetidas de un mismo empleado):
+    cada par de huellas vale por todas las combinaciones de sus filas, como en el
+    análisis completo. Todas las huellas de los pares tienen que estar en huellas.
+    """
+    orden = np.argsort(huellas, kind='stable')
+    unicas, inicios, cuantas = np.unique(huellas[orden], return_index=True, return_counts=True)
+    ia, ib = np.searchsorted(unicas, pares_a), np.searchsorted(unicas, pares_b)
+    por_par = cuantas[ia] * cuantas[ib]
+    par = np.repeat(np.arange(len(ia)), por_par)
+    k = np.arange(len(par)) - np.repeat(np.cumsum(por_par) - por_par, por_par)
+    fa = orden[inicios[ia[par]] + k // cuantas[ib[par]]]
+    fb = orden[inicios[ib[par]] + k % cuantas[ib[par]]]
+    return fa, fb, par
+
+
+def analizar_nomina_incremental(df_nomina, ruta, reglas=None, estado=None):
+    """analisis.analizar_nomina con la búsqueda de nombres parecidos incremental.
+
+    El resultado tiene además 'incremental' con el resumen de
+    nombres_similares_incremental.
+    """
+    resultado = analizar_nomina(df_nomina, reglas, similares=False)
+    with etapa("nombres_similares_incremental"):
+        resultado['similares_nombre'], resultado['incremental'] = nombres_similares_incremental(df_nomina, ruta, estado=estado)
+    with etapa("cuentas_similares"):
+        resultado['similares_cuenta'] = cuentas_similares(df_nomina)
+    return resultado
+
+
+def _configuracion_datos(reglas_datos):
+    """Parámetros de las reglas de los que depende la máscara guardada."""
+    return {parte: {'columna': regla.columna, 'operador': regla.operador, 'valor': regla.valor, 'ventana': regla.ventana}
+            for parte, regla in (('mes', reglas_datos.mes), ('total', reglas_datos.total))}
+
+
+def marcar_anomalias_incremental(df, reglas_datos, meses, huellas, anterior):
+    """Como analisis.marcar_anomalias, reutilizando la máscara guardada de las filas que no cambiaron.
+
+    huellas son las de df (todas sus columnas) y anterior el estado guardado por
+    analizar_datos_incremental, o None. Una fila conserva sus bits si sus valores
+    en las columnas del análisis anterior son los mismos (misma huella sobre esas
+    columnas) y los meses de entonces siguen al comienzo de meses. Devuelve
+    (máscara, filas evaluadas enteras, meses reutilizados).
+    """
+    cambiadas = np.ones(len(df), dtype=bool)
+    if anterior is not None:
+        meses_antes, columnas_antes = anterior['meta']['meses'], anterior['meta']['columnas']
+        columnas = {str(columna): columna for columna in df.columns}
+        if meses[:len(meses_antes)] == meses_antes and all(columna in columnas for columna in columnas_antes):
+            if list(columnas) == columnas_antes:
+                huellas_antes = huellas
+            else:
+                # Hay columnas nuevas (meses): se comparan las filas solo en las columnas de entonces
+                huellas_antes = huellas_filas(df[[columnas[columna] for columna in columnas_antes]])
+            unicas, primeras = np.unique(anterior['huellas'], return_index=True)
+            if len(unicas):
+                lugar = np.minimum(np.searchsorted(unicas, huellas_antes), len(unicas) - 1)
+                cambiadas = unicas[lugar] != huellas_antes
+                previas = anterior['mascaras'][primeras[lugar[~cambiadas]]].astype(np.uint64)
+    if cambiadas.all():
+        return marcar_anomalias(df, reglas_datos, meses), cambiadas, 0
+
+    # Filas nuevas o cambiadas: todos los meses
+    mascara = np.zeros(len(df), dtype=tipo_mascara(len(meses) + 1))
+    mascara[cambiadas] = marcar_anomalias(df[cambiadas], reglas_datos, meses)
+
+    # Filas sin cambios: los bits de los meses de antes, los de los meses nuevos y el total
+    conocidas = ~cambiadas
+    antes, total = len(meses_antes), len(meses)
+    bits = previas & np.uint64((1 << antes) - 1)
+    falla_total = previas >> np.uint64(antes) & np.uint64(1)
+    if total > antes:
+        valores = columnas_numericas(df)
+        por_mes = np.column_stack([valores(columna)[conocidas] for columna in reglas_datos.columnas_mes(meses[antes:])])
+        bits |= np.bitwise_or.reduce(reglas_datos.mes(por_mes).astype(np.uint64) << np.arange(antes, total, dtype=np.uint64),
+                                     axis=1)
+        ventana = reglas_datos.total.ventana
+        if ventana is not None:
+            # Los períodos que terminan en un mes nuevo empiezan como mucho ventana - 1 meses antes
+            desde = max(0, antes - ventana + 1)
+            por_mes = np.column_stack([valores(columna)[conocidas] for columna in reglas_datos.columnas_mes(meses[desde:])])
+            falla_total |= reglas_datos.total_por_ventanas(por_mes).astype(np.uint64)
+    mascara[conocidas] = bits | falla_total << np.uint64(total)
+    return mascara, cambiadas, antes
+
+
+def analizar_datos_incremental(df, tipo, ruta, reglas=None, estado=None):
+    """analisis.analizar_asistencia o analizar_productividad (según tipo) evaluando solo lo nuevo.
+
+    estado es el EstadoAnalisis donde se guarda la máscara de cada fila (el del
+    directorio predeterminado si es None). El resultado tiene además 'incremental'
+    con {'filas', 'filas_cambiadas', 'meses_nuevos'}; sin estado previo, todas las
+    filas y meses cuentan como nuevos.
+    """
+    estado = estado or EstadoAnalisis()
+    reglas = reglas or REGLAS_PREDETERMINADAS
+    reglas_datos = getattr(reglas, tipo)
+    meses = meses_archivo(df, reglas_datos)
+    configuracion = _configuracion_datos(reglas_datos)
+    with etapa("huellas_filas"):
+        huellas = huellas_filas(df)
+    anterior = estado.cargar(ruta, tipo, configuracion)
+    with etapa(f"anomalias_{tipo}"):
+        mascara, cambiadas, meses_antes = marcar_anomalias_incremental(df, reglas_datos, meses, huellas, anterior)
+    resultado = ANALIZADORES[tipo](df, reglas, mascara=mascara, huellas=huellas)
+    estado.guardar(ruta, tipo, configuracion, {'meses': meses, 'columnas': [str(columna) for columna in df.columns]},
+                   huellas=huellas, mascaras=mascara)
+    resultado['incremental'] = {'filas': len(df), 'filas_cambiadas': int(cambiadas.sum()),
+                                'meses_nuevos': len(meses) - meses_antes}
+    return resultado
@@ -0,0 +1,209 @@
+"""Ejecución por lotes, sin interfaz gráfica, de los tres análisis con sus reportes y papeles de trabajo.
+
+Uso:
+    python lote.py nomina.xlsx asistencia.xlsx productividad.xlsx directorio_salida --auditor "Nombre"
+"""
+import argparse
+import os
+import sys
+from os.path import basename
+
+import pandas as pd
+
+from cache_tablas import CacheTablas, DIRECTORIO_PREDETERMINADO
+from reglas import cargar_reglas
+from anexos import exportar_anexo, FORMATOS_ANEXO
+from graficos import usar_backend, cache_graficos, BACKENDS
+from carga import leer_tabla, iterar_bloques
+from formatos import usar_por_bloques
+from cruce import IndiceEmpleados, cruzar_empleados
+from incremental import EstadoAnalisis, analizar_datos_incremental, analizar_nomina_incremental, DIRECTORIO_ESTADO
+import perfil
+from perfil import etapa, perfilar
+from analisis import analizar_nomina, analizar_nomina_por_bloques, analizar_asistencia, analizar_productividad
+from reportes import (
+    crear_reporte_nomina_pdf, crear_reporte_asistencia_pdf, crear_reporte_productividad_pdf,
+    crear_papel_trabajo_nomina, crear_papel_trabajo_asistencia, crear_papel_trabajo_productividad,
+    crear_reporte_cruce_pdf,
+)
+
+
+TIPOS = ('nomina', 'asistencia', 'productividad')
+REPORTES = {
+    'nomina': crear_reporte_nomina_pdf,
+    'asistencia': crear_reporte_asistencia_pdf,
+    'productividad': crear_reporte_productividad_pdf,
+}
+PAPELES = {
+    'nomina': crear_papel_trabajo_nomina,
+    'asistencia': crear_papel_trabajo_asistencia,
+    'productividad': crear_papel_trabajo_productividad,
+}
+
+
+def analizar_archivo(tipo, ruta, cache=None, por_bloques=None, reglas=None, estado=None):
+    """Lee y analiza un archivo de tipo 'nomina', 'asistencia' o 'productividad'.
+
+    Con estado (EstadoAnalisis) se reutiliza el análisis anterior del mismo archivo:
+    solo se evalúan las filas y meses nuevos o cambiados (ver incremental.py).
+    """
+    if tipo == 'nomina':
+        if por_bloques is None:
+            por_bloques = usar_por_bloques(ruta)
+        if por_bloques:
+            return analizar_nomina_por_bloques(lambda: iterar_bloques(ruta, 'nomina'), reglas)
+        if estado is not None:
+            return analizar_nomina_incremental(leer_tabla(ruta, 'nomina', cache), ruta, reglas, estado)
+        return analizar_nomina(leer_tabla(ruta, 'nomina', cache), reglas)
+    df = leer_tabla(ruta, tipo, cache, reglas)
+    if estado is not None:
+        return analizar_datos_incremental(df, tipo, ruta, reglas, estado)
+    if tipo == 'asistencia':
+        return analizar_asistencia(df, reglas)
+    return analizar_productividad(df, reglas)
+
+
+def ejecutar_tipo(tipo, ruta, directorio_salida, auditor, cache=None, por_bloques=None, reglas=None,
+                  limite_filas=None, formato_anexo=None, control=None, estado=None):
+    """Analiza un archivo y escribe en directorio_salida su reporte, su papel de trabajo y, si se pide, su anexo.
+
+    Los parámetros son los de ejecutar_auditoria; control (ControlTarea) permite
+    cancelar entre etapas y durante la generación de los PDF. El análisis y cada
+    documento se miden como ejecuciones separadas (ver perfil.py).
+    Devuelve {'reporte_<tipo>': ruta, 'papel_trabajo_<tipo>': ruta}.
+    """
+    os.makedirs(directorio_salida, exist_ok=True)
+    datos = {'archivo': os.path.abspath(ruta), 'salida': os.path.abspath(directorio_salida)}
+    with perfilar(f"analisis_{tipo}", **datos):
+        data = analizar_archivo(tipo, ruta, cache, por_bloques, reglas, estado)
+        if control is not None:
+            control.verificar()
+        anexo = None
+        if formato_anexo:
+            anexo = exportar_anexo(tipo, data, os.path.join(directorio_salida, f"anexo_{tipo}"), formato_anexo)
+            if control is not None:
+                control.verificar()
+    with perfilar(f"reporte_{tipo}", **datos):
+        reporte = REPORTES[tipo](
+            os.path.join(directorio_salida, f"reporte_{tipo}.pdf"), data, auditor,
+            control=control, limite_filas=limite_filas, anexo=anexo)
+    with perfilar(f"papel_trabajo_{tipo}", **datos):
+        papel = PAPELES[tipo](
+            os.path.join(directorio_salida, f"papel_trabajo_{tipo}.pdf"), data, auditor, basename(ruta),
+            control=control, limite_filas=limite_filas, anexo=anexo)
+    return {f'reporte_{tipo}': reporte, f'papel_trabajo_{tipo}': papel}
+
+
+def indice_nomina(ruta, cache=None, por_bloques=None):
+    """IndiceEmpleados de un archivo de nómina; una nómina grande se recorre por bloques leyendo solo ID y nombre."""
+    if por_bloques is None:
+        por_bloques = usar_por_bloques(ruta)
+    if por_bloques:
+        columnas = ['ID de Empleado', 'Nombre']
+        df = pd.concat([bloque[columnas] for bloque in iterar_bloques(ruta, 'nomina')])
+    else:
+        df = leer_tabla(ruta, 'nomina', cache)
+    with etapa("indice_empleados"):
+        return IndiceEmpleados(df)
+
+
+def ejecutar_cruce(rutas, directorio_salida, auditor, cache=None, por_bloques=None, reglas=None,
+                   limite_filas=None, formato_anexo=None, control=None):
+    """Cruza los tres archivos por empleado y escribe reporte_cruce.pdf (y anexo_cruce si se pide).
+
+    Los parámetros son los de ejecutar_auditoria. Devuelve {'reporte_cruce': ruta}.
+    """
+    os.makedirs(directorio_salida, exist_ok=True)
+    with perfilar("cruce", salida=os.path.abspath(directorio_salida)):
+        data = cruzar_empleados(None, leer_tabla(rutas['asistencia'], 'asistencia', cache, reglas),
+                                leer_tabla(rutas['productividad'], 'productividad', cache, reglas), reglas,
+                                indice_nomina(rutas['nomina'], cache, por_bloques))
+        if control is not None:
+            control.verificar()
+        anexo = None
+        if formato_anexo:
+            anexo = exportar_anexo('cruce', data, os.path.join(directorio_salida, "anexo_cruce"), formato_anexo)
+        pdf_path = os.path.join(directorio_salida, "reporte_cruce.pdf")
+        return {'reporte_cruce': crear_reporte_cruce_pdf(pdf_path, data, auditor, control=control,
+                                                         limite_filas=limite_filas, anexo=anexo)}
+
+
+def ejecutar_auditoria(rutas, directorio_salida, auditor, cache=None, por_bloques=None, reglas=None,
+                       limite_filas=None, formato_anexo=None, estado=None):
+    """Analiza los archivos de nómina, asistencia y productividad y escribe todos los PDF en directorio_salida.
+
+    rutas es un diccionario con las claves 'nomina', 'asistencia' y 'productividad'.
+    cache es la CacheTablas usada para leer los archivos (la compartida si es None).
+    por_bloques fuerza (True) o impide (False) el análisis de la nómina por bloques;
+    con None se decide por el tamaño del archivo.
+    reglas es el ConjuntoReglas con los umbrales y cortes de escenario (los predeterminados si es None).
+    limite_filas recorta las tablas de los PDF; el listado completo queda en un CSV junto a cada uno.
+    formato_anexo ('xlsx', 'csv' o 'parquet') exporta además los listados completos de cada
+    análisis como anexo_<tipo> y los PDF enlazan a ese anexo en lugar de incluirlos enteros.
+    estado es el EstadoAnalisis del análisis incremental (None analiza los archivos completos).
+    Además se cruzan los tres archivos por empleado (reporte_cruce.pdf).
+    Devuelve un diccionario con las rutas de los documentos generados.
+    """
+    generados = {}
+    for tipo in TIPOS:
+        generados.update(ejecutar_tipo(tipo, rutas[tipo], directorio_salida, auditor, cache, por_bloques, reglas,
+                                       limite_filas, formato_anexo, estado=estado))
+    generados.update(ejecutar_cruce(rutas, directorio_salida, auditor, cache, por_bloques, reglas,
+                                    limite_filas, formato_anexo))
+    return generados
+
+
+def agregar_opciones(parser):
+    """Opciones de línea de comandos comunes a lote.py y lote_clientes.py."""
+    parser.add_argument("--auditor", default="", help="Nombre del auditor que firma los documentos")
+    parser.add_argument("--cache", default=DIRECTORIO_PREDETERMINADO, help="Directorio de la caché de tablas leídas")
+    parser.add_argument("--sin-cache", action="store_true", help="Lee siempre los archivos originales")
+    parser.add_argument("--estado", default=DIRECTORIO_ESTADO,
+                        help="Directorio del estado del último análisis de cada archivo, para reanalizar solo lo que cambió")
+    parser.add_argument("--sin-estado", action="store_true", help="Analiza siempre los archivos completos")
+    parser.add_argument("--por-bloques", action="store_true", default=None,
+                        help="Analiza la nómina por bloques aunque el archivo sea pequeño")
+    parser.add_argument("--reglas", help="Archivo JSON o YAML con los umbrales y cortes de escenario")
+    parser.add_argument("--max-filas-pdf", type=int, help="Filas máximas por tabla en los PDF; el resto va a un CSV aparte")
+    parser.add_argument("--anexo", choices=FORMATOS_ANEXO, help="Exporta los listados completos en este formato y los enlaza desde los PDF")
+    parser.add_argument("--perfil", metavar="ARCHIVO",
+                        help="Agrega a este archivo una línea JSON por análisis y documento con el tiempo y la memoria de cada etapa")
+    parser.add_argument("--perfil-memoria", action="store_true",
+                        help="Mide también la memoria reservada por etapa con tracemalloc (más lento)")
+    parser.add_argument("--graficos", choices=BACKENDS, default='reportlab',
+                        help="Backend de los gráficos: vectorial de reportlab o imagen de matplotlib")
+    parser.add_argument("--cache-graficos", default=cache_graficos.directorio,
+                        help="Directorio donde se guardan los gráficos PNG ya dibujados entre ejecuciones")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los reportes y papeles de trabajo de auditoría sin interfaz gráfica.")
+    parser.add_argument("nomina", help="Archivo de nómina (.xlsx, .csv, .parquet o .feather)")
+    parser.add_argument("asistencia", help="Archivo de asistencia (.xlsx, .csv, .parquet o .feather)")
+    parser.add_argument("productividad", help="Archivo de productividad (.xlsx, .csv, .parquet o .feather)")
+    parser.add_argument("salida", help="Directorio donde se escriben los reportes y papeles de trabajo")
+    agregar_opciones(parser)
+    args = parser.parse_args(argv)
+
+    rutas = {'nomina': args.nomina, 'asistencia': args.asistencia, 'productividad': args.productividad}
+    try:
+        cache = CacheTablas(args.cache, activa=not args.sin_cache)
+        estado = None if args.sin_estado else EstadoAnalisis(args.estado)
+        reglas = cargar_reglas(args.reglas) if args.reglas else None
+        usar_backend(args.graficos)
+        cache_graficos.directorio = args.cache_graficos
+        perfil.configurar(args.perfil, args.perfil_memoria)
+        generados = ejecutar_auditoria(rutas, args.salida, args.auditor, cache, args.por_bloques, reglas,
+                                       args.max_filas_pdf, args.anexo, estado)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for pdf_path in generados.values():
+        if pdf_path:
+            print(pdf_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
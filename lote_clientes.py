@@ -0,0 +1,367 @@
+"""Auditoría por lotes de muchos clientes a partir de un manifiesto, repartida en un pool de procesos.
+
+El manifiesto es un JSON con una lista de clientes (o {"clientes": [...]}):
+
+    [{"nombre": "Cliente A", "directorio": "clientes/a", "auditor": "Nombre"},
+     {"nombre": "Cliente B", "nomina": "b/nom.csv", "asistencia": "b/asis.csv", "productividad": "b/prod.csv"}]
+
+o un archivo de texto con un directorio de cliente por línea. En cada directorio se
+buscan los archivos cuyo nombre empieza por nomina, asistencia y productividad.
+
+Cada (cliente, tipo) es un trabajo independiente (lectura, análisis, anexo, reporte
+y papel de trabajo) que se ejecuta en uno de varios procesos trabajadores; los más
+grandes se envían primero para que los procesos terminen parejos. Cuando terminan
+los tres trabajos de un cliente se lanza su cruce por empleado (reporte_cruce.pdf),
+que aprovecha las tablas que esos trabajos dejaron en la caché. Un trabajo que falla
+se reintenta; uno que supera el tiempo máximo se cancela en el siguiente punto de
+control (entre etapas y en cada página de los PDF) y, si no llega a uno en
+MARGEN_CANCELACION segundos (una lectura de Excel o una búsqueda de similares
+muy largas), se termina su proceso y se reemplaza por otro. Los trabajos que
+superan el tiempo máximo no se reintentan. Cada cliente escribe en una carpeta
+con su nombre, sin separadores de ruta ni caracteres que no admita el sistema de
+archivos. Al final se escriben indice.json e indice.csv con el estado de cada trabajo.
+
+Uso:
+    python lote_clientes.py clientes.json directorio_salida --procesos 8 --tiempo-maximo 900
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from multiprocessing.connection import wait
+
+from cache_tablas import CacheTablas
+from formatos import FORMATOS
+from graficos import usar_backend, cache_graficos
+from incremental import EstadoAnalisis
+import perfil
+from lote import ejecutar_tipo, ejecutar_cruce, agregar_opciones, TIPOS
+from reglas import cargar_reglas
+from tareas import ControlTarea, OperacionCancelada
+
+CORRECTO = 'correcto'
+ERROR = 'error'
+TIEMPO_AGOTADO = 'tiempo agotado'
+# Trabajo de cada cliente que cruza sus tres archivos por empleado
+CRUCE = 'cruce'
+COLUMNAS_INDICE = ['cliente', 'tipo', 'estado', 'intentos', 'segundos', 'documentos', 'error']
+# Segundos que se espera, pasado el tiempo máximo, a que el trabajo se cancele solo antes de terminar su proceso
+MARGEN_CANCELACION = 10
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def directorio_cliente(nombre):
+    """Nombre de la carpeta de salida de un cliente: sin separadores de ruta, caracteres reservados ni '.' o '..'."""
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', nombre).strip(' .') or '_'
+
+
+def buscar_archivos(directorio):
+    """Archivos de nómina, asistencia y productividad de un directorio de cliente, por el comienzo del nombre."""
+    rutas = {}
+    for nombre in sorted(os.listdir(directorio)):
+        base, extension = os.path.splitext(nombre)
+        if extension.lower() not in FORMATOS or nombre.startswith('~$'):
+            continue
+        for tipo in TIPOS:
+            if _sin_acentos(base).startswith(tipo):
+                if tipo in rutas:
+                    raise ValueError(f"Hay más de un archivo de {tipo} en {directorio}")
+                rutas[tipo] = os.path.join(directorio, nombre)
+    return rutas
+
+
+def leer_manifiesto(ruta):
+    """Devuelve la lista de clientes del manifiesto: [{'nombre', 'auditor', 'nomina', 'asistencia', 'productividad'}].
+
+    Las rutas relativas se resuelven desde la carpeta del manifiesto. Un tipo sin
+    archivo queda como None y su trabajo se informa como error.
+    """
+    base = os.path.dirname(os.path.abspath(ruta))
+    with open(ruta, encoding='utf-8') as f:
+        if ruta.lower().endswith('.json'):
+            entradas = json.load(f)
+            if isinstance(entradas, dict):
+                entradas = entradas.get('clientes', [])
+        else:
+            entradas = [{'directorio': linea.strip()} for linea in f
+                        if linea.strip() and not linea.lstrip().startswith('#')]
+
+    clientes = []
+    for entrada in entradas:
+        directorio = entrada.get('directorio')
+        if directorio:
+            directorio = os.path.join(base, directorio)
+        nombre = entrada.get('nombre') or (os.path.basename(os.path.normpath(directorio)) if directorio else None)
+        if not nombre:
+            raise ValueError(f"Cliente sin nombre ni directorio en el manifiesto: {entrada}")
+        encontrados = buscar_archivos(directorio) if directorio else {}
+        cliente = {'nombre': nombre, 'auditor': entrada.get('auditor')}
+        for tipo in TIPOS:
+            archivo = entrada.get(tipo)
+            cliente[tipo] = os.path.join(base, archivo) if archivo else encontrados.get(tipo)
+        clientes.append(cliente)
+    # Dos nombres que solo difieren en mayúsculas o en caracteres reemplazados irían a la misma carpeta
+    if len({directorio_cliente(cliente['nombre']).lower() for cliente in clientes}) != len(clientes):
+        raise ValueError("Hay clientes repetidos (o con nombres que dan la misma carpeta) en el manifiesto.")
+    return clientes
+
+
+def ejecutar_trabajo(trabajo, opciones):
+    """Ejecuta un trabajo en un proceso trabajador y devuelve su resultado; nunca lanza excepciones.
+
+    Un temporizador cancela el ControlTarea al cumplirse opciones['tiempo_maximo'];
+    si el trabajo no llega a un punto de control, ejecutar_lote termina el proceso.
+    """
+    inicio = time.perf_counter()
+    control = ControlTarea()
+    temporizador = None
+    if opciones['tiempo_maximo']:
+        temporizador = threading.Timer(opciones['tiempo_maximo'], control.cancelar)
+        temporizador.daemon = True
+        temporizador.start()
+    try:
+        # Con spawn los procesos no heredan la configuración del proceso principal
+        usar_backend(opciones['graficos'])
+        cache_graficos.directorio = opciones['cache_graficos']
+        perfil.configurar(opciones['perfil'], opciones['perfil_memoria'])
+        cache = CacheTablas(opciones['cache'], activa=opciones['usar_cache'])
+        reglas = cargar_reglas(opciones['reglas']) if opciones['reglas'] else None
+        estado = EstadoAnalisis(opciones['estado']) if opciones['estado'] else None
+        if trabajo['tipo'] == CRUCE:
+            generados = ejecutar_cruce(trabajo['rutas'], trabajo['salida'], trabajo['auditor'], cache,
+                                       opciones['por_bloques'], reglas, opciones['limite_filas'],
+                                       opciones['formato_anexo'], control)
+        else:
+            generados = ejecutar_tipo(trabajo['tipo'], trabajo['ruta'], trabajo['salida'], trabajo['auditor'], cache,
+                                      opciones['por_bloques'], reglas, opciones['limite_filas'],
+                                      opciones['formato_anexo'], control, estado)
+        estado, error, documentos = CORRECTO, "", list(generados.values())
+    except OperacionCancelada:
+        estado, error, documentos = TIEMPO_AGOTADO, f"Superó el tiempo máximo de {opciones['tiempo_maximo']} s", []
+    except Exception as e:
+        estado, error, documentos = ERROR, f"{type(e).__name__}: {e}", []
+    finally:
+        if temporizador is not None:
+            temporizador.cancel()
+    return {'estado': estado, 'error': error, 'documentos': documentos,
+            'segundos': round(time.perf_counter() - inicio, 3)}
+
+
+def _atender(conexion):
+    """Bucle de un proceso trabajador: recibe (trabajo, opciones) y devuelve su resultado, hasta recibir None."""
+    while True:
+        try:
+            mensaje = conexion.recv()
+        except EOFError:
+            return
+        if mensaje is None:
+            return
+        conexion.send(ejecutar_trabajo(*mensaje))
+
+
+class Trabajador:
+    """Proceso que ejecuta trabajos de a uno y que se puede terminar sin afectar a los demás."""
+
+    def __init__(self):
+        self.conexion, extremo = multiprocessing.Pipe()
+        self.proceso = multiprocessing.Process(target=_atender, args=(extremo,), daemon=True)
+        self.proceso.start()
+        extremo.close()
+        # (trabajo, intento, inicio y límite en time.monotonic()) del trabajo en curso
+        self.actual = None
+
+    def enviar(self, i, intento, trabajo, opciones, tiempo_maximo=None):
+        inicio = time.monotonic()
+        limite = inicio + tiempo_maximo + MARGEN_CANCELACION if tiempo_maximo else None
+        self.conexion.send((trabajo, opciones))
+        self.actual = (i, intento, inicio, limite)
+
+    def cerrar(self, terminar=False):
+        """Detiene el proceso: al terminar su trabajo o, con terminar, en el acto."""
+        if terminar:
+            self.proceso.terminate()
+        else:
+            try:
+                self.conexion.send(None)
+            except OSError:
+                pass
+        self.proceso.join()
+        self.conexion.close()
+
+
+def _tamano(ruta):
+    try:
+        return os.path.getsize(ruta)
+    except (OSError, TypeError):
+        return 0
+
+
+def ejecutar_lote(clientes, directorio_salida, auditor="", procesos=None, reintentos=1, al_terminar=None, **opciones):
+    """Reparte los trabajos de todos los clientes en un pool de procesos y escribe el índice.
+
+    opciones son las de ejecutar_trabajo: tiempo_maximo, graficos, cache_graficos,
+    cache, usar_cache, reglas (ruta), por_bloques, limite_filas, formato_anexo,
+    estado (directorio del análisis incremental, None para no usarlo),
+    perfil (archivo de perfiles JSON, None para no escribirlos) y perfil_memoria.
+    procesos es la cantidad de procesos trabajadores (uno por núcleo si es None).
+    al_terminar(fila) se llama en el proceso principal cada vez que un trabajo termina.
+    Devuelve las filas del índice, en el orden del manifiesto: las de los tres
+    tipos de cada cliente y después la de su cruce.
+    """
+    # Cada cliente tiene un trabajo por tipo y, después, el de su cruce; cruce_de[i] es el cruce del trabajo i
+    trabajos, cruce_de = [], {}
+    for cliente in clientes:
+        salida = os.path.join(directorio_salida, directorio_cliente(cliente['nombre']))
+        cruce = len(trabajos) + len(TIPOS)
+        for tipo in TIPOS:
+            cruce_de[len(trabajos)] = cruce
+            trabajos.append({'cliente': cliente['nombre'], 'tipo': tipo, 'ruta': cliente[tipo], 'salida': salida,
+                             'auditor': cliente['auditor'] or auditor})
+        trabajos.append({'cliente': cliente['nombre'], 'tipo': CRUCE, 'ruta': None, 'salida': salida,
+                         'rutas': {tipo: cliente[tipo] for tipo in TIPOS}, 'auditor': cliente['auditor'] or auditor})
+    # Los archivos más grandes primero: los últimos trabajos en terminar son los cortos
+    orden = sorted((i for i in range(len(trabajos)) if trabajos[i]['tipo'] != CRUCE),
+                   key=lambda i: -_tamano(trabajos[i]['ruta']))
+
+    filas = [None] * len(trabajos)
+
+    def registrar(i, intentos, resultado):
+        filas[i] = {'cliente': trabajos[i]['cliente'], 'tipo': trabajos[i]['tipo'], 'intentos': intentos, **resultado}
+        if al_terminar is not None:
+            al_terminar(filas[i])
+
+    for i, trabajo in enumerate(trabajos):
+        rutas = trabajo['rutas'] if trabajo['tipo'] == CRUCE else {trabajo['tipo']: trabajo['ruta']}
+        faltantes = [tipo for tipo, ruta in rutas.items() if not ruta]
+        if faltantes:
+            # Reintentar no cambia nada: se informa sin ocupar el pool
+            registrar(i, 0, {'estado': ERROR, 'error': f"No se encontró el archivo de {', '.join(faltantes)}",
+                             'documentos': [], 'segundos': None})
+    orden = [i for i in orden if filas[i] is None]
+
+    cola = deque((i, 1) for i in orden)
+    procesos = procesos or os.cpu_count() or 1
+    tiempo_maximo = opciones.get('tiempo_maximo')
+    libres, ocupados = [], []
+
+    def terminado(trabajador, resultado):
+        """Registra (o reintenta) el trabajo de trabajador y, si era el último de su cliente, encola el cruce."""
+        i, intento, inicio, _ = trabajador.actual
+        trabajador.actual = None
+        if resultado['segundos'] is None:
+            resultado['segundos'] = round(time.monotonic() - inicio, 3)
+        if resultado['estado'] == ERROR and intento <= reintentos:
+            cola.append((i, intento + 1))
+            return
+        registrar(i, intento, resultado)
+        cruce = cruce_de.get(i)
+        if (cruce is not None and filas[cruce] is None
+                and all(filas[j] is not None for j in range(cruce - len(TIPOS), cruce))):
+            cola.append((cruce, 1))
+
+    try:
+        while cola or ocupados:
+            while cola and len(ocupados) < procesos:
+                trabajador = libres.pop() if libres else Trabajador()
+                i, intento = cola.popleft()
+                trabajador.enviar(i, intento, trabajos[i], opciones, tiempo_maximo)
+                ocupados.append(trabajador)
+
+            limites = [trabajador.actual[3] for trabajador in ocupados if trabajador.actual[3] is not None]
+            espera = max(0, min(limites) - time.monotonic()) if limites else None
+            # Despierta con un resultado, con la muerte de un proceso o con el primer límite de tiempo
+            wait([trabajador.conexion for trabajador in ocupados]
+                 + [trabajador.proceso.sentinel for trabajador in ocupados], espera)
+
+            for trabajador in list(ocupados):
+                resultado = None
+                if trabajador.conexion.poll():
+                    try:
+                        resultado = trabajador.conexion.recv()
+                    except EOFError:
+                        pass
+                    else:
+                        ocupados.remove(trabajador)
+                        libres.append(trabajador)
+                        terminado(trabajador, resultado)
+                        continue
+                if not trabajador.proceso.is_alive():
+                    # El proceso murió (memoria, señal): se informa el trabajo y se reemplaza el proceso
+                    codigo = trabajador.proceso.exitcode
+                    resultado = {'estado': ERROR, 'documentos': [], 'segundos': None,
+                                 'error': f"El proceso del trabajo terminó inesperadamente (código {codigo})"}
+                elif trabajador.actual[3] is not None and time.monotonic() >= trabajador.actual[3]:
+                    # No llegó a un punto de control: se termina el proceso y no se reintenta
+                    resultado = {'estado': TIEMPO_AGOTADO, 'documentos': [], 'segundos': None,
+                                 'error': f"Superó el tiempo máximo de {tiempo_maximo} s y se terminó su proceso"}
+                if resultado is not None:
+                    ocupados.remove(trabajador)
+                    trabajador.cerrar(terminar=True)
+                    terminado(trabajador, resultado)
+    finally:
+        for trabajador in libres:
+            trabajador.cerrar()
+        for trabajador in ocupados:
+            trabajador.cerrar(terminar=True)
+
+    escribir_indice(filas, directorio_salida)
+    return filas
+
+
+def escribir_indice(filas, directorio_salida):
+    """Escribe indice.json e indice.csv con una fila por trabajo."""
+    os.makedirs(directorio_salida, exist_ok=True)
+    with open(os.path.join(directorio_salida, "indice.json"), 'w', encoding='utf-8') as f:
+        json.dump(filas, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(directorio_salida, "indice.csv"), 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUMNAS_INDICE)
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow({**fila, 'documentos': ";".join(fila['documentos'])})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audita muchos clientes en paralelo a partir de un manifiesto.")
+    parser.add_argument("manifiesto", help="Manifiesto JSON de clientes o texto con un directorio por línea")
+    parser.add_argument("salida", help="Directorio de salida; cada cliente tiene su subdirectorio")
+    parser.add_argument("--procesos", type=int, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--tiempo-maximo", type=float, help="Segundos máximos por trabajo")
+    parser.add_argument("--reintentos", type=int, default=1, help="Reintentos de un trabajo que falla")
+    agregar_opciones(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        clientes = leer_manifiesto(args.manifiesto)
+        if args.reglas:
+            cargar_reglas(args.reglas)  # Un archivo de reglas inválido se informa antes de lanzar los trabajos
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    def informar(fila):
+        detalle = f" ({fila['error']})" if fila['error'] else ""
+        print(f"{fila['cliente']} / {fila['tipo']}: {fila['estado']}{detalle}", flush=True)
+
+    filas = ejecutar_lote(
+        clientes, args.salida, args.auditor, args.procesos, args.reintentos, informar,
+        tiempo_maximo=args.tiempo_maximo, graficos=args.graficos, cache_graficos=args.cache_graficos,
+        cache=args.cache, usar_cache=not args.sin_cache, reglas=args.reglas, por_bloques=args.por_bloques,
+        limite_filas=args.max_filas_pdf, formato_anexo=args.anexo, estado=None if args.sin_estado else args.estado,
+        perfil=args.perfil, perfil_memoria=args.perfil_memoria)
+    fallidos = sum(fila['estado'] != CORRECTO for fila in filas)
+    print(f"{len(filas) - fallidos} de {len(filas)} trabajos correctos. Índice en {os.path.join(args.salida, 'indice.csv')}")
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
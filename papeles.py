@@ -0,0 +1,469 @@
+"""Papeles de trabajo de auditoría generados a partir de plantillas.
+
+Los papeles de nómina, asistencia y productividad comparten la misma estructura
+(portada, índice, siete secciones de texto, anexos y firma); solo cambian los
+textos de cada escenario y las tablas de los anexos. Cada plantilla se compila
+una vez al importar el módulo y los datos (fecha, auditor, porcentaje de
+anomalías, tablas) se insertan al generar el documento.
+"""
+import string
+from datetime import datetime
+
+from reportlab.platypus import Paragraph, Spacer, PageBreak
+
+from analisis import tabla_total
+from reglas import reglas_de
+from graficos import imagen_grafico
+from tablas_pdf import tabla_por_bloques, archivo_complementario
+from estilos import ESTILO_TEXTO, ESTILO_TITULO, ESTILO_SUBTITULO
+
+TITULOS = {
+    'nomina': "Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Nómina",
+    'asistencia': "Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Asistencia",
+    'productividad': "Papel de Trabajo de Auditoría en Sistemas en soporte a la Auditoría Forense - Productividad",
+}
+
+# Secciones de texto en el orden del documento: (clave en TEXTOS, título)
+SECCIONES = [
+    ('objetivo', "Objetivo del Papel de Trabajo"),
+    ('antecedentes', "Antecedentes del Caso"),
+    ('metodologia', "Metodología"),
+    ('hallazgos', "Hallazgos"),
+    ('impacto', "Evaluación de Impacto"),
+    ('recomendaciones', "Recomendaciones"),
+    ('conclusion', "Conclusión"),
+]
+
+INDICE = """
+    1. Portada<br/>
+    2. Índice<br/>
+    3. Objetivo del Papel de Trabajo<br/>
+    4. Antecedentes del Caso<br/>
+    5. Metodología<br/>
+    6. Hallazgos<br/>
+    7. Evaluación de Impacto<br/>
+    8. Recomendaciones<br/>
+    9. Conclusión<br/>
+    10. Anexos<br/>
+    11. Firma del Auditor
+"""
+
+# Textos por tipo de papel: 'objetivo' y 'metodologia' son comunes a los tres
+# escenarios; el resto depende del escenario. {porcentaje} se reemplaza al generar.
+TEXTOS = {
+    'nomina': {
+        'objetivo': """
+            Propósito: Verificar la exactitud y legitimidad de los registros de nómina para asegurar que todos los pagos
+            correspondan a empleados reales y estén correctamente registrados.
+            Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar
+            el proceso de revisión de nómina y los hallazgos correspondientes.
+        """,
+        'metodologia': """
+            Procedimientos de recopilación de evidencia: Se revisaron registros de nómina, contratos de trabajo, y extractos bancarios.
+            Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
+            Análisis forense: Comparación detallada de los registros de nómina con la documentación de los empleados.
+            Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de nómina.
+        """,
+        1: {
+            'antecedentes': """
+                Descripción del incidente: Se sospecha que podría haber empleados fantasmas en la nómina de Verde Campo.
+                La auditoría busca confirmar o descartar esta posibilidad.
+                Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
+            """,
+            'hallazgos': """
+                Evidencias clave: Todos los registros revisados coinciden correctamente; no se encontraron discrepancias.
+                Insertar porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Los registros de nómina corresponden con las cuentas bancarias verificadas y no se
+                detectaron empleados fantasmas.
+                Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
+            """,
+            'impacto': """
+                Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la nómina.
+                Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: No se requieren acciones correctivas.
+                Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de nómina.
+            """,
+            'conclusion': """
+                Resumen: No se encontraron anomalías en los registros de nómina. La empresa mantiene un control adecuado sobre sus procesos de pago.
+                Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
+            """,
+        },
+        2: {
+            'antecedentes': """
+                Descripción del incidente: Se sospecha que podría haber empleados fantasmas en la nómina. Esta auditoría busca verificar la validez de los registros de nómina.
+                Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se encontraron pequeñas discrepancias en los montos pagados a algunos empleados.
+                Insertar porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Aunque se detectaron diferencias en los pagos, estas no son significativas en términos de impacto financiero.
+                Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las discrepancias no afectan de manera significativa la situación financiera de la empresa.
+                Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Revisar y ajustar los procesos de cálculo de nómina para corregir las discrepancias menores encontradas.
+                Mejoras en seguridad: Implementar una revisión mensual de los registros de nómina para detectar y corregir errores menores de manera oportuna.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías menores en los registros de nómina que no son significativas. Se recomienda hacer ajustes menores.
+                Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
+            """,
+        },
+        3: {
+            'antecedentes': """
+                Descripción del incidente: Se sospecha la existencia de empleados fantasmas en la nómina. La auditoría forense busca identificar y evaluar la magnitud de cualquier fraude.
+                Alcance de la auditoría: Revisión de los registros de nómina y pagos bancarios correspondientes a los últimos 6 meses.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se detectaron trabajadores y cuentas duplicadas y cuentas bancarias que no corresponden a empleados reales, así como empleados fantasmas en la nómina.
+                Insertar porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Las discrepancias identificadas son materiales y sugieren la presencia de fraude o errores graves en el sistema de nómina.
+                Cronología de eventos: Las anomalías materiales se observaron consistentemente durante el periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las anomalías detectadas tienen un impacto financiero significativo y pueden haber comprometido la integridad financiera de la empresa.
+                Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves y potenciales sanciones.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Iniciar una revisión completa del sistema de nómina, incluyendo una auditoría externa, y tomar medidas disciplinarias contra los responsables.
+                Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías materiales en los registros de nómina que requieren una acción inmediata y significativa.
+                Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
+            """,
+        },
+    },
+    'asistencia': {
+        'objetivo': """
+            Propósito: Verificar la exactitud y legitimidad de los registros de asistencia para asegurar que todos los
+            empleados cumplan con las políticas de la empresa.
+            Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar
+            el proceso de revisión de asistencia y los hallazgos correspondientes.
+        """,
+        'metodologia': """
+            Procedimientos de recopilación de evidencia: Se revisaron los registros de asistencia proporcionados por el cliente.
+            Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
+            Análisis forense: Comparación detallada de los registros de asistencia con las políticas de la empresa.
+            Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de asistencia.
+        """,
+        1: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia.
+                No se encontraron anomalías significativas.
+                Alcance de la auditoría: Revisión de los registros de asistencia de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: No se encontraron discrepancias significativas en los registros de asistencia.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Los registros de asistencia son coherentes con las políticas de la empresa.
+                Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
+            """,
+            'impacto': """
+                Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la asistencia.
+                Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: No se requieren acciones correctivas.
+                Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de asistencia.
+            """,
+            'conclusion': """
+                Resumen: No se encontraron anomalías en los registros de asistencia. La empresa mantiene un control adecuado sobre sus procesos de asistencia.
+                Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
+            """,
+        },
+        2: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia.
+                Se encontraron algunas discrepancias menores.
+                Alcance de la auditoría: Revisión de los registros de asistencia de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se encontraron algunas discrepancias menores en los registros de asistencia.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Aunque se detectaron algunas diferencias, estas no son significativas en términos de cumplimiento.
+                Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las discrepancias no afectan de manera significativa la situación de la empresa.
+                Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Revisar y ajustar los procesos de control de asistencia para corregir las discrepancias menores encontradas.
+                Mejoras en seguridad: Implementar una revisión mensual de los registros de asistencia para detectar y corregir errores menores de manera oportuna.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías menores en los registros de asistencia que no son significativas. Se recomienda hacer ajustes menores.
+                Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
+            """,
+        },
+        3: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de asistencia.
+                Se encontraron anomalías significativas que requieren atención inmediata.
+                Alcance de la auditoría: Revisión de los registros de asistencia de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se detectaron discrepancias significativas en los registros de asistencia.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Las discrepancias identificadas sugieren la necesidad de una revisión urgente del sistema de control de asistencia.
+                Cronología de eventos: Las anomalías se observaron consistentemente durante el periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las anomalías detectadas tienen un impacto significativo en la organización.
+                Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Iniciar una revisión completa del sistema de control de asistencia.
+                Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías significativas en los registros de asistencia que requieren acción inmediata.
+                Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
+            """,
+        },
+    },
+    'productividad': {
+        'objetivo': """
+            Propósito: Verificar la exactitud y legitimidad de los registros de productividad para asegurar que todos los
+            empleados cumplan con las políticas de la empresa.
+            Uso del documento: Este documento servirá como referencia durante la auditoría forense para documentar
+            el proceso de revisión de productividad y los hallazgos correspondientes.
+        """,
+        'metodologia': """
+            Procedimientos de recopilación de evidencia: Se revisaron los registros de productividad proporcionados por el cliente.
+            Cadena de custodia: Los documentos fueron resguardados en un repositorio digital seguro con acceso limitado al equipo auditor.
+            Análisis forense: Comparación detallada de los registros de productividad con las políticas de la empresa.
+            Documentación de los procedimientos: Se documentaron todos los pasos seguidos en la revisión de los registros de productividad.
+        """,
+        1: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad.
+                No se encontraron anomalías significativas.
+                Alcance de la auditoría: Revisión de los registros de productividad de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: No se encontraron discrepancias significativas en los registros de productividad.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Los registros de productividad son coherentes con las políticas de la empresa.
+                Cronología de eventos: No aplicable, ya que no se encontraron incidentes relevantes.
+            """,
+            'impacto': """
+                Impacto en la organización: No se identificaron impactos negativos en la organización relacionados con la productividad.
+                Implicaciones legales y de cumplimiento: No se detectaron infracciones legales o normativas.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: No se requieren acciones correctivas.
+                Mejoras en seguridad: Se recomienda continuar con los procedimientos actuales de validación de productividad.
+            """,
+            'conclusion': """
+                Resumen: No se encontraron anomalías en los registros de productividad. La empresa mantiene un control adecuado sobre sus procesos de productividad.
+                Reflexión sobre controles: Los controles actuales son efectivos y no requieren modificaciones.
+            """,
+        },
+        2: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad.
+                Se encontraron algunas discrepancias menores.
+                Alcance de la auditoría: Revisión de los registros de productividad de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se encontraron algunas discrepancias menores en los registros de productividad.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Aunque se detectaron algunas diferencias, estas no son significativas en términos de cumplimiento.
+                Cronología de eventos: Las discrepancias se observaron esporádicamente a lo largo del periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las discrepancias no afectan de manera significativa la situación de la empresa.
+                Implicaciones legales y de cumplimiento: Las anomalías detectadas no constituyen una infracción legal o normativa grave.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Revisar y ajustar los procesos de control de productividad para corregir las discrepancias menores encontradas.
+                Mejoras en seguridad: Implementar una revisión mensual de los registros de productividad para detectar y corregir errores menores de manera oportuna.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías menores en los registros de productividad que no son significativas. Se recomienda hacer ajustes menores.
+                Reflexión sobre controles: Los controles son adecuados, pero pueden beneficiarse de una revisión adicional.
+            """,
+        },
+        3: {
+            'antecedentes': """
+                Descripción del incidente: Se realizó una auditoría para verificar la exactitud de los registros de productividad.
+                Se encontraron anomalías significativas que requieren atención inmediata.
+                Alcance de la auditoría: Revisión de los registros de productividad de {periodo}.
+            """,
+            'hallazgos': """
+                Evidencias clave: Se detectaron discrepancias significativas en los registros de productividad.
+                Porcentaje de anomalías encontradas: {porcentaje}%.
+                Análisis de evidencias: Las discrepancias identificadas sugieren la necesidad de una revisión urgente del sistema de control de productividad.
+                Cronología de eventos: Las anomalías se observaron consistentemente durante el periodo revisado.
+            """,
+            'impacto': """
+                Impacto en la organización: Las anomalías detectadas tienen un impacto significativo en la organización.
+                Implicaciones legales y de cumplimiento: Las irregularidades detectadas podrían implicar infracciones legales graves.
+            """,
+            'recomendaciones': """
+                Acciones correctivas: Iniciar una revisión completa del sistema de control de productividad.
+                Mejoras en seguridad: Implementar controles más estrictos y auditorías internas regulares para prevenir futuros incidentes.
+            """,
+            'conclusion': """
+                Resumen: Se encontraron anomalías significativas en los registros de productividad que requieren acción inmediata.
+                Reflexión sobre controles: Los controles actuales son inadecuados y necesitan una revisión urgente.
+            """,
+        },
+    },
+}
+
+
+class TextoCompilado:
+    """Texto de una sección con sus campos ya identificados.
+
+    Los textos sin campos se devuelven tal cual; los demás se formatean con el
+    contexto del documento.
+    """
+
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+        self.campos = {campo for _, campo, _, _ in string.Formatter().parse(plantilla) if campo}
+
+    def __call__(self, contexto):
+        if not self.campos:
+            return self.plantilla
+        return self.plantilla.format(**{campo: contexto[campo] for campo in self.campos})
+
+
+class PlantillaPapel:
+    """Papel de trabajo de un tipo y escenario con sus secciones ya compiladas."""
+
+    def __init__(self, titulo, secciones, anexos):
+        self.titulo = titulo
+        self.secciones = [(titulo_seccion, TextoCompilado(texto)) for titulo_seccion, texto in secciones]
+        self.anexos = anexos
+
+    def generar(self, doc, data, contexto, limite_filas=None, anexo=None):
+        """Construye el papel de trabajo en doc (SimpleDocTemplate) con los datos y el contexto indicados.
+
+        contexto debe tener 'auditor', 'nombre_archivo', 'porcentaje' y 'periodo'.
+        limite_filas recorta las tablas de los anexos y anexo (resultado de
+        anexos.exportar_anexo) hace que enlacen al anexo de datos (ver
+        tablas_pdf.tabla_por_bloques).
+        """
+        fecha = datetime.now().strftime("%Y-%m-%d")
+        elements = [
+            # Portada
+            Paragraph(self.titulo, ESTILO_TITULO),
+            Spacer(1, 24),
+            Paragraph(f"Fecha: {fecha}", ESTILO_TEXTO),
+            Paragraph(f"Auditor/es: {contexto['auditor']}", ESTILO_TEXTO),
+            Paragraph(f"Cliente/Organización: {contexto['nombre_archivo']}", ESTILO_TEXTO),
+            PageBreak(),
+            Paragraph("Índice", ESTILO_TITULO),
+            Paragraph(INDICE, ESTILO_TEXTO),
+            PageBreak(),
+        ]
+        for titulo_seccion, texto in self.secciones:
+            elements += [Paragraph(titulo_seccion, ESTILO_TITULO), Paragraph(texto(contexto), ESTILO_TEXTO), PageBreak()]
+
+        elements += [Paragraph("Anexos", ESTILO_TITULO), PageBreak()]
+        elements += self.anexos(data, doc, limite_filas, anexo or {})
+
+        elements += [
+            PageBreak(),
+            Paragraph("Firma del Auditor", ESTILO_TITULO),
+            Paragraph(f"Firma: {contexto['auditor']}", ESTILO_TEXTO),
+        ]
+        doc.build(elements)
+
+
+def _tabla(df, columnas, doc, sufijo, limite_filas, anexo):
+    """Tabla de anexo paginada; si se recorta, el listado completo va al anexo de datos o a un CSV junto al papel."""
+    return tabla_por_bloques(df, columnas, doc.width, limite_filas, archivo_complementario(doc.filename, sufijo),
+                             anexo.get(sufijo))
+
+
+def _grafico(titulo, nombre, data):
+    return [Spacer(1, 12), Paragraph(titulo, ESTILO_SUBTITULO), imagen_grafico(nombre, data)]
+
+
+def _anexos_nomina(nomina_data, doc, limite_filas, anexo):
+    columnas_nombre = ['ID de Empleado', 'Nombre']
+    columnas_cuenta = ['ID de Empleado', 'Nombre', 'Cuenta Bancaria']
+    return [
+        Paragraph("Empleados Duplicados por Nombre:", ESTILO_SUBTITULO),
+        *_tabla(nomina_data['duplicados_nombre'], columnas_nombre, doc, 'duplicados_nombre', limite_filas, anexo),
+        Paragraph("Empleados Duplicados por Cuenta Bancaria:", ESTILO_SUBTITULO),
+        *_tabla(nomina_data['duplicados_cuenta'], columnas_cuenta, doc, 'duplicados_cuenta', limite_filas, anexo),
+        *_grafico("Gráfico de Nombres Duplicados:", 'nombres_duplicados', nomina_data),
+        *_grafico("Gráfico de Cuentas Bancarias Duplicadas:", 'cuentas_duplicadas', nomina_data),
+    ]
+
+
+def _anexos_asistencia(asistencia_data, doc, limite_filas, anexo):
+    reglas = reglas_de(asistencia_data, 'asistencia')
+    meses = asistencia_data['meses']
+    anomalias = tabla_total(asistencia_data['all_anomalías'], reglas, meses)
+    anomalias_total = tabla_total(asistencia_data['total_anomalías'], reglas, meses)
+    return [
+        Paragraph(f"Empleados con {reglas.mes.describir(mayuscula=True)} Días Trabajados en algún mes:", ESTILO_SUBTITULO),
+        *_tabla(anomalias, list(anomalias.columns), doc, 'anomalias', limite_filas, anexo),
+        Paragraph(f"Empleados con {reglas.total.describir(mayuscula=True)} Días Trabajados {reglas.alcance_total()}:", ESTILO_SUBTITULO),
+        *_tabla(anomalias_total, list(anomalias_total.columns), doc, 'anomalias_total', limite_filas, anexo),
+        *_grafico("Gráfico de Anomalías en Días Trabajados:", 'dias_trabajados', asistencia_data),
+    ]
+
+
+def _anexos_productividad(productividad_data, doc, limite_filas, anexo):
+    reglas = reglas_de(productividad_data, 'productividad')
+    df, meses = productividad_data['df_productividad'], productividad_data['meses']
+    anomalias = tabla_total(df, reglas, meses, productividad_data['indices_anomalías'])
+    anomalias_total = tabla_total(df, reglas, meses, productividad_data['indices_total'])
+    return [
+        Paragraph(f"Empleados con {reglas.mes.describir(mayuscula=True)} Tareas Realizadas en algún mes:", ESTILO_SUBTITULO),
+        *_tabla(anomalias, list(anomalias.columns), doc, 'anomalias', limite_filas, anexo),
+        Paragraph(f"Empleados con {reglas.total.describir(mayuscula=True)} Tareas Realizadas {reglas.alcance_total()}:", ESTILO_SUBTITULO),
+        *_tabla(anomalias_total, list(anomalias_total.columns), doc, 'anomalias_total', limite_filas, anexo),
+        *_grafico("Gráfico de Anomalías en Tareas Realizadas:", 'tareas_realizadas', productividad_data),
+    ]
+
+
+ANEXOS = {
+    'nomina': _anexos_nomina,
+    'asistencia': _anexos_asistencia,
+    'productividad': _anexos_productividad,
+}
+
+# Plantillas compiladas una sola vez: PLANTILLAS[tipo][escenario]
+PLANTILLAS = {
+    tipo: {
+        escenario: PlantillaPapel(
+            TITULOS[tipo],
+            [(titulo, {**textos, **textos[escenario]}[clave]) for clave, titulo in SECCIONES],
+            ANEXOS[tipo],
+        )
+        for escenario in (1, 2, 3)
+    }
+    for tipo, textos in TEXTOS.items()
+}
+
+
+def _periodo(data):
+    """Meses revisados, para el alcance de la auditoría."""
+    meses = data.get('meses')
+    if not meses:
+        return "los últimos 6 meses"
+    if len(meses) == 1:
+        return f"{meses[0]} (1 mes)"
+    return f"{meses[0]} a {meses[-1]} ({len(meses)} meses)"
+
+
+def generar_papel_trabajo(doc, tipo, escenario, data, auditor, nombre_archivo, porcentaje_anomalías,
+                          limite_filas=None, anexo=None):
+    """Construye en doc el papel de trabajo de tipo ('nomina', 'asistencia' o 'productividad') del escenario dado."""
+    contexto = {'auditor': auditor, 'nombre_archivo': nombre_archivo, 'porcentaje': porcentaje_anomalías,
+                'periodo': _periodo(data)}
+    PLANTILLAS[tipo][escenario].generar(doc, data, contexto, limite_filas, anexo)
@@ -0,0 +1,274 @@
+"""Medición por etapas del tiempo y la memoria de cada análisis y documento.
+
+Las funciones de lectura, análisis, gráficos y PDF marcan sus etapas con
+
+    with etapa("leer_excel"):
+        ...
+
+Si el hilo no tiene un Perfil activo, etapa() no mide nada. Un Perfil se activa
+con perfilar(), que envuelve una ejecución completa (un análisis, un reporte, un
+papel de trabajo). Al terminar, perfilar() agrega una línea JSON al archivo de
+perfiles, para seguir el rendimiento entre versiones y tamaños de entrada, y el
+resumen queda para la barra de estado de la interfaz.
+
+Por etapa se registran:
+- el tiempo real;
+- el tiempo de CPU del proceso;
+- la memoria residente del proceso al terminar la etapa y cuánto cambió durante
+  ella (/proc en Linux, psutil si está instalado);
+- el pico de memoria residente durante la etapa, en Linux: el pico del proceso
+  (VmHWM) se reinicia al empezar cada etapa, como el de tracemalloc;
+- con memoria=True, cuánta memoria de Python se reservó como máximo durante la
+  etapa (tracemalloc, que hace todo bastante más lento).
+
+La memoria residente es la de todo el proceso: si corren varias ejecuciones a la
+vez en distintos hilos, sus mediciones se mezclan.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from tareas import OperacionCancelada
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ARCHIVO_PREDETERMINADO = os.environ.get(
+    "AUDITORIA_PERFIL", os.path.join(os.path.expanduser("~"), ".cache", "auditoria", "perfil.jsonl"))
+MB = 1024 ** 2
+
+# Configuración del proceso (ver configurar): dónde se escriben las líneas y si se usa tracemalloc
+destino = ARCHIVO_PREDETERMINADO
+memoria = os.environ.get("AUDITORIA_PERFIL_MEMORIA") == "1"
+
+_perfil_actual = contextvars.ContextVar('perfil', default=None)
+
+
+def configurar(archivo=ARCHIVO_PREDETERMINADO, con_memoria=False):
+    """Define el archivo de perfiles del proceso (None para no escribirlos) y si se mide con tracemalloc."""
+    global destino, memoria
+    destino, memoria = archivo, con_memoria
+
+
+def rss_mb():
+    """Memoria residente actual del proceso en MB, o None si no se puede saber."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / MB
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def rss_pico_mb():
+    """Pico de memoria residente del proceso (VmHWM de Linux) en MB desde el último reiniciar_pico(), o None."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def reiniciar_pico():
+    """Lleva el pico de memoria residente a la memoria actual (Linux 4.0 o posterior); False si no se puede."""
+    global _reinicio_disponible
+    if not _reinicio_disponible:
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        _reinicio_disponible = False
+        return False
+
+
+_reinicio_disponible = sys.platform.startswith('linux')
+
+
+def _version():
+    """Commit del directorio de la aplicación si es un repositorio git, o None."""
+    git = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".git")
+    try:
+        with open(os.path.join(git, "HEAD"), encoding='utf-8') as f:
+            cabeza = f.read().strip()
+        if not cabeza.startswith("ref: "):
+            return cabeza[:12]
+        referencia = cabeza[5:]
+        try:
+            with open(os.path.join(git, referencia), encoding='utf-8') as f:
+                return f.read().strip()[:12]
+        except FileNotFoundError:
+            with open(os.path.join(git, "packed-refs"), encoding='utf-8') as f:
+                for linea in f:
+                    if linea.rstrip().endswith(" " + referencia):
+                        return linea[:12]
+    except OSError:
+        pass
+    return None
+
+
+def _redondear(mb):
+    return round(mb, 1) if mb is not None else None
+
+
+class Perfil:
+    """Etapas medidas de una ejecución.
+
+    etapas es la lista de mediciones en el orden en que empezaron, cada una con
+    'etapa', 'nivel' (0 la ejecución completa, 1 sus etapas, 2 las etapas dentro
+    de éstas...), 'segundos', 'cpu', 'rss_mb' (al terminar), 'rss_delta_mb',
+    'rss_pico_mb' (None si no se puede medir por etapa) y, con memoria,
+    'memoria_pico_mb'. datos son anotaciones de la ejecución (archivo, filas...).
+    """
+
+    def __init__(self, nombre, memoria=False):
+        self.nombre = nombre
+        self.memoria = memoria
+        self.etapas = []
+        self.datos = {}
+        self.estado = None
+        self._pila = []
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        medicion = {'etapa': nombre, 'nivel': len(self._pila)}
+        self.etapas.append(medicion)
+        marco = {'inicio': time.perf_counter(), 'cpu': time.process_time(), 'pico_hijas': 0, 'rss_pico_hijas': 0}
+        # El pico de memoria residente se reinicia como el de tracemalloc (más abajo)
+        pico = rss_pico_mb()
+        if pico is not None and self._pila:
+            self._pila[-1]['rss_pico_hijas'] = max(self._pila[-1]['rss_pico_hijas'], pico)
+        marco['rss_pico'] = pico is not None and reiniciar_pico()
+        marco['rss'] = rss_mb()
+        if self.memoria and tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            # El pico se reinicia para medir esta etapa; la que la contiene conserva el suyo
+            if self._pila:
+                self._pila[-1]['pico_hijas'] = max(self._pila[-1]['pico_hijas'], pico)
+            tracemalloc.reset_peak()
+            marco['memoria'] = actual
+        self._pila.append(marco)
+        try:
+            yield medicion
+        finally:
+            self._pila.pop()
+            medicion['segundos'] = round(time.perf_counter() - marco['inicio'], 4)
+            medicion['cpu'] = round(time.process_time() - marco['cpu'], 4)
+            rss = rss_mb()
+            medicion['rss_mb'] = _redondear(rss)
+            medicion['rss_delta_mb'] = _redondear(rss - marco['rss']) if rss is not None and marco['rss'] is not None else None
+            pico = rss_pico_mb() if marco['rss_pico'] else None
+            if pico is not None:
+                pico = max(pico, marco['rss_pico_hijas'])
+                if self._pila:
+                    self._pila[-1]['rss_pico_hijas'] = max(self._pila[-1]['rss_pico_hijas'], pico)
+            medicion['rss_pico_mb'] = _redondear(pico)
+            if 'memoria' in marco:
+                pico = max(tracemalloc.get_traced_memory()[1], marco['pico_hijas'])
+                medicion['memoria_pico_mb'] = round((pico - marco['memoria']) / MB, 2)
+                if self._pila:
+                    self._pila[-1]['pico_hijas'] = max(self._pila[-1]['pico_hijas'], pico)
+
+    def registro(self):
+        """Diccionario de la línea JSON: la ejecución completa, sus datos y sus etapas."""
+        total = self.etapas[0] if self.etapas else {}
+        return {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'ejecucion': self.nombre,
+            'estado': self.estado,
+            'version': _version(),
+            'python': platform.python_version(),
+            'sistema': platform.system(),
+            **self.datos,
+            **{clave: valor for clave, valor in total.items() if clave not in ('etapa', 'nivel')},
+            'etapas': self.etapas[1:],
+        }
+
+    def resumen(self, maximo=3):
+        """Texto corto para la barra de estado: tiempo total, las etapas más lentas y el pico de memoria."""
+        if not self.etapas or 'segundos' not in self.etapas[0]:
+            return ""
+        # Solo las etapas que no contienen otras, para no contar dos veces el mismo tiempo
+        hojas = [medicion for i, medicion in enumerate(self.etapas[1:], 1)
+                 if i + 1 >= len(self.etapas) or self.etapas[i + 1]['nivel'] <= medicion['nivel']]
+        lentas = sorted(hojas, key=lambda medicion: -medicion['segundos'])[:maximo]
+        texto = f"{self.etapas[0]['segundos']:.2f} s"
+        if lentas:
+            texto += " (" + ", ".join(f"{m['etapa']} {m['segundos']:.2f} s" for m in lentas) + ")"
+        total = self.etapas[0]
+        if total['rss_pico_mb'] is not None:
+            texto += f", pico de memoria {total['rss_pico_mb']:.0f} MB"
+        elif total['rss_mb'] is not None:
+            texto += f", memoria {total['rss_mb']:.0f} MB ({total['rss_delta_mb']:+.0f} MB)"
+        return texto
+
+    def escribir(self, archivo):
+        """Agrega la línea JSON de la ejecución al archivo (una sola escritura, en modo de anexar)."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+            with open(archivo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.registro(), ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass  # Sin perfil escrito; la auditoría no se interrumpe por eso
+
+
+@contextlib.contextmanager
+def perfilar(nombre, **datos):
+    """Mide el bloque como una ejecución con Perfil propio y escribe su línea en destino.
+
+    datos se agregan a la línea (por ejemplo, el archivo de entrada). Devuelve el
+    Perfil; la línea se escribe también si el bloque falla o se cancela.
+    """
+    perfil = Perfil(nombre, memoria)
+    perfil.datos.update(datos)
+    iniciar_tracemalloc = perfil.memoria and not tracemalloc.is_tracing()
+    if iniciar_tracemalloc:
+        tracemalloc.start()
+    token = _perfil_actual.set(perfil)
+    try:
+        with perfil.etapa(nombre):
+            yield perfil
+        perfil.estado = 'correcto'
+    except OperacionCancelada:
+        perfil.estado = 'cancelado'
+        raise
+    except BaseException:
+        perfil.estado = 'error'
+        raise
+    finally:
+        _perfil_actual.reset(token)
+        if iniciar_tracemalloc:
+            tracemalloc.stop()
+        if destino:
+            perfil.escribir(destino)
+
+
+@contextlib.contextmanager
+def etapa(nombre):
+    """Mide el bloque como una etapa del Perfil activo en el hilo; sin Perfil no hace nada."""
+    perfil = _perfil_actual.get()
+    if perfil is None:
+        yield None
+        return
+    with perfil.etapa(nombre) as medicion:
+        yield medicion
+
+
+def anotar(**datos):
+    """Agrega datos (filas, bytes...) a la línea de la ejecución activa, si la hay."""
+    perfil = _perfil_actual.get()
+    if perfil is not None:
+        perfil.datos.update(datos)
@@ -0,0 +1,227 @@
+"""Reglas de auditoría declarativas: umbrales de anomalía y cortes de escenario.
+
+Los umbrales (días trabajados, tareas realizadas) y los porcentajes que deciden el
+escenario del papel de trabajo se describen en un archivo JSON (o YAML, si PyYAML
+está instalado) y se compilan una sola vez en predicados vectorizados de NumPy.
+Cualquier clave ausente toma el valor de DEFINICION_PREDETERMINADA, así que un
+archivo de cliente solo necesita indicar lo que cambia:
+
+    {"asistencia": {"mes": {"valor": 18}}, "escenarios": {"moderado_hasta": 10}}
+
+Los meses no están fijos: son las columnas del archivo que responden a la plantilla
+de la regla mensual ('Días Trabajados en {mes}'), en el orden del archivo; las
+columnas de las reglas son también las que se leen de cada archivo. Con
+"ventana" en la regla total, el total se evalúa sobre cada período de esa cantidad
+de meses consecutivos en lugar de leer la columna de totales (que entonces puede
+faltar en el archivo):
+
+    {"asistencia": {"total": {"ventana": 6}}}
+"""
+import copy
+import functools
+import json
+import os
+import re
+
+import numpy as np
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+OPERADORES = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+TEXTOS_OPERADOR = {
+    '<': "menos de {valor}",
+    '<=': "{valor} o menos",
+    '>': "más de {valor}",
+    '>=': "{valor} o más",
+}
+
+DEFINICION_PREDETERMINADA = {
+    'asistencia': {
+        'mes': {'columna': 'Días Trabajados en {mes}', 'operador': '<=', 'valor': 20},
+        'total': {'columna': 'Total Días Trabajados', 'operador': '<', 'valor': 120},
+    },
+    'productividad': {
+        'mes': {'columna': 'Tareas Realizadas en {mes}', 'operador': '<', 'valor': 17},
+        'total': {'columna': 'Productividad (Tareas - 6 meses)', 'operador': '<', 'valor': 102},
+    },
+    'escenarios': {
+        # Porcentaje de anomalías hasta el que se aplica cada escenario; por encima, el 3
+        'sin_anomalias_hasta': 0,
+        'moderado_hasta': 15,
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def patron_mes(plantilla):
+    """Expresión regular de los nombres de columna de una plantilla con '{mes}'; el grupo 1 es el mes."""
+    antes, _, despues = plantilla.partition('{mes}')
+    return re.compile(f"{re.escape(antes)}(.+?){re.escape(despues)}")
+
+
+def meses_de(columnas, plantilla):
+    """Meses de las columnas que responden a la plantilla, en el orden de columnas."""
+    patron = patron_mes(plantilla)
+    coincidencias = (patron.fullmatch(str(columna)) for columna in columnas)
+    return [coincidencia.group(1) for coincidencia in coincidencias if coincidencia]
+
+
+class ReglaUmbral:
+    """Compara una columna numérica con un valor; las celdas vacías nunca son anomalía.
+
+    ventana (solo en la regla total) es la cantidad de meses de cada período sobre
+    el que se suma; None usa la columna de totales del archivo, que con ventana
+    es opcional.
+    """
+
+    def __init__(self, columna, operador, valor, texto=None, ventana=None):
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador no soportado en la regla de '{columna}': {operador}")
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+            raise ValueError(f"El valor de la regla de '{columna}' debe ser numérico: {valor!r}")
+        if ventana is not None and (not isinstance(ventana, int) or isinstance(ventana, bool) or ventana < 1):
+            raise ValueError(f"La ventana de la regla de '{columna}' debe ser un número entero de meses: {ventana!r}")
+        self.columna = columna
+        self.operador = operador
+        self.valor = valor
+        self.texto = texto
+        self.ventana = ventana
+        self._funcion = OPERADORES[operador]
+
+    def __call__(self, valores):
+        """Máscara booleana de los valores que incumplen la regla."""
+        return self._funcion(valores, self.valor)
+
+    def describir(self, mayuscula=False):
+        """Texto del umbral para los reportes, por ejemplo 'menos de 17'."""
+        texto = (self.texto or TEXTOS_OPERADOR[self.operador]).format(valor=f"{self.valor:g}")
+        return texto[:1].upper() + texto[1:] if mayuscula else texto
+
+
+class ReglasDatos:
+    """Reglas de un conjunto de datos: una por mes (columna con '{mes}') y otra sobre el total."""
+
+    def __init__(self, mes, total):
+        if '{mes}' not in mes.columna:
+            raise ValueError(f"La columna de la regla mensual debe contener '{{mes}}': {mes.columna}")
+        if mes.ventana is not None:
+            raise ValueError("La ventana solo se aplica a la regla total.")
+        self.mes = mes
+        self.total = total
+
+    def meses(self, columnas):
+        """Meses con columna en columnas, en su orden."""
+        return meses_de(columnas, self.mes.columna)
+
+    def columnas_mes(self, meses):
+        return [self.mes.columna.format(mes=mes) for mes in meses]
+
+    def incumplimientos_por_ventanas(self, por_mes):
+        """Sumas de cada período de total.ventana meses consecutivos y cuáles incumplen la regla total.
+
+        por_mes tiene una columna por mes; la columna j de los resultados es el
+        período que empieza en el mes j. Las sumas salen de una suma acumulada por
+        fila, así que el costo no depende de la ventana; un período con algún mes
+        vacío no se evalúa (nunca incumple). Devuelve (sumas, incumple).
+        """
+        ventana = self.total.ventana
+        if por_mes.shape[1] < ventana:
+            raise ValueError(f"La regla total usa períodos de {ventana} meses y el archivo tiene {por_mes.shape[1]}.")
+        vacios = np.isnan(por_mes)
+        acumulado = np.zeros((por_mes.shape[0], por_mes.shape[1] + 1))
+        np.cumsum(np.where(vacios, 0, por_mes), axis=1, out=acumulado[:, 1:])
+        vacios_acumulados = np.zeros(acumulado.shape, dtype=np.int32)
+        np.cumsum(vacios, axis=1, out=vacios_acumulados[:, 1:])
+        sumas = acumulado[:, ventana:] - acumulado[:, :-ventana]
+        completos = vacios_acumulados[:, ventana:] == vacios_acumulados[:, :-ventana]
+        return sumas, self.total(sumas) & completos
+
+    def total_por_ventanas(self, por_mes):
+        """Filas que incumplen la regla total en algún período (ver incumplimientos_por_ventanas)."""
+        return self.incumplimientos_por_ventanas(por_mes)[1].any(axis=1)
+
+    def alcance_total(self):
+        """Texto del período de la regla total para los reportes."""
+        return "en total" if self.total.ventana is None else f"en algún período de {self.total.ventana} meses"
+
+
+class ConjuntoReglas:
+    """Reglas compiladas de asistencia y productividad y cortes de escenario."""
+
+    def __init__(self, nombre, asistencia, productividad, sin_anomalias_hasta, moderado_hasta):
+        if not 0 <= sin_anomalias_hasta <= moderado_hasta:
+            raise ValueError("Los cortes de escenario deben cumplir 0 <= sin_anomalias_hasta <= moderado_hasta.")
+        self.nombre = nombre
+        self.asistencia = asistencia
+        self.productividad = productividad
+        self.sin_anomalias_hasta = sin_anomalias_hasta
+        self.moderado_hasta = moderado_hasta
+
+    def escenario(self, porcentaje_anomalías):
+        """Devuelve el escenario (1, 2 o 3) del papel de trabajo según el porcentaje de anomalías."""
+        if porcentaje_anomalías <= self.sin_anomalias_hasta:
+            return 1
+        elif porcentaje_anomalías <= self.moderado_hasta:
+            return 2
+        else:
+            return 3
+
+
+def _combinar(base, cambios):
+    for clave, valor in cambios.items():
+        if isinstance(valor, dict) and isinstance(base.get(clave), dict):
+            _combinar(base[clave], valor)
+        else:
+            base[clave] = valor
+    return base
+
+
+def _compilar_datos(definicion, tipo):
+    try:
+        return ReglasDatos(ReglaUmbral(**definicion['mes']), ReglaUmbral(**definicion['total']))
+    except TypeError as e:
+        raise ValueError(f"Regla de {tipo} mal definida: {e}") from e
+
+
+def compilar_reglas(definicion=None, nombre="predeterminadas"):
+    """Compila una definición (diccionario) sobre los valores predeterminados."""
+    definicion = _combinar(copy.deepcopy(DEFINICION_PREDETERMINADA), definicion or {})
+    escenarios = definicion['escenarios']
+    return ConjuntoReglas(
+        nombre,
+        _compilar_datos(definicion['asistencia'], 'asistencia'),
+        _compilar_datos(definicion['productividad'], 'productividad'),
+        escenarios['sin_anomalias_hasta'],
+        escenarios['moderado_hasta'],
+    )
+
+
+def cargar_reglas(ruta):
+    """Lee y compila un archivo de reglas .json, .yaml o .yml."""
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, encoding='utf-8') as f:
+        if extension in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ValueError("Para leer reglas en YAML hay que instalar PyYAML.")
+            definicion = yaml.safe_load(f)
+        else:
+            definicion = json.load(f)
+    if not isinstance(definicion, dict):
+        raise ValueError(f"El archivo de reglas no contiene un objeto: {ruta}")
+    return compilar_reglas(definicion, os.path.splitext(os.path.basename(ruta))[0])
+
+
+REGLAS_PREDETERMINADAS = compilar_reglas()
+
+
+def reglas_de(data, tipo):
+    """ReglasDatos de tipo con que se analizaron los datos (las predeterminadas si no constan)."""
+    return getattr(data.get('reglas') or REGLAS_PREDETERMINADAS, tipo)
@@ -0,0 +1,270 @@
+"""Generación de reportes y papeles de trabajo en PDF a partir de los resultados del análisis."""
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from graficos import imagen_grafico
+from perfil import etapa
+from reglas import reglas_de
+from estilos import ESTILO_TEXTO, ESTILO_TITULO, ESTILO_SUBTITULO
+from papeles import generar_papel_trabajo
+from tablas_pdf import tabla_por_bloques, archivo_complementario
+from similitud import COLUMNAS_PARES
+from cruce import COLUMNAS_CRUCE
+from analisis import seleccionar_escenario, tabla_total, porcentaje_asistencia, porcentaje_productividad
+
+
+class DocumentoPDF(SimpleDocTemplate):
+    """SimpleDocTemplate cuya maquetación (build) se mide como etapa 'doc.build'."""
+
+    def build(self, *args, **kwargs):
+        with etapa("doc.build"):
+            return super().build(*args, **kwargs)
+
+
+def nuevo_documento(pdf_path, control=None):
+    """Crea el documento PDF; si se indica un ControlTarea, informa el avance por página y permite cancelar."""
+    doc = DocumentoPDF(pdf_path, pagesize=letter)
+    if control is not None:
+        def progreso(tipo, valor):
+            if tipo == 'PAGE':
+                control.informar(f"Generando PDF: página {valor}")
+            else:
+                control.verificar()
+        doc.setProgressCallBack(progreso)
+    return doc
+
+
+def crear_papel_trabajo_nomina(pdf_path, nomina_data, auditor, nombre_archivo, control=None, limite_filas=None, anexo=None):
+    """Genera el papel de trabajo de nómina del escenario que corresponde al porcentaje de anomalías."""
+    porcentaje_anomalías = nomina_data['porcentaje_anomalías']
+    escenario = seleccionar_escenario(porcentaje_anomalías, nomina_data.get('reglas'))
+    generar_papel_trabajo(nuevo_documento(pdf_path, control), 'nomina', escenario, nomina_data, auditor,
+                          nombre_archivo, porcentaje_anomalías, limite_filas, anexo)
+    return pdf_path
+
+
+def crear_papel_trabajo_asistencia(pdf_path, asistencia_data, auditor, nombre_archivo, control=None, limite_filas=None, anexo=None):
+    """Genera el papel de trabajo de asistencia del escenario que corresponde al porcentaje de anomalías."""
+    porcentaje_anomalías = porcentaje_asistencia(asistencia_data)
+    escenario = seleccionar_escenario(porcentaje_anomalías, asistencia_data.get('reglas'))
+    generar_papel_trabajo(nuevo_documento(pdf_path, control), 'asistencia', escenario, asistencia_data, auditor,
+                          nombre_archivo, porcentaje_anomalías, limite_filas, anexo)
+    return pdf_path
+
+
+def crear_papel_trabajo_productividad(pdf_path, productividad_data, auditor, nombre_archivo, control=None, limite_filas=None, anexo=None):
+    """Genera el papel de trabajo de productividad del escenario que corresponde al porcentaje de anomalías."""
+    porcentaje_anomalías = porcentaje_productividad(productividad_data)
+    escenario = seleccionar_escenario(porcentaje_anomalías, productividad_data.get('reglas'))
+    generar_papel_trabajo(nuevo_documento(pdf_path, control), 'productividad', escenario, productividad_data, auditor,
+                          nombre_archivo, porcentaje_anomalías, limite_filas, anexo)
+    return pdf_path
+
+
+def crear_reporte_nomina_pdf(pdf_path, nomina_data, auditor, control=None, limite_filas=None, anexo=None):
+    """Genera un reporte PDF con los resultados del análisis de nómina.
+
+    Con limite_filas, las tablas muestran como máximo esas filas y el listado
+    completo se guarda en un CSV junto al PDF. anexo es el resultado de
+    anexos.exportar_anexo: las tablas enlazan a él en lugar de mostrarlo entero.
+    """
+    doc = nuevo_documento(pdf_path, control)
+    elements = []
+
+    # Título del reporte
+    title = Paragraph("Análisis de Nómina - Anomalías Identificadas", ESTILO_TITULO)
+    elements.append(title)
+
+    # Auditor/es
+    auditor_paragraph = Paragraph(f"Auditor/es: {auditor}", ESTILO_TEXTO)
+    elements.append(auditor_paragraph)
+
+    # Resumen de las anomalías
+    summary = Paragraph(f"<br/>Número de Empleados duplicados: {len(nomina_data['duplicados_nombre'])}<br/>"
+                        f"Número de cuentas bancarias duplicadas: {len(nomina_data['duplicados_cuenta'])}<br/>"
+                        + (f"Número de pares de nombres parecidos: {len(nomina_data['similares_nombre'])}<br/>"
+                           if nomina_data.get('similares_nombre') is not None else "")
+                        + "<br/>", ESTILO_TEXTO)
+    elements.append(summary)
+
+    # Sección 1: Listado de empleados duplicados por nombre
+    elements.append(Paragraph("Listado de Empleados Duplicados con ID diferente:", ESTILO_SUBTITULO))
+
+    # Filtrado y ordenación alfabética para el primer listado
+    filtered_data_1 = nomina_data['duplicados_nombre'][['ID de Empleado', 'Nombre']].sort_values(by='Nombre')
+    elements += tabla_por_bloques(filtered_data_1, ['ID de Empleado', 'Nombre'], doc.width, limite_filas,
+                                  archivo_complementario(pdf_path, "duplicados_nombre"),
+                                  (anexo or {}).get("duplicados_nombre"))
+
+    # Sección 2: Listado de cuentas bancarias duplicadas
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Listado de Cuentas Bancarias Duplicadas con nombres y ID diferentes:", ESTILO_SUBTITULO))
+
+    # Filtrado y ordenación alfabética para el segundo listado
+    filtered_data_2 = nomina_data['duplicados_cuenta'][['ID de Empleado', 'Nombre', 'Cuenta Bancaria']].sort_values(by='Nombre')
+    elements += tabla_por_bloques(filtered_data_2, ['ID de Empleado', 'Nombre', 'Cuenta Bancaria'], doc.width, limite_filas,
+                                  archivo_complementario(pdf_path, "duplicados_cuenta"),
+                                  (anexo or {}).get("duplicados_cuenta"))
+
+    # Sección 3: Posibles duplicados que no son idénticos (no se buscan en el análisis por bloques)
+    if nomina_data.get('similares_nombre') is not None:
+        elements.append(Spacer(1, 12))
+        elements.append(Paragraph("Listado de Nombres Parecidos con ID diferente:", ESTILO_SUBTITULO))
+        elements += tabla_por_bloques(nomina_data['similares_nombre'], COLUMNAS_PARES, doc.width, limite_filas,
+                                      archivo_complementario(pdf_path, "similares_nombre"),
+                                      (anexo or {}).get("similares_nombre"))
+    if nomina_data.get('similares_cuenta') is not None:
+        elements.append(Spacer(1, 12))
+        elements.append(Paragraph("Listado de Cuentas Bancarias iguales escritas con otro formato:", ESTILO_SUBTITULO))
+        columnas = ['ID de Empleado', 'Nombre', 'Cuenta Bancaria', 'Cuenta normalizada']
+        elements += tabla_por_bloques(nomina_data['similares_cuenta'][columnas], columnas, doc.width, limite_filas,
+                                      archivo_complementario(pdf_path, "similares_cuenta"),
+                                      (anexo or {}).get("similares_cuenta"))
+
+    # Diagramas de pastel
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Nombres Duplicados con ID diferentes:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('nombres_duplicados', nomina_data))
+
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Cuentas Bancarias Duplicadas con nombres y ID diferentes:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('cuentas_duplicadas', nomina_data))
+
+    # Construir el documento PDF
+    doc.build(elements)
+    return pdf_path
+
+
+def crear_reporte_asistencia_pdf(pdf_path, asistencia_data, auditor, control=None, limite_filas=None, anexo=None):
+    """Genera un reporte PDF con los resultados del análisis de asistencia.
+
+    Con limite_filas, las tablas muestran como máximo esas filas y el listado
+    completo se guarda en un CSV junto al PDF. anexo es el resultado de
+    anexos.exportar_anexo: las tablas enlazan a él en lugar de mostrarlo entero.
+    """
+    doc = nuevo_documento(pdf_path, control)
+    elements = []
+
+    # Título del reporte
+    title = Paragraph("Análisis de Asistencia - Anomalías Identificadas", ESTILO_TITULO)
+    elements.append(title)
+
+    # Auditor/es
+    auditor_paragraph = Paragraph(f"Auditor/es: {auditor}", ESTILO_TEXTO)
+    elements.append(auditor_paragraph)
+
+    # Resumen de las anomalías
+    reglas = reglas_de(asistencia_data, 'asistencia')
+    summary = Paragraph(f"<br/>Número de empleados con {reglas.mes.describir()} días trabajados en al menos un mes: {len(asistencia_data['all_anomalías'])}<br/>"
+                        f"Empleados con {reglas.total.describir()} días trabajados {reglas.alcance_total()}: {len(asistencia_data['total_anomalías'])}<br/><br/>", ESTILO_TEXTO)
+    elements.append(summary)
+
+    # Tabla con los datos filtrados
+    elements.append(Paragraph(f"Datos de Asistencia (solo empleados con {reglas.total.describir()} días trabajados "
+                              f"{reglas.alcance_total()}):", ESTILO_SUBTITULO))
+
+    # Filas que incumplen la regla del total de días trabajados, con su total o su período incumplido
+    df_filtered = tabla_total(asistencia_data['total_anomalías'], reglas, asistencia_data['meses']).sort_values(by='Nombre')
+    elements += tabla_por_bloques(df_filtered, list(df_filtered.columns), doc.width, limite_filas,
+                                  archivo_complementario(pdf_path, "anomalias_total"),
+                                  (anexo or {}).get("anomalias_total"))
+
+    # Diagramas de pastel
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Días Trabajados:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('dias_trabajados', asistencia_data))
+
+    # Construir el documento PDF
+    doc.build(elements)
+    return pdf_path
+
+
+def crear_reporte_productividad_pdf(pdf_path, productividad_data, auditor, control=None, limite_filas=None, anexo=None):
+    """Genera un reporte PDF con los resultados del análisis de productividad.
+
+    Con limite_filas, las tablas muestran como máximo esas filas y el listado
+    completo se guarda en un CSV junto al PDF. anexo es el resultado de
+    anexos.exportar_anexo: las tablas enlazan a él en lugar de mostrarlo entero.
+    """
+    doc = nuevo_documento(pdf_path, control)
+    elements = []
+
+    title = Paragraph("Análisis de Productividad - Anomalías Identificadas", ESTILO_TITULO)
+    elements.append(title)
+
+    auditor_paragraph = Paragraph(f"Auditor/es: {auditor}", ESTILO_TEXTO)
+    elements.append(auditor_paragraph)
+
+    reglas = reglas_de(productividad_data, 'productividad')
+    summary = Paragraph(f"<br/>Número de empleados con {reglas.mes.describir()} tareas realizadas en al menos un mes: {len(productividad_data['indices_anomalías'])}<br/>"
+                        f"Empleados con {reglas.total.describir()} tareas realizadas {reglas.alcance_total()}: {len(productividad_data['indices_total'])}<br/><br/>", ESTILO_TEXTO)
+    elements.append(summary)
+
+    elements.append(Paragraph(f"Datos de Productividad (solo empleados con {reglas.total.describir()} tareas realizadas "
+                              f"{reglas.alcance_total()}):", ESTILO_SUBTITULO))
+
+    # Filas que incumplen la regla del total de tareas, con su total o su período incumplido
+    df_filtered = tabla_total(productividad_data['df_productividad'], reglas, productividad_data['meses'],
+                              productividad_data['indices_total']).sort_values(by='Nombre')
+    elements += tabla_por_bloques(df_filtered, list(df_filtered.columns), doc.width, limite_filas,
+                                  archivo_complementario(pdf_path, "anomalias_total"),
+                                  (anexo or {}).get("anomalias_total"))
+
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Tareas Realizadas:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('tareas_realizadas', productividad_data))
+
+    doc.build(elements)
+    return pdf_path
+
+
+def crear_reporte_cruce_pdf(pdf_path, cruce_data, auditor, control=None, limite_filas=None, anexo=None):
+    """Genera un reporte PDF con los empleados pagados en la nómina sin asistencia o sin tareas.
+
+    cruce_data es el resultado de cruce.cruzar_empleados; limite_filas y anexo
+    funcionan como en los demás reportes.
+    """
+    doc = nuevo_documento(pdf_path, control)
+    elements = []
+
+    # Título del reporte
+    elements.append(Paragraph("Cruce de Nómina, Asistencia y Productividad", ESTILO_TITULO))
+
+    # Auditor/es
+    elements.append(Paragraph(f"Auditor/es: {auditor}", ESTILO_TEXTO))
+
+    # Resumen del cruce
+    summary = Paragraph(f"<br/>Empleados en la nómina: {cruce_data['total_empleados']}<br/>"
+                        f"Empleados pagados sin asistencia registrada: {len(cruce_data['pagados_ausentes'])}<br/>"
+                        f"Empleados pagados sin tareas registradas: {len(cruce_data['pagados_improductivos'])}<br/>"
+                        f"Empleados pagados sin asistencia ni tareas: {len(cruce_data['pagados_ausentes_improductivos'])}<br/>"
+                        f"Filas de asistencia con ID fuera de la nómina: {cruce_data['fuera_de_nomina_asistencia']}<br/>"
+                        f"Filas de productividad con ID fuera de la nómina: {cruce_data['fuera_de_nomina_productividad']}<br/><br/>",
+                        ESTILO_TEXTO)
+    elements.append(summary)
+
+    # Sección 1: Pagados sin asistencia
+    elements.append(Paragraph("Listado de Empleados Pagados sin Asistencia (sin registro o con 0 días):", ESTILO_SUBTITULO))
+    elements += tabla_por_bloques(cruce_data['pagados_ausentes'].sort_values(by='Nombre'), COLUMNAS_CRUCE, doc.width,
+                                  limite_filas, archivo_complementario(pdf_path, "pagados_ausentes"),
+                                  (anexo or {}).get("pagados_ausentes"))
+
+    # Sección 2: Pagados sin tareas
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Listado de Empleados Pagados sin Tareas (sin registro o con 0 tareas):", ESTILO_SUBTITULO))
+    elements += tabla_por_bloques(cruce_data['pagados_improductivos'].sort_values(by='Nombre'), COLUMNAS_CRUCE, doc.width,
+                                  limite_filas, archivo_complementario(pdf_path, "pagados_improductivos"),
+                                  (anexo or {}).get("pagados_improductivos"))
+
+    # Diagramas de pastel
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Empleados Pagados sin Asistencia:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('pagados_ausentes', cruce_data))
+
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gráfico de Empleados Pagados sin Tareas:", ESTILO_SUBTITULO))
+    elements.append(imagen_grafico('pagados_improductivos', cruce_data))
+
+    # Construir el documento PDF
+    doc.build(elements)
+    return pdf_path
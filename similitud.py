@@ -0,0 +1,313 @@
+"""Posibles empleados fantasma: nombres casi iguales y cuentas bancarias con otro formato.
+
+analizar_nomina solo encuentra duplicados exactos; "José Perez" y "Jose Pérez", o
+"0012-3456" y "123456", pasan como personas y cuentas distintas. Aquí:
+
+1. Normalización vectorizada sobre los valores distintos (no sobre cada fila): sin
+   acentos, en minúsculas, solo letras y números y con las palabras ordenadas; las cuentas se
+   reducen a sus dígitos sin ceros a la izquierda.
+2. Bloqueo fonético: cada palabra recibe un código fonético para el español (b/v,
+   s/z/c, ll/y, h muda, sin vocales) y cada nombre cae en los bloques de cada par
+   de códigos de sus palabras. Solo se comparan nombres que comparten un bloque,
+   nunca todos contra todos.
+3. Similitud vectorizada: coseno entre los bigramas de caracteres de cada palabra.
+   Los pares candidatos de todos los bloques del mismo tamaño se generan de una
+   vez y su coseno se calcula por tramos con NumPy; los bloques muy grandes se
+   comparan como producto de matrices. Con bigramas una letra cambiada en un
+   nombre corto ("perez"/"peres") sigue por encima del umbral, y nombres
+   distintos ("jose perez"/"juan perez") quedan muy por debajo.
+
+Se informan los pares de filas con similitud de al menos UMBRAL_SIMILITUD y distinto
+ID de empleado.
+"""
+import re
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+UMBRAL_SIMILITUD = 0.8
+TAMANO_NGRAMA = 2
+# Palabras de un nombre que se usan para formar los bloques (limita los pares por nombre)
+MAXIMO_PALABRAS_BLOQUE = 4
+# Bloques con más nombres que esto no se expanden en pares: se comparan como matriz, por tramos de filas
+MAXIMO_BLOQUE_PARES = 500
+FILAS_POR_TRAMO = 2048
+# Pares cuya similitud se calcula de una vez
+PARES_POR_TRAMO = 20_000
+# Margen de redondeo (float32) al comparar con el umbral
+TOLERANCIA = 1e-6
+COLUMNAS_PARES = ['ID de Empleado A', 'Nombre A', 'ID de Empleado B', 'Nombre B', 'Similitud']
+
+_FONETICA = [
+    (re.compile(r'ch'), 'X'),
+    (re.compile(r'll|y'), 'Y'),
+    (re.compile(r'qu(?=[ei])'), 'k'),
+    (re.compile(r'gu(?=[ei])'), 'g'),
+    (re.compile(r'c(?=[ei])|z'), 's'),
+    (re.compile(r'g(?=[ei])'), 'j'),
+    (re.compile(r'[cq]'), 'k'),
+    (re.compile(r'[vw]'), 'b'),
+    (re.compile(r'h'), ''),
+    (re.compile(r'x'), 'ks'),
+]
+
+
+def codigo_fonetico(palabra):
+    """Código fonético aproximado de una palabra ya normalizada ('perez' y 'peres' -> 'PRS')."""
+    for patron, reemplazo in _FONETICA:
+        palabra = patron.sub(reemplazo, palabra)
+    codigo = palabra[:1] + re.sub(r'[aeiou]', '', palabra[1:])
+    return re.sub(r'(.)\1+', r'\1', codigo).upper()
+
+
+def normalizar_textos(serie):
+    """Texto sin acentos, en minúsculas, solo letras, números y espacios simples (vectorizado)."""
+    return (serie.astype('string').fillna('')
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip())
+
+
+def normalizar_cuentas(serie):
+    """Solo los dígitos de la cuenta, sin ceros a la izquierda (vectorizado)."""
+    return serie.astype('string').fillna('').str.replace(r'\D', '', regex=True).str.lstrip('0')
+
+
+def _palabras(normas):
+    """Palabras de cada nombre como ids: (inicio de cada nombre, id de cada palabra, palabras distintas)."""
+    # Las normas tienen las palabras separadas por un espacio: se cuentan los espacios
+    # y se separan todas de una vez, sin una lista por nombre
+    textos = pd.Series(normas, dtype='string')
+    largos = np.where(textos.str.len().to_numpy(dtype=np.int64) > 0,
+                      textos.str.count(' ').to_numpy(dtype=np.int64) + 1, 0)
+    ids, palabras = pd.factorize(np.asarray(" ".join(normas).split(), dtype=object))
+    return np.concatenate([[0], np.cumsum(largos)]), ids.astype(np.int64), palabras.tolist()
+
+
+def _expandir(inicios, posiciones):
+    """Índices de los tramos [inicios[p], inicios[p + 1]) de cada p, concatenados, y el largo de cada tramo."""
+    largos = inicios[posiciones + 1] - inicios[posiciones]
+    desplazamiento = np.arange(largos.sum()) - np.repeat(np.cumsum(largos) - largos, largos)
+    return np.repeat(inicios[posiciones], largos) + desplazamiento, largos
+
+
+def _ngramas(palabras, inicios_nombre, ids_palabra, n=TAMANO_NGRAMA):
+    """N-gramas de cada nombre en formato disperso: (inicio de cada nombre, id de cada n-grama, total de n-gramas).
+
+    Se calculan una vez por palabra distinta y se reparten a los nombres sin recorrerlos.
+    """
+    vocabulario = {}
+    inicios, indices = [0], []
+    for palabra in palabras:
+        texto = f" {palabra} "
+        indices.extend(vocabulario.setdefault(texto[i:i + n], len(vocabulario)) for i in range(len(texto) - n + 1))
+        inicios.append(len(indices))
+    inicios, indices = np.asarray(inicios, dtype=np.int64), np.asarray(indices, dtype=np.int64)
+
+    tramos, largos = _expandir(inicios, ids_palabra)
+    acumulado = np.concatenate([[0], np.cumsum(largos)])
+    return acumulado[inicios_nombre], indices[tramos], len(vocabulario)
+
+
+def _claves_bloque(palabras, inicios_nombre, ids_palabra):
+    """Pares (clave de bloque, nombre): un bloque por cada par de códigos fonéticos distintos de un nombre."""
+    codigos, _ = pd.factorize(np.asarray([codigo_fonetico(palabra) for palabra in palabras], dtype=object))
+    total = len(codigos) + 1
+    cantidad = len(inicios_nombre) - 1
+
+    # Hasta MAXIMO_PALABRAS_BLOQUE códigos por nombre, ordenados, sin repetir y con -1 en los huecos
+    nombre_de = np.repeat(np.arange(cantidad), np.diff(inicios_nombre))
+    lugar = np.arange(len(ids_palabra)) - inicios_nombre[nombre_de]
+    tabla = np.full((cantidad, MAXIMO_PALABRAS_BLOQUE), -1, dtype=np.int64)
+    dentro = lugar < MAXIMO_PALABRAS_BLOQUE
+    tabla[nombre_de[dentro], lugar[dentro]] = codigos[ids_palabra[dentro]]
+    tabla.sort(axis=1)
+    tabla[:, 1:][tabla[:, 1:] == tabla[:, :-1]] = -1
+    tabla.sort(axis=1)
+
+    claves, nombres = [], []
+    for i, j in combinations(range(MAXIMO_PALABRAS_BLOQUE), 2):
+        validos = np.flatnonzero(tabla[:, i] >= 0)
+        claves.append(tabla[validos, i] * total + tabla[validos, j])
+        nombres.append(validos)
+    # Los nombres de un solo código forman bloque con ese código
+    unicos = np.flatnonzero((tabla[:, -2] < 0) & (tabla[:, -1] >= 0))
+    claves.append(tabla[unicos, -1] * total + tabla[unicos, -1])
+    nombres.append(unicos)
+    return np.concatenate(claves), np.concatenate(nombres)
+
+
+def _pares_candidatos(claves, nombres, cantidad):
+    """Pares (a, b), a < b, de nombres que comparten algún bloque, sin repetir, y los bloques demasiado grandes."""
+    orden = np.argsort(claves, kind='stable')
+    claves, nombres = claves[orden], nombres[orden]
+    cortes = np.flatnonzero(claves[1:] != claves[:-1]) + 1
+    inicios = np.concatenate([[0], cortes])
+    largos = np.diff(np.concatenate([inicios, [len(claves)]]))
+
+    pares, grandes = [np.empty((0, 2), dtype=np.int64)], []
+    for tamano in np.unique(largos[largos > 1]).tolist():
+        comienzos = inicios[largos == tamano]
+        if tamano > MAXIMO_BLOQUE_PARES:
+            grandes.extend(nombres[comienzo:comienzo + tamano] for comienzo in comienzos)
+            continue
+        # Todos los bloques del mismo tamaño a la vez: una fila por bloque
+        bloques = nombres[comienzos[:, None] + np.arange(tamano)]
+        i, j = np.triu_indices(tamano, 1)
+        pares.append(np.stack([bloques[:, i].ravel(), bloques[:, j].ravel()], axis=1))
+    pares = np.concatenate(pares)
+    pares.sort(axis=1)
+    codigos = np.unique(pares[:, 0] * cantidad + pares[:, 1])
+    return codigos // cantidad, codigos % cantidad, grandes
+
+
+def _matriz(nodos, inicios, indices, columnas):
+    """Vectores de n-gramas normalizados (filas) de los nombres indicados."""
+    tramos, largos = _expandir(inicios, nodos)
+    filas = np.repeat(np.arange(len(nodos)), largos)
+    matriz = np.bincount(filas * columnas + indices[tramos], minlength=len(nodos) * columnas)
+    matriz = matriz.reshape(len(nodos), columnas).astype(np.float32)
+    matriz /= np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz
+
+
+def _similitudes(a, b, inicios, indices, columnas):
+    """Coseno de n-gramas de cada par (a[k], b[k]), por tramos de PARES_POR_TRAMO."""
+    resultado = np.empty(len(a), dtype=np.float32)
+    for inicio in range(0, len(a), PARES_POR_TRAMO):
+        tramo_a, tramo_b = a[inicio:inicio + PARES_POR_TRAMO], b[inicio:inicio + PARES_POR_TRAMO]
+        nodos, inversa = np.unique(np.concatenate([tramo_a, tramo_b]), return_inverse=True)
+        matriz = _matriz(nodos, inicios, indices, columnas)
+        resultado[inicio:inicio + len(tramo_a)] = np.einsum(
+            'ij,ij->i', matriz[inversa[:len(tramo_a)]], matriz[inversa[len(tramo_a):]])
+    return resultado
+
+
+def _pares_bloque_grande(bloque, inicios, indices, columnas, umbral):
+    """Pares (a, b, similitud) con similitud >= umbral de un bloque grande, por tramos de filas de la matriz."""
+    bloque = np.sort(bloque)
+    matriz = _matriz(bloque, inicios, indices, columnas)
+    resultado = []
+    for inicio in range(0, len(bloque), FILAS_POR_TRAMO):
+        similitud = matriz[inicio:inicio + FILAS_POR_TRAMO] @ matriz.T
+        i, j = np.nonzero(similitud >= umbral - TOLERANCIA)
+        superior = i + inicio < j
+        i, j = i[superior], j[superior]
+        resultado.append((bloque[i + inicio], bloque[j], similitud[i, j]))
+    return resultado
+
+
+def normalizar_nombres(nombres):
+    """Lista de los nombres normalizados y con las palabras en orden alfabético."""
+    return [" ".join(sorted(nombre.split())) for nombre in normalizar_textos(pd.Series(nombres)).tolist()]
+
+
+def pares_filas(df, umbral=UMBRAL_SIMILITUD, consulta=None, normalizar=normalizar_nombres):
+    """Posiciones (fa, fb) de las filas de df con nombres parecidos y distinto ID, y su similitud.
+
+    consulta (máscara booleana por fila o None) limita la búsqueda a los pares con
+    al menos una fila marcada: los demás nombres solo se usan como posibles pares.
+    normalizar(nombres distintos) permite reutilizar normalizaciones ya hechas.
+    """
+    codigos_crudos, crudos = pd.factorize(df['Nombre'].astype('string'), use_na_sentinel=True)
+    normalizados = normalizar(crudos.to_numpy(dtype=object))
+    norma_de_crudo, normas = pd.factorize(np.asarray(normalizados, dtype=object))
+    normas = normas.tolist()
+    norma_fila = np.where(codigos_crudos >= 0, norma_de_crudo[np.maximum(codigos_crudos, 0)], -1)
+    if consulta is None:
+        consulta = np.ones(len(df), dtype=bool)
+    en_consulta = np.zeros(len(normas), dtype=bool)
+    en_consulta[norma_fila[consulta & (norma_fila >= 0)]] = True
+
+    # Pares de nombres normalizados distintos que se parecen, comparando solo dentro de cada bloque
+    inicios_nombre, ids_palabra, palabras = _palabras(normas)
+    inicios, indices, columnas = _ngramas(palabras, inicios_nombre, ids_palabra)
+    a, b, grandes = _pares_candidatos(*_claves_bloque(palabras, inicios_nombre, ids_palabra), len(normas))
+    pedidos = en_consulta[a] | en_consulta[b]
+    a, b = a[pedidos], b[pedidos]
+    similitud = _similitudes(a, b, inicios, indices, columnas)
+    similares = similitud >= umbral - TOLERANCIA
+    trios = [(a[similares], b[similares], similitud[similares])]
+    for bloque in grandes:
+        if en_consulta[bloque].any():
+            trios += _pares_bloque_grande(bloque, inicios, indices, columnas, umbral)
+
+    # Mismo nombre escrito de otra forma: más de un nombre original con la misma normalización
+    formas = np.bincount(norma_de_crudo, minlength=len(normas))
+    mismas = np.flatnonzero((formas > 1) & en_consulta & (np.diff(inicios_nombre) > 0))
+    trios.append((mismas, mismas, np.ones(len(mismas), dtype=np.float32)))
+
+    # Un par de nombres puede salir de varios bloques: se queda el de mayor similitud
+    a, b, similitud = (np.concatenate(valores) for valores in zip(*trios))
+    pedidos = en_consulta[a] | en_consulta[b]
+    a, b, similitud = a[pedidos], b[pedidos], similitud[pedidos].astype(np.float64)
+    orden = np.lexsort((-similitud, b, a))
+    a, b, similitud = a[orden], b[orden], similitud[orden]
+    _, primeros = np.unique(a * len(normas) + b, return_index=True)
+    a, b, similitud = a[primeros], b[primeros], similitud[primeros]
+
+    # Cada par de nombres vale por todas las combinaciones de sus filas
+    filas = np.argsort(norma_fila, kind='stable')
+    filas = filas[norma_fila[filas] >= 0]
+    cuantas = np.bincount(norma_fila[filas], minlength=len(normas))
+    inicio = np.cumsum(cuantas) - cuantas
+    por_par = cuantas[a] * cuantas[b]
+    par = np.repeat(np.arange(len(a)), por_par)
+    k = np.arange(len(par)) - np.repeat(np.cumsum(por_par) - por_par, por_par)
+    fa = filas[inicio[a[par]] + k // cuantas[b[par]]]
+    fb = filas[inicio[b[par]] + k % cuantas[b[par]]]
+
+    ids = df['ID de Empleado'].to_numpy()
+    validos = (((a[par] != b[par]) | (codigos_crudos[fa] < codigos_crudos[fb])) & (ids[fa] != ids[fb])
+               & (consulta[fa] | consulta[fb]))
+    return fa[validos], fb[validos], similitud[par][validos]
+
+
+def tabla_pares(df, fa, fb, similitud):
+    """DataFrame con COLUMNAS_PARES de los pares de filas (fa, fb), de mayor a menor similitud.
+
+    La fila A de cada par es la que está antes en el archivo y los empates se
+    ordenan por nombre y posición, así que la tabla no depende del orden en que
+    se encontraron los pares (el análisis incremental da la misma que el completo).
+    """
+    fa, fb = np.minimum(fa, fb), np.maximum(fa, fb)
+    ids = df['ID de Empleado'].to_numpy()
+    nombres = df['Nombre'].astype('string').to_numpy(dtype=object, na_value=None)
+    resultado = pd.DataFrame({
+        'ID de Empleado A': ids[fa], 'Nombre A': nombres[fa],
+        'ID de Empleado B': ids[fb], 'Nombre B': nombres[fb],
+        'Similitud': np.round(similitud, 3),
+    })
+    orden = resultado.assign(fila_a=fa, fila_b=fb).sort_values(
+        ['Similitud', 'Nombre A', 'fila_a', 'fila_b'], ascending=[False, True, True, True]).index
+    return resultado.loc[orden].reset_index(drop=True)
+
+
+def nombres_similares(df, umbral=UMBRAL_SIMILITUD):
+    """Pares de filas con nombres casi iguales (sin ser idénticos) y distinto ID de empleado.
+
+    Devuelve un DataFrame con COLUMNAS_PARES ordenado de mayor a menor similitud.
+    Los nombres que solo difieren en acentos, mayúsculas, signos u orden de las
+    palabras tienen similitud 1.
+    """
+    return tabla_pares(df, *pares_filas(df, umbral))
+
+
+def cuentas_similares(df):
+    """Filas cuya cuenta bancaria, reducida a dígitos, coincide con la de otro empleado escrita de otra forma.
+
+    Solo se informan los grupos con al menos dos formatos distintos de la misma cuenta
+    (los duplicados exactos ya están en duplicados_cuenta). Se agrega la columna
+    'Cuenta normalizada'.
+    """
+    codigos, crudas = pd.factorize(df['Cuenta Bancaria'].astype('string'))
+    normalizadas = normalizar_cuentas(pd.Series(crudas)).to_numpy(dtype=object)
+    cuenta = np.where(codigos >= 0, normalizadas[np.maximum(codigos, 0)] if len(normalizadas) else '', '')
+
+    grupos = pd.DataFrame({'cuenta': cuenta, 'formato': codigos, 'id': df['ID de Empleado'].to_numpy()})
+    grupos = grupos[grupos['cuenta'] != '']
+    resumen = grupos.groupby('cuenta').agg(formatos=('formato', 'nunique'), ids=('id', 'nunique'))
+    sospechosas = resumen.index[(resumen['formatos'] > 1) & (resumen['ids'] > 1)]
+    mascara = np.isin(cuenta, sospechosas.to_numpy())
+    resultado = df[mascara].assign(**{'Cuenta normalizada': cuenta[mascara]})
+    return resultado.sort_values('Cuenta normalizada', kind='stable')
@@ -0,0 +1,100 @@
+"""Tablas grandes en PDF: por bloques, con anchos fijos y límite de filas opcional.
+
+Un único Table con decenas de miles de filas obliga a reportlab a medir cada celda
+y a mantener todas las filas convertidas en memoria durante la maquetación. Aquí
+la tabla se parte en bloques de una página (FILAS_POR_BLOQUE) con anchos de
+columna y alto de fila fijos, así que no se mide nada, y cada bloque convierte sus
+filas en el momento de maquetarse y las libera al dibujarse. Con limite_filas solo
+se incluyen las primeras filas, un resumen del recorte y el listado completo queda
+en un archivo CSV junto al PDF; si ya hay un anexo de datos (anexos.py) con el
+listado, la tabla se recorta a FILAS_CON_ANEXO filas y enlaza a él.
+"""
+import os
+
+from reportlab.platypus import Flowable, LongTable, Paragraph
+
+from estilos import ESTILO_TABLA, ESTILO_TEXTO
+from perfil import etapa
+
+ALTO_FILA = 18
+# Filas de datos que, con el encabezado, caben en una página carta con los márgenes
+# de SimpleDocTemplate (636 puntos útiles: 35 filas de 18)
+FILAS_POR_BLOQUE = 34
+# Filas que se siguen mostrando en el PDF cuando el listado completo está en un anexo
+FILAS_CON_ANEXO = 1000
+
+
+class BloqueTabla(Flowable):
+    """Filas [inicio, fin) de un DataFrame que se convierten en LongTable solo al maquetarse."""
+
+    def __init__(self, df, inicio, fin, columnas, anchos):
+        super().__init__()
+        self.df = df
+        self.inicio = inicio
+        self.fin = fin
+        self.columnas = columnas
+        self.anchos = anchos
+        self.hAlign = 'CENTER'
+        self._tabla = None
+
+    def tabla(self):
+        if self._tabla is None:
+            parte = self.df.iloc[self.inicio:self.fin]
+            # Las celdas vacías se muestran en blanco, no como nan o <NA>
+            filas = [self.columnas] + parte.astype(object).where(parte.notna(), "").values.tolist()
+            self._tabla = LongTable(filas, colWidths=self.anchos, rowHeights=ALTO_FILA, repeatRows=1)
+            self._tabla.setStyle(ESTILO_TABLA)
+        return self._tabla
+
+    def wrap(self, availWidth, availHeight):
+        return self.tabla().wrap(availWidth, availHeight)
+
+    def split(self, availWidth, availHeight):
+        # Si el bloque no cabe en lo que queda de página, reportlab lo parte como cualquier tabla
+        partes = self.tabla().split(availWidth, availHeight)
+        self._tabla = None
+        return partes
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.tabla().drawOn(canvas, x, y, _sW)
+        self._tabla = None  # Libera las filas ya dibujadas
+
+
+def archivo_complementario(pdf_path, sufijo):
+    """Ruta del CSV con el listado completo de una tabla recortada del PDF."""
+    return f"{os.path.splitext(pdf_path)[0]}_{sufijo}.csv"
+
+
+def tabla_por_bloques(df, columnas, ancho, limite_filas=None, archivo_completo=None, anexo=None):
+    """Flowables que muestran las columnas de df como una tabla paginada.
+
+    ancho es el ancho disponible, repartido en partes iguales entre las columnas.
+    Si limite_filas se supera, solo se muestran esas filas seguidas de un resumen;
+    el listado completo se escribe en archivo_completo (CSV) cuando se indica.
+    anexo es la ruta del anexo de datos que ya contiene el listado: en ese caso no
+    se escribe el CSV, el límite por omisión es FILAS_CON_ANEXO y se enlaza al anexo.
+    """
+    if anexo is not None:
+        limite_filas = FILAS_CON_ANEXO if limite_filas is None else limite_filas
+        archivo_completo = None
+    df = df[columnas]
+    total = len(df)
+    visibles = total if limite_filas is None else min(total, limite_filas)
+    anchos = [ancho / len(columnas)] * len(columnas)
+
+    flowables = [BloqueTabla(df, inicio, min(inicio + FILAS_POR_BLOQUE, visibles), columnas, anchos)
+                 for inicio in range(0, visibles, FILAS_POR_BLOQUE)]
+    if not flowables:
+        flowables.append(BloqueTabla(df, 0, 0, columnas, anchos))
+
+    if visibles < total:
+        resumen = f"Se muestran las primeras {visibles} de {total} filas."
+        if archivo_completo:
+            with etapa("csv_complementario"):
+                df.to_csv(archivo_completo, index=False, chunksize=100_000)
+            resumen += f" El listado completo está en {os.path.basename(archivo_completo)}."
+        flowables.append(Paragraph(resumen, ESTILO_TEXTO))
+    if anexo is not None:
+        nombre = os.path.basename(anexo)
+        flowables.append(Paragraph(f'Listado completo en el anexo <a href="{nombre}" color="blue">{nombre}</a>.', ESTILO_TEXTO))
+    return flowables
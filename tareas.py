@@ -0,0 +1,38 @@
+"""Control de progreso y cancelación para tareas que se ejecutan fuera del hilo de la interfaz."""
+import threading
+
+
+class OperacionCancelada(Exception):
+    """Se lanza dentro de una tarea cuando el usuario solicita cancelarla."""
+
+
+class ControlTarea:
+    """Canal entre una tarea en segundo plano y quien la lanzó.
+
+    La tarea llama a informar() entre etapas para publicar su avance; ambos métodos
+    lanzan OperacionCancelada si se pidió cancelar, de modo que la tarea se detiene
+    en el siguiente punto de control.
+    """
+
+    def __init__(self, al_progresar=None):
+        self._cancelado = threading.Event()
+        self._al_progresar = al_progresar
+
+    def cancelar(self):
+        """Solicita la cancelación de la tarea."""
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def verificar(self):
+        """Lanza OperacionCancelada si la tarea fue cancelada."""
+        if self._cancelado.is_set():
+            raise OperacionCancelada("Operación cancelada por el usuario.")
+
+    def informar(self, mensaje):
+        """Publica un mensaje de progreso y comprueba la cancelación."""
+        self.verificar()
+        if self._al_progresar is not None:
+            self._al_progresar(mensaje)
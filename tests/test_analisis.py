@@ -0,0 +1,75 @@
+"""Casos de borde de los análisis de asistencia y productividad."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis import (COLUMNA_PERIODO, COLUMNA_SUMA_PERIODO, MESES, analizar_asistencia,  # noqa: E402
+                      analizar_productividad, porcentaje_asistencia, porcentaje_productividad, tabla_total)
+from carga import validar_columnas  # noqa: E402
+from reglas import compilar_reglas  # noqa: E402
+
+
+def asistencia(dias):
+    datos = {'ID de Empleado': range(len(dias)), 'Nombre': [f"Empleado {i}" for i in range(len(dias))]}
+    for mes in MESES:
+        datos[f'Días Trabajados en {mes}'] = dias
+    datos['Total Días Trabajados'] = [valor * len(MESES) for valor in dias]
+    return pd.DataFrame(datos)
+
+
+def productividad(tareas):
+    datos = {'ID de Empleado': range(len(tareas)), 'Nombre': [f"Empleado {i}" for i in range(len(tareas))]}
+    for mes in MESES:
+        datos[f'Tareas Realizadas en {mes}'] = tareas
+    datos['Productividad (Tareas - 6 meses)'] = [valor * len(MESES) for valor in tareas]
+    return pd.DataFrame(datos)
+
+
+@pytest.mark.parametrize('filas', [2, 0])
+def test_asistencia_sin_anomalias(filas):
+    resultado = analizar_asistencia(asistencia([22] * filas))
+    assert resultado['all_anomalías'].empty
+    assert resultado['total_anomalías'].empty
+    assert porcentaje_asistencia(resultado) == 0
+
+
+@pytest.mark.parametrize('filas', [2, 0])
+def test_productividad_sin_anomalias(filas):
+    resultado = analizar_productividad(productividad([20] * filas))
+    assert len(resultado['indices_anomalías']) == 0
+    assert len(resultado['indices_total']) == 0
+    assert porcentaje_productividad(resultado) == 0
+
+
+def test_asistencia_con_anomalias():
+    resultado = analizar_asistencia(asistencia([22, 10, 22]))
+    assert resultado['all_anomalías']['ID de Empleado'].tolist() == [1]
+    assert resultado['mascara'].tolist() == [0, 2 ** (len(MESES) + 1) - 1, 0]
+
+
+def test_mascaras_con_el_indice_del_archivo():
+    asistencia_df = asistencia([22, 10, 22]).set_axis([5, 7, 9])
+    productividad_df = productividad([20, 10, 20]).set_axis([5, 7, 9])
+    for mascara in (analizar_asistencia(asistencia_df)['mascara'], analizar_productividad(productividad_df)['mascara']):
+        assert isinstance(mascara, pd.Series)
+        assert mascara.index.tolist() == [5, 7, 9]
+        assert mascara.tolist() == [0, 2 ** (len(MESES) + 1) - 1, 0]
+
+
+def test_total_por_periodos_sin_columna_de_totales():
+    reglas = compilar_reglas({'productividad': {'total': {'ventana': 2, 'valor': 30}}})
+    df = productividad([20, 20]).drop(columns='Productividad (Tareas - 6 meses)')
+    df.loc[1, f'Tareas Realizadas en {MESES[2]}'] = 5
+    validar_columnas(df, 'productividad', reglas)
+
+    resultado = analizar_productividad(df, reglas)
+    tabla = tabla_total(df, reglas.productividad, resultado['meses'], resultado['indices_total'])
+
+    assert tabla[COLUMNA_PERIODO].tolist() == [f"{MESES[1]} a {MESES[2]}"]
+    assert tabla[COLUMNA_SUMA_PERIODO].tolist() == [25]
+    with pytest.raises(ValueError, match="Faltan columnas"):
+        validar_columnas(df, 'productividad')
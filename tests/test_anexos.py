@@ -0,0 +1,35 @@
+"""Anexos en Excel que no entran en una hoja."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import anexos  # noqa: E402
+from analisis import analizar_asistencia  # noqa: E402
+from test_analisis import asistencia  # noqa: E402
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+@pytest.mark.parametrize('con_xlsxwriter', [True, False])
+def test_listado_largo_sigue_en_otra_hoja(tmp_path, monkeypatch, con_xlsxwriter):
+    if con_xlsxwriter and anexos.xlsxwriter is None:
+        pytest.skip("xlsxwriter no está instalado")
+    if not con_xlsxwriter:
+        monkeypatch.setattr(anexos, 'xlsxwriter', None)
+    monkeypatch.setattr(anexos, 'MAXIMO_FILAS_HOJA', 10)
+    monkeypatch.setattr(anexos, 'FILAS_POR_BLOQUE', 7)
+    data = analizar_asistencia(asistencia([10] * 25 + [22] * 3))
+
+    ruta = anexos.exportar_anexo('asistencia', data, str(tmp_path / 'anexo'))['anomalias']
+
+    libro = openpyxl.load_workbook(ruta, read_only=True)
+    hojas = [hoja for hoja in libro.worksheets if hoja.title.startswith('Anomalías (') or hoja.title == 'Anomalías']
+    assert [hoja.title for hoja in hojas] == ['Anomalías', 'Anomalías (2)', 'Anomalías (3)']
+    filas = [fila for hoja in hojas for fila in hoja.iter_rows(values_only=True)]
+    encabezado = filas[0]
+    assert [fila for fila in filas if fila == encabezado] == [encabezado] * 3
+    assert [fila[0] for fila in filas if fila != encabezado] == list(range(25))
@@ -0,0 +1,121 @@
+"""Caché columnar de las tablas leídas: aciertos, invalidación y expulsión LRU."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_tablas import EXTENSIONES, CacheTablas  # noqa: E402
+
+
+class Lector:
+    """Lector de CSV que cuenta sus llamadas."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def __call__(self, ruta):
+        self.llamadas.append(ruta)
+        return pd.read_csv(ruta)
+
+
+def archivo(tmp_path, nombre, filas):
+    ruta = tmp_path / nombre
+    pd.DataFrame({'ID de Empleado': range(filas), 'Nombre': [f"Empleado {i}" for i in range(filas)]}).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def entradas(cache):
+    return sorted(nombre for nombre in os.listdir(cache.directorio) if nombre.endswith(EXTENSIONES[cache.formato]))
+
+
+@pytest.mark.parametrize('formato', list(EXTENSIONES))
+def test_acierto_y_fallo(tmp_path, formato):
+    cache = CacheTablas(str(tmp_path / 'cache'), formato=formato)
+    lector = Lector()
+    ruta = archivo(tmp_path, 'asistencia.csv', 5)
+
+    primera = cache.cargar(ruta, lector)
+    segunda = cache.cargar(ruta, lector)
+    assert len(lector.llamadas) == 1
+    pd.testing.assert_frame_equal(primera, segunda)
+
+    # Otra variante de lectura y un archivo modificado son entradas distintas
+    cache.cargar(ruta, lector, variante="otras columnas")
+    archivo(tmp_path, 'asistencia.csv', 6)
+    assert len(cache.cargar(ruta, lector)) == 6
+    assert len(lector.llamadas) == 3
+    assert len(entradas(cache)) == 3
+
+
+def test_entrada_corrupta_se_vuelve_a_leer(tmp_path):
+    cache = CacheTablas(str(tmp_path / 'cache'))
+    lector = Lector()
+    ruta = archivo(tmp_path, 'nomina.csv', 5)
+    cache.cargar(ruta, lector)
+    with open(os.path.join(cache.directorio, entradas(cache)[0]), 'wb') as f:
+        f.write(b"no es parquet")
+
+    assert len(cache.cargar(ruta, lector)) == 5
+    assert len(lector.llamadas) == 2
+
+
+def test_expulsion_lru(tmp_path):
+    cache = CacheTablas(str(tmp_path / 'cache'))
+    lector = Lector()
+    rutas = [archivo(tmp_path, f"{nombre}.csv", 200) for nombre in ('a', 'b', 'c')]
+    cache.cargar(rutas[0], lector)
+    cache.cargar(rutas[1], lector)
+    primera, segunda = (os.path.join(cache.directorio, cache.clave(ruta) + '.parquet') for ruta in rutas[:2])
+    os.utime(primera, (1000, 1000))
+    os.utime(segunda, (2000, 2000))
+
+    # Usar la primera la vuelve la más reciente: la tercera desplaza a la segunda
+    cache.cargar(rutas[0], lector)
+    cache.limite_bytes = os.path.getsize(primera) + os.path.getsize(segunda)
+    cache.cargar(rutas[2], lector)
+
+    assert os.path.exists(primera)
+    assert not os.path.exists(segunda)
+    assert len(entradas(cache)) == 2
+    assert lector.llamadas == rutas
+    cache.cargar(rutas[1], lector)
+    assert lector.llamadas == rutas + [rutas[1]]
+
+
+def test_csv_con_filas_agregadas(tmp_path):
+    cache = CacheTablas(str(tmp_path / 'cache'))
+    lector = Lector()
+    ruta = archivo(tmp_path, 'productividad.csv', 3)
+    desde = os.path.getsize(ruta)
+    agregados = []
+
+    def leer_anexado(r, anterior, inicio):
+        agregados.append(inicio)
+        with open(r, 'rb') as f:
+            f.seek(inicio)
+            nuevas = pd.read_csv(f, names=list(anterior.columns))
+        return pd.concat([anterior, nuevas], ignore_index=True)
+
+    cache.cargar(ruta, lector, lector_anexado=leer_anexado)
+    with open(ruta, 'a') as f:
+        f.write("3,Empleado 3\n")
+
+    df = cache.cargar(ruta, lector, lector_anexado=leer_anexado)
+    assert agregados == [desde]
+    assert len(lector.llamadas) == 1
+    assert df['ID de Empleado'].tolist() == [0, 1, 2, 3]
+
+
+def test_inactiva_no_escribe(tmp_path):
+    cache = CacheTablas(str(tmp_path / 'cache'), activa=False)
+    lector = Lector()
+    ruta = archivo(tmp_path, 'nomina.csv', 2)
+
+    cache.cargar(ruta, lector)
+    cache.cargar(ruta, lector)
+
+    assert len(lector.llamadas) == 2
+    assert not os.path.exists(cache.directorio)
@@ -0,0 +1,101 @@
+"""Lectura de archivos con las columnas de las reglas activas."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache_tablas import CacheTablas  # noqa: E402
+from analisis import MESES, analizar_asistencia, analizar_nomina, analizar_productividad  # noqa: E402
+from carga import leer_tabla  # noqa: E402
+from reglas import compilar_reglas  # noqa: E402
+from test_analisis import asistencia, productividad  # noqa: E402
+from test_incremental import iguales  # noqa: E402
+
+
+def test_plantilla_propia(tmp_path):
+    ruta = tmp_path / 'asistencia.csv'
+    pd.DataFrame({'ID de Empleado': [1, 2], 'Nombre': ['Ana', 'Luis'], 'Dias Ene': [20, 10], 'Dias Feb': [22, 21],
+                  'Total': [42, 31], 'Sucursal': ['Centro', 'Norte']}).to_csv(ruta, index=False)
+    reglas = compilar_reglas({'asistencia': {'mes': {'columna': 'Dias {mes}'}, 'total': {'columna': 'Total'}}})
+
+    df = leer_tabla(str(ruta), 'asistencia', cache=CacheTablas(str(tmp_path / 'cache')), reglas=reglas)
+
+    assert list(df.columns) == ['ID de Empleado', 'Nombre', 'Dias Ene', 'Dias Feb', 'Total']
+    with pytest.raises(ValueError, match="Faltan columnas"):
+        leer_tabla(str(ruta), 'asistencia', cache=CacheTablas(str(tmp_path / 'cache')))
+
+
+def test_conteos_con_decimales(tmp_path):
+    ruta = tmp_path / 'asistencia.csv'
+    df = asistencia([20.5, 21, 19])
+    df.to_csv(ruta, index=False)
+
+    leido = leer_tabla(str(ruta), 'asistencia', cache=CacheTablas(str(tmp_path / 'cache')))
+
+    assert leido[f'Días Trabajados en {MESES[0]}'].tolist() == [20.5, 21, 19]
+    assert analizar_asistencia(leido)['mascara'].tolist() == analizar_asistencia(df)['mascara'].tolist()
+    assert analizar_asistencia(leido)['all_anomalías']['ID de Empleado'].tolist() == [2]
+
+
+def test_conteos_no_numericos(tmp_path):
+    ruta = tmp_path / 'asistencia.csv'
+    df = asistencia([22, 21, 19]).astype({f'Días Trabajados en {MESES[1]}': object})
+    df.loc[1, f'Días Trabajados en {MESES[1]}'] = "N/A"
+    df.loc[2, f'Días Trabajados en {MESES[1]}'] = "veinte"
+    df.to_csv(ruta, index=False)
+
+    with pytest.raises(ValueError, match=f"Días Trabajados en {MESES[1]}' \\(2 celdas\\): 'N/A', 'veinte'"):
+        leer_tabla(str(ruta), 'asistencia', cache=CacheTablas(str(tmp_path / 'cache')))
+
+
+def test_celdas_vacias(tmp_path):
+    ruta = tmp_path / 'asistencia.csv'
+    df = asistencia([22, 21, 19])
+    df[f'Días Trabajados en {MESES[1]}'] = [22, None, 19]
+    df.to_csv(ruta, index=False)
+
+    leido = leer_tabla(str(ruta), 'asistencia', cache=CacheTablas(str(tmp_path / 'cache')))
+
+    assert leido[f'Días Trabajados en {MESES[1]}'].isna().tolist() == [False, True, False]
+
+
+ANALISIS = {'nomina': analizar_nomina, 'asistencia': analizar_asistencia, 'productividad': analizar_productividad}
+
+
+def tablas():
+    nomina = pd.DataFrame({'ID de Empleado': [1, 2, 3, 4, 5],
+                           'Nombre': ['José Pérez', 'Jose Perez', 'Ana Ruiz', 'Ana Ruiz', 'Eva Díaz'],
+                           'Cuenta Bancaria': ['0012-3456', '123456', '0099', '0099', '555']})
+    return {'nomina': nomina, 'asistencia': asistencia([22, 10, 21, 22, 5]),
+            'productividad': productividad([20, 9, 20, 3, 20])}
+
+
+def escribir(df, ruta, formato):
+    if formato == 'csv':
+        df.to_csv(ruta, index=False)
+    elif formato == 'csv_punto_y_coma':
+        df.to_csv(ruta, index=False, sep=';', encoding='latin-1')
+    elif formato == 'parquet':
+        df.to_parquet(ruta)
+    else:
+        df.to_feather(ruta)
+
+
+# (formato, extensión): una extensión desconocida se resuelve por los primeros bytes del archivo
+@pytest.mark.parametrize('formato, extension', [('csv', '.csv'), ('csv_punto_y_coma', '.txt'), ('parquet', '.parquet'),
+                                                ('parquet', '.dat'), ('feather', '.feather'), ('feather', '.bin')])
+@pytest.mark.parametrize('tipo', list(ANALISIS))
+def test_formatos_como_excel(tmp_path, tipo, formato, extension):
+    df = tablas()[tipo]
+    df.to_excel(tmp_path / 'original.xlsx', index=False)
+    escribir(df, tmp_path / f"copia{extension}", formato)
+
+    excel = leer_tabla(str(tmp_path / 'original.xlsx'), tipo, cache=CacheTablas(str(tmp_path / 'cache')))
+    copia = leer_tabla(str(tmp_path / f"copia{extension}"), tipo, cache=CacheTablas(str(tmp_path / 'cache')))
+
+    pd.testing.assert_frame_equal(excel, copia)
+    iguales(ANALISIS[tipo](excel), ANALISIS[tipo](copia))
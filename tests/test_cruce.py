@@ -0,0 +1,40 @@
+"""Cruce de nómina, asistencia y productividad por empleado."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cruce import cruzar_empleados  # noqa: E402
+
+
+def tablas(dias):
+    nomina = pd.DataFrame({'ID de Empleado': [1, 2, 3, 4], 'Nombre': ['Ana', 'Luis', 'Eva', 'Juan'],
+                           'Cuenta Bancaria': ['10', '20', '30', '40']})
+    asistencia = pd.DataFrame({'ID de Empleado': [1, 2, 4, 9], 'Total Días Trabajados': dias})
+    productividad = pd.DataFrame({'ID de Empleado': ['1', '2', '3'], 'Productividad (Tareas - 6 meses)': [30, 0, 12]})
+    return nomina, asistencia, productividad
+
+
+def test_totales_con_decimales_y_vacios():
+    resultado = cruzar_empleados(*tablas([120.5, np.nan, 118, 50]))
+
+    empleados = resultado['empleados']
+    assert empleados['Días Trabajados'].dtype == 'Float64'
+    assert empleados['Días Trabajados'].tolist() == [120.5, 0, pd.NA, 118]
+    assert empleados['Tareas Realizadas'].dtype == 'Int64'
+    assert empleados['Tareas Realizadas'].tolist() == [30, 0, 12, pd.NA]
+    assert resultado['pagados_ausentes']['ID de Empleado'].tolist() == [2, 3]
+    assert resultado['pagados_improductivos']['ID de Empleado'].tolist() == [2, 4]
+    assert resultado['pagados_ausentes_improductivos']['ID de Empleado'].tolist() == [2]
+    assert resultado['fuera_de_nomina_asistencia'] == 1
+    assert resultado['fuera_de_nomina_productividad'] == 0
+
+
+def test_totales_enteros():
+    resultado = cruzar_empleados(*tablas([120.0, 110.0, 118.0, 50.0]))
+
+    assert resultado['empleados']['Días Trabajados'].dtype == 'Int64'
+    assert resultado['empleados']['Días Trabajados'].tolist() == [120, 110, pd.NA, 118]
@@ -0,0 +1,28 @@
+"""Caché de los gráficos de pastel."""
+import os
+import sys
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Spacer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import graficos  # noqa: E402
+
+
+def test_documentos_no_comparten_el_dibujo(tmp_path, monkeypatch):
+    monkeypatch.setattr(graficos, 'cache_graficos', graficos.CacheGraficos())
+    primero = graficos.grafico_pastel(3, 10, "Anomalías", 'reportlab')
+    segundo = graficos.grafico_pastel(3, 10, "Anomalías", 'reportlab')
+
+    assert len(graficos.cache_graficos._entradas) == 1
+    assert primero is not segundo
+
+    # Un espacio casi de página completa obliga a pasar el gráfico a la página siguiente;
+    # platypus lo marca como postergado y el segundo documento no debe heredar la marca
+    for i, grafico in enumerate((primero, segundo)):
+        documento = SimpleDocTemplate(str(tmp_path / f"{i}.pdf"), pagesize=letter)
+        documento.build([Spacer(1, documento.height - 72), grafico])
+        assert os.path.getsize(tmp_path / f"{i}.pdf") > 0
+    guardado, = graficos.cache_graficos._entradas.values()
+    assert not getattr(guardado, '_postponed', None)
@@ -0,0 +1,52 @@
+"""El análisis incremental da lo mismo que el análisis completo."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analisis import MESES, analizar_asistencia  # noqa: E402
+from incremental import EstadoAnalisis, analizar_datos_incremental, nombres_similares_incremental  # noqa: E402
+from similitud import nombres_similares  # noqa: E402
+from test_analisis import asistencia  # noqa: E402
+
+
+def iguales(completo, incremental):
+    for clave, valor in completo.items():
+        otro = incremental[clave]
+        if isinstance(valor, pd.DataFrame):
+            pd.testing.assert_frame_equal(valor, otro)
+        elif isinstance(valor, pd.Series):
+            pd.testing.assert_series_equal(valor, otro)
+        elif isinstance(valor, np.ndarray):
+            assert np.array_equal(valor, otro), clave
+        elif clave != 'reglas':
+            assert valor == otro, clave
+
+
+def test_asistencia_con_filas_y_mes_nuevos(tmp_path):
+    estado = EstadoAnalisis(str(tmp_path))
+    ruta = str(tmp_path / 'asistencia.csv')
+    df = asistencia([20, 10, 22, 21]).drop(columns=f'Días Trabajados en {MESES[-1]}')
+    primero = analizar_datos_incremental(df, 'asistencia', ruta, estado=estado)
+    iguales(analizar_asistencia(df), primero)
+
+    df = asistencia([20, 10, 22, 21, 5, 20])
+    df.loc[0, f'Días Trabajados en {MESES[0]}'] = 3
+    segundo = analizar_datos_incremental(df, 'asistencia', ruta, estado=estado)
+    iguales(analizar_asistencia(df), segundo)
+    assert segundo['incremental'] == {'filas': 6, 'filas_cambiadas': 3, 'meses_nuevos': 1}
+
+
+def test_nomina_con_filas_repetidas(tmp_path):
+    estado = EstadoAnalisis(str(tmp_path))
+    ruta = str(tmp_path / 'nomina.csv')
+    df = pd.DataFrame({'ID de Empleado': [1, 2, 3, 4],
+                       'Nombre': ['José Pérez', 'Jose Perez', 'Maria Lopez', 'Ana Ruiz'],
+                       'Cuenta Bancaria': ['10', '20', '30', '40']})
+    for actual in (df, pd.concat([df, df.iloc[[1, 3]]], ignore_index=True), df.iloc[::-1].reset_index(drop=True)):
+        incremental, _ = nombres_similares_incremental(actual, ruta, estado=estado)
+        pd.testing.assert_frame_equal(nombres_similares(actual), incremental)
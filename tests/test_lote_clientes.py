@@ -0,0 +1,69 @@
+"""Procesos trabajadores y carpetas de salida de la auditoría por lotes."""
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lote_clientes  # noqa: E402
+
+# Los procesos trabajadores solo ven las funciones reemplazadas si se crean con fork
+con_fork = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="requiere procesos con fork")
+
+
+def colgado(trabajo, opciones):
+    time.sleep(600)
+
+
+def caido(trabajo, opciones):
+    os._exit(3)
+
+
+def salida(trabajo, opciones):
+    return {'estado': lote_clientes.CORRECTO, 'error': "", 'documentos': [trabajo['salida']], 'segundos': 0}
+
+
+def clientes(tmp_path):
+    rutas = {tipo: str(tmp_path / f"{tipo}.csv") for tipo in lote_clientes.TIPOS}
+    for ruta in rutas.values():
+        open(ruta, 'w').close()
+    return [{'nombre': '../fuera', 'auditor': None, **rutas}]
+
+
+@pytest.mark.parametrize('nombre, carpeta', [('../x', '_x'), ('a/b\\c', 'a_b_c'), ('..', '_'), ('Niño S.A.', 'Niño S.A')])
+def test_directorio_cliente(nombre, carpeta):
+    assert lote_clientes.directorio_cliente(nombre) == carpeta
+
+
+@con_fork
+def test_trabajo_colgado_termina_su_proceso(tmp_path, monkeypatch):
+    monkeypatch.setattr(lote_clientes, 'ejecutar_trabajo', colgado)
+    monkeypatch.setattr(lote_clientes, 'MARGEN_CANCELACION', 0)
+    inicio = time.monotonic()
+
+    filas = lote_clientes.ejecutar_lote(clientes(tmp_path), str(tmp_path / 'salida'), procesos=2, tiempo_maximo=0.2)
+
+    assert time.monotonic() - inicio < 30
+    assert [fila['estado'] for fila in filas] == [lote_clientes.TIEMPO_AGOTADO] * 4
+
+
+@con_fork
+def test_proceso_caido_se_informa_y_reintenta(tmp_path, monkeypatch):
+    monkeypatch.setattr(lote_clientes, 'ejecutar_trabajo', caido)
+
+    filas = lote_clientes.ejecutar_lote(clientes(tmp_path), str(tmp_path / 'salida'), procesos=2, reintentos=1)
+
+    assert [fila['intentos'] for fila in filas] == [2] * 4
+    assert all("código 3" in fila['error'] for fila in filas)
+
+
+@con_fork
+def test_cliente_escribe_dentro_de_la_salida(tmp_path, monkeypatch):
+    monkeypatch.setattr(lote_clientes, 'ejecutar_trabajo', salida)
+
+    filas = lote_clientes.ejecutar_lote(clientes(tmp_path), str(tmp_path / 'salida'), procesos=1)
+
+    assert {fila['documentos'][0] for fila in filas} == {str(tmp_path / 'salida' / '_fuera')}
@@ -0,0 +1,28 @@
+"""Memoria residente por etapa."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import perfil  # noqa: E402
+
+
+def test_pico_de_memoria_por_etapa(monkeypatch):
+    monkeypatch.setattr(perfil, 'destino', None)
+    if perfil.rss_pico_mb() is None or not perfil.reiniciar_pico():
+        pytest.skip("el sistema no permite reiniciar el pico de memoria residente")
+
+    with perfil.perfilar('prueba') as medido:
+        with perfil.etapa('grande'):
+            datos = np.ones(20_000_000)  # 160 MB
+            del datos
+        with perfil.etapa('chica'):
+            pass
+
+    total, grande, chica = medido.etapas
+    assert grande['rss_pico_mb'] - grande['rss_mb'] > 100
+    assert total['rss_pico_mb'] >= grande['rss_pico_mb']
+    assert chica['rss_pico_mb'] < grande['rss_pico_mb'] - 100
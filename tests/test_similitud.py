@@ -0,0 +1,64 @@
+"""Nombres casi iguales y cuentas bancarias con otro formato en la nómina."""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import similitud  # noqa: E402
+from similitud import cuentas_similares, nombres_similares  # noqa: E402
+
+
+def nomina(nombres, cuentas=None, ids=None):
+    return pd.DataFrame({'ID de Empleado': ids or list(range(1, len(nombres) + 1)), 'Nombre': nombres,
+                         'Cuenta Bancaria': cuentas or [str(1000 + i) for i in range(len(nombres))]})
+
+
+def pares(resultado):
+    return {frozenset((fila['Nombre A'], fila['Nombre B'])) for _, fila in resultado.iterrows()}
+
+
+def test_nombres_casi_iguales():
+    df = nomina(['José Pérez', 'Jose Perez', 'PEREZ, Jose', 'Jose Peres', 'Juan Perez', 'Maria Lopez', 'Ana Ruiz'])
+
+    resultado = nombres_similares(df)
+
+    assert pares(resultado) == {frozenset(par) for par in [('José Pérez', 'Jose Perez'), ('José Pérez', 'PEREZ, Jose'),
+                                                           ('Jose Perez', 'PEREZ, Jose'), ('José Pérez', 'Jose Peres'),
+                                                           ('Jose Perez', 'Jose Peres'), ('PEREZ, Jose', 'Jose Peres')]}
+    assert resultado['Similitud'].iloc[0] == 1
+    assert (resultado['Similitud'] >= similitud.UMBRAL_SIMILITUD).all()
+
+
+def test_nombres_distintos_o_del_mismo_empleado():
+    df = nomina(['Jose Perez', 'Juan Perez', 'Maria Lopez', 'Mario Gomez', 'José Pérez'], ids=[1, 2, 3, 4, 1])
+
+    assert nombres_similares(df).empty
+
+
+def test_nombre_comun_con_muchas_filas(monkeypatch):
+    df = nomina(['Jose Perez'] * 30 + ['José Pérez'] * 20 + ['Jose Peres'] * 10)
+    completo = nombres_similares(df)
+    # Se compara con el camino de los bloques grandes (producto de matrices)
+    monkeypatch.setattr(similitud, 'MAXIMO_BLOQUE_PARES', 1)
+
+    assert len(completo) == 30 * 20 + 30 * 10 + 20 * 10
+    pd.testing.assert_frame_equal(completo, nombres_similares(df))
+
+
+def test_cuentas_con_otro_formato():
+    df = nomina(['Ana', 'Luis', 'Eva', 'Juan', 'Rosa', 'Pedro'],
+                cuentas=['0012-3456', '123456', '12 3456', '999', '999', '777'], ids=[1, 2, 3, 4, 5, 1])
+
+    resultado = cuentas_similares(df)
+
+    assert resultado['Nombre'].tolist() == ['Ana', 'Luis', 'Eva']
+    assert set(resultado['Cuenta normalizada']) == {'123456'}
+
+
+def test_cuentas_de_un_mismo_empleado_o_iguales():
+    # Misma cuenta con otro formato pero del mismo empleado, y cuentas idénticas (ya son duplicados exactos)
+    df = nomina(['Ana', 'Ana', 'Luis', 'Eva'], cuentas=['0012-3456', '123456', '555', '555'], ids=[1, 1, 2, 3])
+
+    assert cuentas_similares(df).empty
@@ -0,0 +1,62 @@
+"""Tablas por bloques, recorte de filas y listados completos fuera del PDF."""
+import os
+import sys
+
+import pandas as pd
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tablas_pdf import FILAS_CON_ANEXO, FILAS_POR_BLOQUE, BloqueTabla, archivo_complementario, tabla_por_bloques  # noqa: E402
+
+COLUMNAS = ['ID de Empleado', 'Nombre']
+
+
+def listado(filas):
+    return pd.DataFrame({'ID de Empleado': range(filas), 'Nombre': [f"Empleado {i}" for i in range(filas)],
+                         'Cuenta Bancaria': ["0"] * filas})
+
+
+def construir(ruta, flowables):
+    documento = SimpleDocTemplate(str(ruta), pagesize=letter)
+    documento.build(flowables)
+    return documento.page
+
+
+def test_tabla_recortada_con_csv(tmp_path):
+    pdf = tmp_path / 'reporte.pdf'
+    csv = archivo_complementario(str(pdf), 'duplicados')
+    limite = 3 * FILAS_POR_BLOQUE + 5
+
+    flowables = tabla_por_bloques(listado(10 * FILAS_POR_BLOQUE), COLUMNAS, 400, limite, csv)
+
+    bloques = [f for f in flowables if isinstance(f, BloqueTabla)]
+    assert [(b.inicio, b.fin) for b in bloques][-2:] == [(2 * FILAS_POR_BLOQUE, 3 * FILAS_POR_BLOQUE),
+                                                         (3 * FILAS_POR_BLOQUE, limite)]
+    resumen = flowables[-1]
+    assert isinstance(resumen, Paragraph)
+    assert f"primeras {limite} de {10 * FILAS_POR_BLOQUE}" in resumen.text
+    assert os.path.basename(csv) in resumen.text
+    assert construir(pdf, flowables) == 4
+    completo = pd.read_csv(csv)
+    assert list(completo.columns) == COLUMNAS
+    assert completo['ID de Empleado'].tolist() == list(range(10 * FILAS_POR_BLOQUE))
+
+
+def test_tabla_con_anexo(tmp_path):
+    anexo = str(tmp_path / 'anexo_nomina.xlsx')
+
+    flowables = tabla_por_bloques(listado(FILAS_CON_ANEXO + 1), COLUMNAS, 400, anexo=anexo)
+
+    assert max(f.fin for f in flowables if isinstance(f, BloqueTabla)) == FILAS_CON_ANEXO
+    assert 'href="anexo_nomina.xlsx"' in flowables[-1].text
+    assert construir(tmp_path / 'reporte.pdf', flowables) > 1
+    assert os.listdir(tmp_path) == ['reporte.pdf']
+
+
+def test_tabla_vacia(tmp_path):
+    flowables = tabla_por_bloques(listado(0), COLUMNAS, 400, 10, archivo_complementario(str(tmp_path / 'r.pdf'), 'x'))
+
+    assert len(flowables) == 1
+    assert construir(tmp_path / 'r.pdf', flowables) == 1
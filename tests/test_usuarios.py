@@ -0,0 +1,98 @@
+"""Inicio de sesión, bloqueo persistente y actualización del costo de scrypt."""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import usuarios  # noqa: E402
+from usuarios import BLOQUEADO, CORRECTO, INCORRECTO, MAXIMO_INTENTOS, AlmacenUsuarios  # noqa: E402
+
+# Costo bajo para que las pruebas no tarden
+COSTO = {'n': 2 ** 4, 'r': 8, 'p': 1}
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / 'usuarios.db')
+
+
+def fila(ruta, nombre):
+    with sqlite3.connect(ruta) as conexion:
+        return conexion.execute("SELECT clave, sal, n, r, p, intentos FROM usuarios WHERE nombre = ?",
+                                (nombre,)).fetchone()
+
+
+def test_bloqueo_persiste_entre_almacenes(ruta):
+    almacen = AlmacenUsuarios(ruta, COSTO)
+    almacen.crear('ana', 'secreta')
+
+    resultados = [almacen.verificar('ana', 'otra') for _ in range(MAXIMO_INTENTOS)]
+
+    assert resultados == [INCORRECTO] * (MAXIMO_INTENTOS - 1) + [BLOQUEADO]
+    # Bloqueado aunque acierte, también desde otra instancia sobre la misma base
+    nuevo = AlmacenUsuarios(ruta, COSTO)
+    assert nuevo.verificar('ana', 'secreta') == BLOQUEADO
+    assert nuevo.desbloquear('ana')
+    assert nuevo.verificar('ana', 'secreta') == CORRECTO
+
+
+def test_acierto_reinicia_intentos(ruta):
+    almacen = AlmacenUsuarios(ruta, COSTO)
+    almacen.crear('ana', 'secreta')
+
+    for _ in range(MAXIMO_INTENTOS - 1):
+        assert almacen.verificar('ana', 'otra') == INCORRECTO
+    assert fila(ruta, 'ana')[-1] == MAXIMO_INTENTOS - 1
+    assert almacen.verificar('ana', 'secreta') == CORRECTO
+    assert fila(ruta, 'ana')[-1] == 0
+    assert almacen.verificar('ana', 'otra') == INCORRECTO
+
+
+def test_clave_se_actualiza_con_el_costo_nuevo(ruta):
+    AlmacenUsuarios(ruta, COSTO).crear('ana', 'secreta')
+    clave, sal = fila(ruta, 'ana')[:2]
+    nuevo_costo = {'n': 2 ** 5, 'r': 4, 'p': 2}
+    almacen = AlmacenUsuarios(ruta, nuevo_costo)
+
+    assert almacen.verificar('ana', 'otra') == INCORRECTO
+    assert fila(ruta, 'ana')[2:5] == (COSTO['n'], COSTO['r'], COSTO['p'])
+    assert almacen.verificar('ana', 'secreta') == CORRECTO
+
+    nueva_clave, nueva_sal, n, r, p, _ = fila(ruta, 'ana')
+    assert (n, r, p) == (nuevo_costo['n'], nuevo_costo['r'], nuevo_costo['p'])
+    assert nueva_clave != clave and nueva_sal != sal
+    assert nueva_clave == usuarios.derivar_clave('secreta', nueva_sal, **nuevo_costo)
+    assert almacen.verificar('ana', 'secreta') == CORRECTO
+    assert AlmacenUsuarios(ruta, COSTO).verificar('ana', 'secreta') == CORRECTO
+
+
+def test_usuario_inexistente(ruta, monkeypatch):
+    almacen = AlmacenUsuarios(ruta, COSTO)
+    almacen.crear('ana', 'secreta')
+    derivaciones = []
+    original = usuarios.derivar_clave
+
+    def contar(*args, **kwargs):
+        derivaciones.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(usuarios, 'derivar_clave', contar)
+
+    assert almacen.verificar('luis', 'secreta') == INCORRECTO
+    # Paga una derivación como un usuario real y no crea la fila
+    assert len(derivaciones) == 1
+    assert fila(ruta, 'luis') is None
+    assert not almacen.desbloquear('luis')
+    assert usuarios.main(['desbloquear', 'luis', '--base', ruta]) == 1
+
+
+def test_usuario_repetido(ruta):
+    almacen = AlmacenUsuarios(ruta, COSTO)
+    almacen.crear('ana', 'secreta')
+
+    with pytest.raises(ValueError, match="ya existe"):
+        almacen.crear('ana', 'otra')
+    assert almacen.verificar('ana', 'secreta') == CORRECTO
@@ -0,0 +1,160 @@
+"""Usuarios de la aplicación guardados en SQLite con contraseñas derivadas con scrypt.
+
+Cada usuario guarda su sal y los parámetros de scrypt con que se derivó su clave,
+así que el costo (COSTO_PREDETERMINADO) puede subirse sin invalidar las cuentas:
+al iniciar sesión con parámetros viejos la clave se vuelve a derivar con los nuevos.
+La comparación es de tiempo constante y un usuario inexistente también paga una
+derivación completa, para que el tiempo de respuesta no revele qué usuarios existen.
+Los intentos fallidos se guardan en la base: el bloqueo sobrevive a los reinicios.
+
+Derivar la clave tarda a propósito (decenas de milisegundos o más); la interfaz
+llama a estos métodos desde un hilo aparte.
+
+Para desbloquear un usuario:
+    python usuarios.py desbloquear nombre_de_usuario
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import sys
+from datetime import datetime
+
+RUTA_PREDETERMINADA = os.environ.get(
+    "AUDITORIA_USUARIOS", os.path.join(os.path.expanduser("~"), ".auditoria", "usuarios.db"))
+# Parámetros de scrypt: n (costo de CPU y memoria, potencia de 2), r (tamaño de bloque), p (paralelismo)
+COSTO_PREDETERMINADO = {'n': 2 ** 14, 'r': 8, 'p': 1}
+LARGO_CLAVE = 32
+LARGO_SAL = 16
+MAXIMO_INTENTOS = 3
+
+CORRECTO = 'correcto'
+INCORRECTO = 'incorrecto'
+BLOQUEADO = 'bloqueado'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    nombre TEXT PRIMARY KEY,
+    clave BLOB NOT NULL,
+    sal BLOB NOT NULL,
+    n INTEGER NOT NULL,
+    r INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    creado TEXT NOT NULL
+)
+"""
+
+
+def derivar_clave(contrasena, sal, n, r, p):
+    """Clave scrypt de la contraseña (la memoria máxima se ajusta a n y r)."""
+    return hashlib.scrypt(contrasena.encode('utf-8'), salt=sal, n=n, r=r, p=p,
+                          maxmem=256 * r * n * p + 1024 ** 2, dklen=LARGO_CLAVE)
+
+
+class AlmacenUsuarios:
+    """Altas, inicio de sesión y bloqueo de usuarios sobre una base SQLite.
+
+    Cada operación abre su propia conexión, así que los métodos pueden llamarse
+    desde cualquier hilo.
+    """
+
+    def __init__(self, ruta=RUTA_PREDETERMINADA, costo=None):
+        self.ruta = ruta
+        self.costo = dict(costo or COSTO_PREDETERMINADO)
+        self._sal_ficticia = secrets.token_bytes(LARGO_SAL)
+        self._preparada = False
+
+    def _conectar(self):
+        if not self._preparada:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=10)
+        if not self._preparada:
+            with conexion:
+                conexion.execute(ESQUEMA)
+            self._preparada = True
+        return conexion
+
+    def crear(self, nombre, contrasena):
+        """Da de alta un usuario; ValueError si ya existe."""
+        sal = secrets.token_bytes(LARGO_SAL)
+        clave = derivar_clave(contrasena, sal, **self.costo)
+        conexion = self._conectar()
+        try:
+            with conexion:
+                conexion.execute(
+                    "INSERT INTO usuarios (nombre, clave, sal, n, r, p, intentos, creado) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                    (nombre, clave, sal, self.costo['n'], self.costo['r'], self.costo['p'],
+                     datetime.now().isoformat(timespec='seconds')))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"El usuario '{nombre}' ya existe.") from None
+        finally:
+            conexion.close()
+
+    def verificar(self, nombre, contrasena):
+        """Comprueba la contraseña y devuelve CORRECTO, INCORRECTO o BLOQUEADO.
+
+        Cada fallo suma un intento; al llegar a MAXIMO_INTENTOS el usuario queda
+        bloqueado (aunque después acierte) hasta que se lo desbloquee. Un acierto
+        reinicia el contador.
+        """
+        conexion = self._conectar()
+        try:
+            fila = conexion.execute("SELECT clave, sal, n, r, p, intentos FROM usuarios WHERE nombre = ?",
+                                    (nombre,)).fetchone()
+            if fila is None:
+                # Misma derivación que con un usuario real, para no revelar que no existe
+                derivar_clave(contrasena, self._sal_ficticia, **self.costo)
+                return INCORRECTO
+
+            clave, sal, n, r, p, intentos = fila
+            if intentos >= MAXIMO_INTENTOS:
+                return BLOQUEADO
+            if not hmac.compare_digest(derivar_clave(contrasena, sal, n, r, p), clave):
+                with conexion:
+                    conexion.execute("UPDATE usuarios SET intentos = intentos + 1 WHERE nombre = ?", (nombre,))
+                return BLOQUEADO if intentos + 1 >= MAXIMO_INTENTOS else INCORRECTO
+
+            with conexion:
+                conexion.execute("UPDATE usuarios SET intentos = 0 WHERE nombre = ?", (nombre,))
+                if (n, r, p) != (self.costo['n'], self.costo['r'], self.costo['p']):
+                    # Clave derivada con un costo anterior: se actualiza ahora que se conoce la contraseña
+                    sal = secrets.token_bytes(LARGO_SAL)
+                    conexion.execute("UPDATE usuarios SET clave = ?, sal = ?, n = ?, r = ?, p = ? WHERE nombre = ?",
+                                     (derivar_clave(contrasena, sal, **self.costo), sal,
+                                      self.costo['n'], self.costo['r'], self.costo['p'], nombre))
+            return CORRECTO
+        finally:
+            conexion.close()
+
+    def desbloquear(self, nombre):
+        """Reinicia los intentos fallidos del usuario; devuelve False si no existe."""
+        conexion = self._conectar()
+        try:
+            with conexion:
+                cursor = conexion.execute("UPDATE usuarios SET intentos = 0 WHERE nombre = ?", (nombre,))
+            return cursor.rowcount > 0
+        finally:
+            conexion.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Administración de los usuarios de la aplicación.")
+    parser.add_argument("accion", choices=['desbloquear'])
+    parser.add_argument("usuario")
+    parser.add_argument("--base", default=RUTA_PREDETERMINADA, help="Archivo SQLite de usuarios")
+    args = parser.parse_args(argv)
+
+    if not AlmacenUsuarios(args.base).desbloquear(args.usuario):
+        print(f"Error: no existe el usuario '{args.usuario}'", file=sys.stderr)
+        return 1
+    print(f"Usuario '{args.usuario}' desbloqueado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())